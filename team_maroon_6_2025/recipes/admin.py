@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from recipes.models import ShoppingListItem, User
+from django.utils import timezone
+from recipes.models import ShoppingListItem, SlowQuery, Task, User
 
 # Configure how shopping list items appear in the Django admin
 @admin.register(ShoppingListItem)
@@ -21,3 +22,24 @@ class CustomUserAdmin(UserAdmin):
     list_display = ("username", "email", "first_name", "last_name", "is_staff", "is_superuser", "is_private")
     search_fields = ("username", "email", "first_name", "last_name")
     filter_horizontal = ("favourites", "following", "groups", "user_permissions")
+
+
+# Show the background task queue so failed tasks can be inspected and retried
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ("name", "status", "attempts", "max_attempts", "run_after", "created_at")
+    list_filter = ("status", "name")
+    readonly_fields = ("last_error",)
+    actions = ["retry_tasks"]
+
+    @admin.action(description="Retry selected tasks")
+    def retry_tasks(self, request, queryset):
+        queryset.update(status=Task.PENDING, attempts=0, locked_at=None, run_after=timezone.now())
+
+
+# Browse the slow-query log recorded while SLOW_QUERY_LOG is on
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ("normalized_sql", "calls", "total_ms", "max_ms", "full_scan", "view_name", "last_seen")
+    list_filter = ("full_scan", "view_name")
+    readonly_fields = [field.name for field in SlowQuery._meta.fields]
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class RecipesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'recipes'
+
+    # Connect model signal handlers and register background tasks once the app registry is ready
+    def ready(self):
+        from recipes import signals, tasks  # noqa: F401
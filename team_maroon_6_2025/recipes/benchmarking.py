@@ -0,0 +1,461 @@
+"""
+Latency and query benchmarks for the hot pages.
+
+``run_benchmarks`` requests each page from ``build_scenarios`` repeatedly as one
+representative signed-in user and reports, per page, the p50/p95/mean
+latency, the number of queries and the rows those queries returned.
+Latency is measured on warm requests; queries and rows are measured on a
+request with an empty cache, so they show the worst case that a fragment
+cache would otherwise hide. The ``benchmark`` management command seeds a
+throwaway database with ``recipes.seeding.Seeder`` and prints the report as
+JSON, so runs can be diffed or checked in CI.
+
+``compare_index_plans`` runs the query behind each composite index twice,
+with the index and with it temporarily dropped, and reports both plans and
+timings (``benchmark --indexes``).
+
+``compare_throughput`` sends the same burst of concurrent requests through
+the real WSGI handler (a thread per in-flight request) and the real ASGI
+handler (one event loop), the latter with the sync and then the async views,
+and reports requests per second and latency for each (``benchmark
+--throughput``).
+"""
+
+import asyncio
+import io
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.cache import cache
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.db.models import Count
+from django.test import Client, RequestFactory
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from recipes.models import Comment, FollowRequest, Notification, Recipe, ShoppingListItem, User
+from recipes.views.explore_view import explore
+
+
+@dataclass
+class BenchmarkResult:
+    """Measurements for one page; the timings are None when no timed requests were made."""
+
+    name: str
+    url: str
+    status: int
+    iterations: int
+    p50_ms: float | None
+    p95_ms: float | None
+    mean_ms: float | None
+    queries: int
+    rows: int
+
+
+class QueryRecorder:
+    """
+    Count the queries run while installed and the rows they returned.
+
+    Used as a database execute wrapper. Every SELECT is re-run afterwards as
+    ``SELECT COUNT(*)``, so reading the row count does not affect the
+    request being measured. For writes the rows affected are counted.
+    """
+
+    def __init__(self):
+        self.reads = []
+        self.writes = 0
+        self.rows_written = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        result = execute(sql, params, many, context)
+        if sql.lstrip().upper().startswith(("SELECT", "WITH")):
+            self.reads.append((sql, params))
+        else:
+            self.writes += 1
+            self.rows_written += max(context["cursor"].rowcount, 0)
+        return result
+
+    @property
+    def queries(self):
+        return len(self.reads) + self.writes
+
+    def count_rows(self):
+        total = self.rows_written
+        with connection.cursor() as cursor:
+            for sql, params in self.reads:
+                cursor.execute(f"SELECT COUNT(*) FROM ({sql}) AS benchmark_rows", params)
+                total += cursor.fetchone()[0]
+        return total
+
+
+def percentile(samples, fraction):
+    """Return the ``fraction`` percentile of ``samples`` by linear interpolation, or None when empty."""
+    ordered = sorted(samples)
+    if not ordered:
+        return None
+    if len(ordered) == 1:
+        return ordered[0]
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def rounded(value, digits=2):
+    """Round a timing for the report, passing None (no samples) through."""
+    return None if value is None else round(value, digits)
+
+
+def pick_subjects():
+    """
+    Choose the rows that make each page do the most work.
+
+    The viewer is the user who follows the most accounts, the detail page
+    shows the most commented recipe and the profile page the most prolific
+    author, and the inbox belongs to the user with the most notifications.
+    Returns None when the database holds no recipes.
+    """
+    recipe = Recipe.objects.order_by("-comment_total", "-id").first()
+    if recipe is None:
+        return None
+    viewer = User.objects.annotate(total=Count("following")).order_by("-total", "id").first()
+    author = User.objects.annotate(total=Count("recipes")).order_by("-total", "id").first()
+    inbox_owner = User.objects.annotate(total=Count("notifications")).order_by("-total", "id").first()
+    return {"viewer": viewer, "recipe": recipe, "author": author, "inbox_owner": inbox_owner}
+
+
+def build_scenarios(subjects):
+    """
+    Return ``[(name, url, request_function)]`` for every benchmarked page.
+
+    ``explore`` has no URL of its own, so it is called directly with a
+    ``RequestFactory`` request; the other pages go through the test client
+    and the full middleware stack.
+    """
+    viewer_client = Client()
+    viewer_client.force_login(subjects["viewer"])
+    inbox_client = Client()
+    inbox_client.force_login(subjects["inbox_owner"])
+    factory = RequestFactory()
+
+    def get(client, url):
+        return lambda: client.get(url)
+
+    def explore_request():
+        request = factory.get("/explore/")
+        request.user = subjects["viewer"]
+        return explore(request)
+
+    urls = {
+        "recipe_list": reverse("recipe_list"),
+        "dashboard": reverse("dashboard"),
+        "recipe_detail": reverse("recipe_detail", args=[subjects["recipe"].pk]),
+        "profile_page": reverse("profile_page", args=[subjects["author"].username]),
+        "inbox": reverse("inbox"),
+    }
+    return [
+        ("recipe_list", urls["recipe_list"], get(viewer_client, urls["recipe_list"])),
+        ("dashboard", urls["dashboard"], get(viewer_client, urls["dashboard"])),
+        ("explore", "/explore/", explore_request),
+        ("recipe_detail", urls["recipe_detail"], get(viewer_client, urls["recipe_detail"])),
+        ("profile_page", urls["profile_page"], get(viewer_client, urls["profile_page"])),
+        ("inbox", urls["inbox"], get(inbox_client, urls["inbox"])),
+    ]
+
+
+def measure(name, url, send, iterations=20, warmup=2):
+    """Benchmark one page and return a ``BenchmarkResult``."""
+    cache.clear()
+    recorder = QueryRecorder()
+    with connection.execute_wrapper(recorder):
+        response = send()
+    queries, rows = recorder.queries, recorder.count_rows()
+
+    for _ in range(warmup):
+        send()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        send()
+        samples.append((time.perf_counter() - started) * 1000)
+
+    return BenchmarkResult(
+        name=name,
+        url=url,
+        status=response.status_code,
+        iterations=iterations,
+        p50_ms=rounded(percentile(samples, 0.5)),
+        p95_ms=rounded(percentile(samples, 0.95)),
+        mean_ms=rounded(statistics.fmean(samples) if samples else None),
+        queries=queries,
+        rows=rows,
+    )
+
+
+def run_benchmarks(iterations=20, warmup=2, only=None):
+    """
+    Benchmark every page (or the names in ``only``) against the current database.
+
+    Returns a list of result dictionaries, ready for ``json.dumps``.
+    """
+    subjects = pick_subjects()
+    if subjects is None:
+        return []
+    results = []
+    for name, url, send in build_scenarios(subjects):
+        if only and name not in only:
+            continue
+        results.append(asdict(measure(name, url, send, iterations=iterations, warmup=warmup)))
+    return results
+
+
+def index_access_paths():
+    """
+    Return ``[(model, index_name, queryset_function)]`` for the composite indexes.
+
+    Each function builds the query a view runs for the busiest matching row,
+    e.g. the inbox of the user with the most notifications.
+    """
+    def busiest(queryset, field):
+        row = queryset.values(field).annotate(total=Count("id")).order_by("-total").first()
+        return row[field] if row else None
+
+    author_id = busiest(Recipe.objects.all(), "author_id")
+    recipe_id = busiest(Comment.objects.all(), "recipe_id")
+    recipient_id = busiest(Notification.objects.all(), "recipient_id")
+    shopper_id = busiest(ShoppingListItem.objects.all(), "user_id")
+    requested_id = busiest(FollowRequest.objects.all(), "requested_user_id")
+    return [
+        (Recipe, "recipe_created_idx", lambda: Recipe.objects.order_by("-created_at", "-id")[:12]),
+        (Recipe, "recipe_author_created_idx",
+         lambda: Recipe.objects.filter(author_id=author_id).order_by("-created_at", "-id")[:12]),
+        (Comment, "comment_recipe_created_idx", lambda: Comment.objects.filter(recipe_id=recipe_id)[:50]),
+        (Notification, "notification_inbox_idx", lambda: Notification.objects.filter(recipient_id=recipient_id)[:20]),
+        (Notification, "notification_inbox_type_idx",
+         lambda: Notification.objects.filter(recipient_id=recipient_id, notification_type="comment")[:20]),
+        (ShoppingListItem, "shopping_list_user_idx",
+         lambda: ShoppingListItem.objects.filter(user_id=shopper_id).order_by("is_checked", "name")),
+        (FollowRequest, "follow_request_received_idx",
+         lambda: FollowRequest.objects.filter(requested_user_id=requested_id)),
+    ]
+
+
+def _plan_and_time(build, label, iterations):
+    """
+    Return the plan and median time of the SQL ``build()`` produces.
+
+    ``label`` is added as a comment so each measurement is prepared afresh;
+    SQLite would otherwise reuse a cached statement planned for a dropped index.
+    """
+    sql, params = build().query.sql_with_params()
+    sql = f"{sql} /* {label} */"
+    samples = []
+    with connection.cursor() as cursor:
+        cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}", params)
+        plan = "\n".join(str(row[-1]) for row in cursor.fetchall())
+        for _ in range(iterations):
+            started = time.perf_counter()
+            cursor.execute(sql, params)
+            cursor.fetchall()
+            samples.append((time.perf_counter() - started) * 1000)
+    return plan, rounded(percentile(samples, 0.5), 3)
+
+
+def _drop_and_create_sql(model, index):
+    with connection.schema_editor(collect_sql=True, atomic=False) as editor:
+        editor.remove_index(model, index)
+        editor.add_index(model, index)
+    return [sql.rstrip(";") for sql in editor.collected_sql]
+
+
+def compare_index_plans(iterations=20):
+    """
+    Report each composite index's query plan and median time with and without it.
+
+    The index is dropped for the "before" measurement and created again
+    straight afterwards, so run this against a throwaway database only.
+    """
+    results = []
+    for model, index_name, build in index_access_paths():
+        index = next(index for index in model._meta.indexes if index.name == index_name)
+        drop_sql, create_sql = _drop_and_create_sql(model, index)
+        after_plan, after_ms = _plan_and_time(build, f"with {index_name}", iterations)
+        with connection.cursor() as cursor:
+            cursor.execute(drop_sql)
+            try:
+                before_plan, before_ms = _plan_and_time(build, f"without {index_name}", iterations)
+            finally:
+                cursor.execute(create_sql)
+        results.append({
+            "index": index_name,
+            "table": model._meta.db_table,
+            "before_plan": before_plan,
+            "after_plan": after_plan,
+            "before_ms": before_ms,
+            "after_ms": after_ms,
+        })
+    return results
+
+
+THROUGHPUT_MODES = [
+    ("wsgi", "recipify.urls"),
+    ("asgi_sync_views", "recipify.urls"),
+    ("asgi_async_views", "recipify.async_urls"),
+]
+
+
+def _session_cookie(user):
+    client = Client()
+    client.force_login(user)
+    return f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+
+
+def _wsgi_get(application, path, cookie):
+    status = []
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": path,
+        "QUERY_STRING": "",
+        "SCRIPT_NAME": "",
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "HTTP_HOST": "localhost",
+        "HTTP_COOKIE": cookie,
+        "REMOTE_ADDR": "127.0.0.1",
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr,
+        "wsgi.url_scheme": "http",
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+        "wsgi.version": (1, 0),
+    }
+    body = application(environ, lambda line, headers: status.append(int(line.split()[0])))
+    try:
+        b"".join(body)
+    finally:
+        # Closing the response sends request_finished, as a WSGI server would
+        body.close()
+    return status[0]
+
+
+async def _asgi_get(application, path, cookie):
+    status = []
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"localhost"), (b"cookie", cookie.encode())],
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+    received = False
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # The client never disconnects; the handler cancels this wait once it has responded
+        await asyncio.Future()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await application(scope, receive, send)
+    return status[0]
+
+
+def _timed(send):
+    started = time.perf_counter()
+    status = send()
+    return status, (time.perf_counter() - started) * 1000
+
+
+async def _timed_async(send):
+    started = time.perf_counter()
+    status = await send()
+    return status, (time.perf_counter() - started) * 1000
+
+
+def _run_wsgi(path, cookie, concurrency, total):
+    application = get_wsgi_application()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(lambda _: _timed(lambda: _wsgi_get(application, path, cookie)), range(total)))
+
+
+async def _run_asgi(path, cookie, concurrency, total):
+    application = get_asgi_application()
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with slots:
+            return await _timed_async(lambda: _asgi_get(application, path, cookie))
+
+    return await asyncio.gather(*(one() for _ in range(total)))
+
+
+def _throughput_result(name, mode, path, outcomes, elapsed):
+    latencies = [ms for _, ms in outcomes]
+    return {
+        "name": name,
+        "mode": mode,
+        "url": path,
+        "requests": len(outcomes),
+        "errors": sum(1 for status, _ in outcomes if status != 200),
+        "requests_per_second": round(len(outcomes) / elapsed, 1) if elapsed else None,
+        "p50_ms": rounded(percentile(latencies, 0.5)),
+        "p95_ms": rounded(percentile(latencies, 0.95)),
+    }
+
+
+def compare_throughput(concurrency=8, requests=200, only=None):
+    """
+    Report throughput for each page under WSGI and ASGI at ``concurrency`` requests in flight.
+
+    Each page is requested ``requests`` times in every mode of
+    ``THROUGHPUT_MODES``: through the WSGI handler from a pool of
+    ``concurrency`` threads, and through the ASGI handler from one event
+    loop, first with the sync views and then with the async ones. Requests
+    come from one signed-in user and skip the test client, so every
+    middleware and signal runs as it would behind a server. ``explore`` has
+    no URL and is left out.
+
+    Returns a list of result dictionaries, ready for ``json.dumps``.
+    """
+    subjects = pick_subjects()
+    if subjects is None:
+        return []
+    pages = [
+        (name, url, subjects["inbox_owner"] if name == "inbox" else subjects["viewer"])
+        for name, url, _ in build_scenarios(subjects)
+        if name != "explore" and (not only or name in only)
+    ]
+    results = []
+    for name, path, user in pages:
+        cookie = _session_cookie(user)
+        for mode, urlconf in THROUGHPUT_MODES:
+            cache.clear()
+            with override_settings(ROOT_URLCONF=urlconf):
+                started = time.perf_counter()
+                if mode == "wsgi":
+                    outcomes = _run_wsgi(path, cookie, concurrency, requests)
+                else:
+                    outcomes = asyncio.run(_run_asgi(path, cookie, concurrency, requests))
+                elapsed = time.perf_counter() - started
+            results.append(_throughput_result(name, mode, path, outcomes, elapsed))
+    return results
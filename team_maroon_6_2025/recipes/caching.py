@@ -0,0 +1,99 @@
+"""
+Versioned cache keys for rendered recipe fragments.
+
+Cached fragments are never deleted on write. Instead every key includes a
+version number, and ``recipes.signals`` bumps the version whenever the data
+behind a fragment changes:
+
+* a recipe's own version moves when the recipe, one of its images, one of
+  its comments or its denormalised counters change;
+* one shared category version moves when any category is edited.
+
+Stale fragments are simply never read again and age out on their own, so the
+scheme behaves the same on the local-memory, file and Redis backends, none of
+which can delete keys by prefix.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_PREFIX = "version"
+RECIPE_SCOPE = "recipe"
+CATEGORY_SCOPE = "category"
+
+
+def fragment_cache_seconds():
+    return getattr(settings, "RECIPE_FRAGMENT_CACHE_SECONDS", 3600)
+
+
+def _version_key(scope, pk=None):
+    return f"{VERSION_PREFIX}:{scope}" if pk is None else f"{VERSION_PREFIX}:{scope}:{pk}"
+
+
+def _initial_version():
+    # Seeded from the clock so a version that was evicted never reuses an old number
+    return time.time_ns() // 1000
+
+
+def get_version(scope, pk=None):
+    """Return the current version for ``scope`` (and ``pk``), creating it if missing."""
+    key = _version_key(scope, pk)
+    version = cache.get(key)
+    if version is None:
+        version = _initial_version()
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def get_versions(scope, pks):
+    """Return ``{pk: version}`` for many objects with a single cache round trip."""
+    keys = {pk: _version_key(scope, pk) for pk in pks}
+    found = cache.get_many(list(keys.values()))
+    return {pk: found[key] if key in found else get_version(scope, pk) for pk, key in keys.items()}
+
+
+def _increment(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _initial_version(), None)
+
+
+def bump_version(scope, pk=None):
+    """Invalidate every fragment keyed on ``scope`` (and ``pk``)."""
+    key = _version_key(scope, pk)
+    _increment(key)
+    # Bump again once the write is visible to other connections, so a fragment
+    # rendered from the old rows in the meantime is never served afterwards
+    transaction.on_commit(lambda: _increment(key))
+
+
+def bump_recipe_versions(recipe_ids):
+    for recipe_id in set(recipe_ids):
+        bump_version(RECIPE_SCOPE, recipe_id)
+
+
+def recipe_fragment_version(recipe):
+    """
+    Return the version string a recipe's fragments are keyed on.
+
+    Uses the value stored by ``attach_fragment_versions`` when there is one.
+    """
+    version = getattr(recipe, "fragment_version", None)
+    if version is None:
+        version = f"{recipe.pk}.{get_version(RECIPE_SCOPE, recipe.pk)}.{get_version(CATEGORY_SCOPE)}"
+    return version
+
+
+def attach_fragment_versions(recipes):
+    """Store ``fragment_version`` on each recipe, reading all versions at once."""
+    recipes = list(recipes)
+    versions = get_versions(RECIPE_SCOPE, [recipe.pk for recipe in recipes])
+    category_version = get_version(CATEGORY_SCOPE)
+    for recipe in recipes:
+        recipe.fragment_version = f"{recipe.pk}.{versions[recipe.pk]}.{category_version}"
+    return recipes
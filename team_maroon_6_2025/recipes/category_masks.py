@@ -0,0 +1,108 @@
+"""
+Category membership stored as a bitset on ``Recipe``.
+
+Every ``Category`` owns a stable ``bit`` and ``Recipe.category_mask`` has
+that bit set for each category the recipe is in. Category filters then
+become one bitwise comparison on the recipe row, with no join through the
+``categories`` table and no ``DISTINCT``: a recipe that must be in
+``required`` and in none of ``excluded`` is one whose
+``category_mask & (required | excluded)`` equals ``required``.
+
+The ``Recipe.categories`` ``m2m_changed`` signal in ``recipes.signals`` calls
+``refresh_category_masks`` for the recipes it touches, and deleting a
+category clears its bit with ``clear_category_bit``. Bulk writes that bypass
+the signals, such as the seeder, finish with ``rebuild_category_masks``.
+"""
+
+from collections import defaultdict
+
+from django.db.models import F
+
+from recipes.category_registry import get_registry, reload_registry
+from recipes.models import Category, Recipe
+
+UPDATE_BATCH_SIZE = 500
+
+
+def bit_value(bit):
+    """The mask value of a category bit."""
+    return 1 << bit
+
+
+def category_bits(category_ids):
+    """Map each existing category id in ``category_ids`` to its mask value, from the category registry."""
+    registry = get_registry()
+    if any(pk not in registry.bits for pk in category_ids):
+        # The category may have been created in another process since this one loaded its registry
+        registry = reload_registry()
+    bits = registry.bits
+    return {pk: bits[pk] for pk in category_ids if pk in bits}
+
+
+def filter_by_categories(queryset, required=(), excluded=()):
+    """
+    Keep the recipes in every category of ``required`` and none of ``excluded``.
+
+    Both are category ids. A required category that does not exist matches
+    nothing; an excluded one that does not exist is ignored.
+    """
+    if not required and not excluded:
+        return queryset
+    bits = category_bits(set(required) | set(excluded))
+    if any(pk not in bits for pk in required):
+        return queryset.none()
+    required_mask = sum(set(bits[pk] for pk in required))
+    checked_mask = required_mask | sum(set(bits[pk] for pk in excluded if pk in bits))
+    return queryset.alias(category_bits=F("category_mask").bitand(checked_mask)).filter(
+        category_bits=required_mask
+    )
+
+
+def _set_masks(masks):
+    """Write ``{recipe_id: mask}`` with one ``UPDATE`` per distinct mask."""
+    by_mask = defaultdict(list)
+    for recipe_id, mask in masks.items():
+        by_mask[mask].append(recipe_id)
+    for mask, recipe_ids in by_mask.items():
+        for offset in range(0, len(recipe_ids), UPDATE_BATCH_SIZE):
+            Recipe.objects.filter(pk__in=recipe_ids[offset:offset + UPDATE_BATCH_SIZE]).update(category_mask=mask)
+
+
+def refresh_category_masks(recipe_ids):
+    """Recompute the category mask of the given recipes from their category rows."""
+    masks = dict.fromkeys(recipe_ids, 0)
+    if not masks:
+        return
+    memberships = (
+        Recipe.categories.through.objects.filter(recipe_id__in=masks)
+        .exclude(category__bit=None)
+        .values_list("recipe_id", "category__bit")
+    )
+    for recipe_id, bit in memberships:
+        masks[recipe_id] |= bit_value(bit)
+    _set_masks(masks)
+
+
+def clear_category_bit(bit):
+    """Unset ``bit`` on every recipe that has it, after its category is deleted."""
+    value = bit_value(bit)
+    Recipe.objects.alias(category_bits=F("category_mask").bitand(value)).filter(category_bits=value).update(
+        category_mask=F("category_mask") - value
+    )
+
+
+def rebuild_category_masks():
+    """
+    Recompute every recipe's category mask.
+
+    Runs one ``UPDATE`` per category rather than reading the memberships into
+    Python. Used by the seeder after its bulk inserts; returns the number of
+    categories applied.
+    """
+    Recipe.objects.update(category_mask=0)
+    categories = Category.objects.exclude(bit=None).values_list("pk", "bit")
+    for pk, bit in categories:
+        Recipe.objects.filter(
+            pk__in=Recipe.categories.through.objects.filter(category_id=pk).values("recipe_id")
+        ).update(category_mask=F("category_mask") + bit_value(bit))
+    return len(categories)
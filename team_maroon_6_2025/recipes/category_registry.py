@@ -0,0 +1,99 @@
+"""
+Process-wide registry of the recipe categories.
+
+The category table is a handful of rows that almost never change, yet the
+navbar, the recipe list, the explore page, ``RecipeForm`` and the category
+filters all need it on nearly every request. Each process loads it once into
+a ``CategoryRegistry``, with the meal/dietary split and each category's mask
+bit worked out up front, so reading categories costs no queries.
+
+Saving or deleting a ``Category`` bumps a version in the shared cache (see
+``recipes.signals``). Every read compares that version with the one the
+registry was loaded at, so all workers reload on their next request after a
+change. A cache that is not shared between processes (the default
+local-memory one) only reaches the process that made the change, so a
+registry is also reloaded once it is ``CATEGORY_REGISTRY_MAX_AGE_SECONDS``
+old. Lookups that miss a category id call ``reload_registry`` so a category
+created elsewhere is found straight away. The ``Category`` instances are
+shared between requests and must be treated as read-only.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+
+from recipes.caching import bump_version, get_version
+from recipes.models import Category
+
+REGISTRY_SCOPE = "category_registry"
+
+# Category keys offered as meals in the navbar; the rest are dietary tags
+MEAL_KEYS = ("breakfast", "lunch", "dinner", "dessert")
+
+_lock = threading.Lock()
+_current = None
+
+
+def max_age_seconds():
+    return getattr(settings, "CATEGORY_REGISTRY_MAX_AGE_SECONDS", 300)
+
+
+class CategoryRegistry:
+    """
+    Every category, loaded once.
+
+    Attributes:
+        all (tuple): Every category, ordered by label.
+        meal (tuple): The meal categories, ordered by label.
+        dietary (tuple): The other categories, ordered by label.
+        by_id (dict): ``{category_id: category}``.
+        bits (dict): ``{category_id: mask value}`` for ``Recipe.category_mask``.
+        version: The cache version the registry was loaded at.
+    """
+
+    def __init__(self, categories=(), version=None):
+        self.all = tuple(sorted(categories, key=lambda category: category.label))
+        self.meal = tuple(category for category in self.all if category.key in MEAL_KEYS)
+        self.dietary = tuple(category for category in self.all if category.key not in MEAL_KEYS)
+        self.by_id = {category.pk: category for category in self.all}
+        self.bits = {category.pk: 1 << category.bit for category in self.all if category.bit is not None}
+        self.version = version
+        self.loaded_at = time.monotonic()
+
+    @classmethod
+    def load(cls, version=None):
+        return cls(Category.objects.all(), version)
+
+    def choices(self):
+        """``(id, label)`` pairs for a category form field."""
+        return [(category.pk, category.label) for category in self.all]
+
+
+def invalidate():
+    """Make every process reload its registry; called when a category is saved or deleted."""
+    bump_version(REGISTRY_SCOPE)
+
+
+def get_registry():
+    """
+    Return this process's registry, reloading it if the categories changed
+    since it was loaded or it is older than ``CATEGORY_REGISTRY_MAX_AGE_SECONDS``.
+    """
+    global _current
+    version = get_version(REGISTRY_SCOPE)
+    registry = _current
+    if registry is not None and registry.version == version and time.monotonic() - registry.loaded_at < max_age_seconds():
+        return registry
+    with _lock:
+        if _current is registry:
+            _current = CategoryRegistry.load(version)
+        return _current
+
+
+def reload_registry():
+    """Reload this process's registry now, e.g. when a lookup found no category for an id."""
+    global _current
+    with _lock:
+        _current = CategoryRegistry.load(get_version(REGISTRY_SCOPE))
+        return _current
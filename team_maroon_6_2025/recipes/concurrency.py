@@ -0,0 +1,99 @@
+"""
+Running independent ORM work concurrently from async views.
+
+Django's async ORM methods (``aget``, ``acount`` and so on) all hand their
+query to the one thread that holds the request's database connection, so
+awaiting several of them together still runs them one after another.
+``gather`` instead runs each function on one of ``ASYNC_QUERY_WORKERS``
+long-lived worker threads, on that thread's own connection, so independent
+queries overlap. Worker connections are released the way a request's are, by
+``close_if_unusable_or_obsolete``, so with a positive ``CONN_MAX_AGE`` each
+worker keeps its connection for the next call instead of reconnecting, and a
+process never holds more than ``ASYNC_QUERY_WORKERS`` extra connections.
+
+It falls back to running the functions in turn on the request's thread when
+``ASYNC_CONCURRENT_QUERIES`` is off (the default) or when that thread's
+connection is inside a transaction, whose uncommitted rows other connections
+cannot see (``ATOMIC_REQUESTS``, or a ``TestCase``).
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, connections
+
+from recipes import instrumentation
+
+
+_workers = None
+_workers_lock = threading.Lock()
+
+
+def concurrent_queries_enabled():
+    return getattr(settings, "ASYNC_CONCURRENT_QUERIES", False)
+
+
+def worker_count():
+    return getattr(settings, "ASYNC_QUERY_WORKERS", 4)
+
+
+def _executor():
+    global _workers
+    with _workers_lock:
+        if _workers is None:
+            _workers = ThreadPoolExecutor(max_workers=worker_count(), thread_name_prefix="recipes-gather")
+        return _workers
+
+
+def _can_run_concurrently():
+    return concurrent_queries_enabled() and not connection.in_atomic_block
+
+
+def _on_own_connection(call):
+    def run():
+        # Count the worker's queries towards the request, as the middleware does for its own thread
+        metrics = instrumentation.current_metrics()
+        try:
+            with ExitStack() as stack:
+                if metrics is not None:
+                    for alias_connection in connections.all():
+                        stack.enter_context(alias_connection.execute_wrapper(metrics))
+                return call()
+        finally:
+            for alias_connection in connections.all(initialized_only=True):
+                alias_connection.close_if_unusable_or_obsolete()
+    return run
+
+
+def _run_in_turn(calls):
+    return [call() for call in calls]
+
+
+async def gather(*calls):
+    """Run the zero-argument functions ``calls``, concurrently where possible, and return their results in order."""
+    if len(calls) > 1 and await sync_to_async(_can_run_concurrently)():
+        return list(await asyncio.gather(*(
+            sync_to_async(_on_own_connection(call), thread_sensitive=False, executor=_executor())()
+            for call in calls
+        )))
+    return await sync_to_async(_run_in_turn)(calls)
+
+
+async def load_user(request):
+    """
+    Resolve ``request.user`` without blocking the event loop.
+
+    The resolved user replaces the lazy ``request.user``, so the sync helpers
+    and templates the view calls afterwards do not load it a second time.
+    Requests built without ``AuthenticationMiddleware`` (such as a
+    ``RequestFactory`` request with ``user`` assigned) keep their user.
+    """
+    if not hasattr(request, "auser"):
+        return request.user
+    user = await request.auser()
+    request.user = user
+    return user
@@ -1,24 +1,37 @@
-from recipes.models import Category
+from django.conf import settings
+
+from recipes.category_registry import get_registry
+from recipes.pubsub import stream_enabled
+from recipes.viewer_state import viewer_state as get_viewer_state
 
 # Provided navbar search categories and current filter selections to all templates
 def navbar_search(request):
-    meal_keys = ['breakfast', 'lunch', 'dinner', 'dessert']
-    all_cats = Category.objects.order_by("label")
-    
-    meal_cats = [c for c in all_cats if c.key in meal_keys]
-    dietary_cats = [c for c in all_cats if c.key not in meal_keys]
+    registry = get_registry()
 
     current_meal = request.GET.get("meal", "")
     current_dietary = [int(x) for x in request.GET.getlist("dietary") if x.isdigit()]
     current_exclude = [int(x) for x in request.GET.getlist("exclude") if x.isdigit()]
 
     return {
-        "nav_meal_categories": meal_cats,
-        "nav_dietary_categories": dietary_cats,
-        "nav_all_categories": all_cats, 
+        "nav_meal_categories": registry.meal,
+        "nav_dietary_categories": registry.dietary,
+        "nav_all_categories": registry.all,
         
         "nav_selected_meal": int(current_meal) if current_meal.isdigit() else None,
         "nav_selected_dietary": current_dietary,
         "nav_selected_exclude": current_exclude,
         "nav_q": request.GET.get("q", ""),
-    }
\ No newline at end of file
+        "nav_ingredient": ", ".join(request.GET.getlist("ingredient")),
+        "nav_exclude_ingredient": ", ".join(request.GET.getlist("exclude_ingredient")),
+    }
+
+# Expose the per-request viewer state (favourites, likes, ratings, follows) to templates
+def viewer_state(request):
+    return {"viewer": get_viewer_state(request)}
+
+# Tell the navbar whether it may open the live notification stream or should poll instead
+def live_notifications(request):
+    return {
+        "notification_stream_enabled": stream_enabled(request),
+        "notification_poll_seconds": getattr(settings, "NOTIFICATION_POLL_SECONDS", 30),
+    }
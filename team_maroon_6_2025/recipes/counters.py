@@ -0,0 +1,110 @@
+"""
+Denormalised engagement counters stored on ``Recipe``.
+
+``favourites_total``, ``rating_sum``, ``rating_total``, ``rating_avg`` and
+``comment_total`` replace the per-query ``Count``/``Avg`` aggregates so list
+pages can sort on plain indexed columns. ``Recipe.save`` leaves them out of
+full saves, so only this module writes them. The model signals in ``recipes.signals`` call into this
+module from inside the writing transaction; ``recount_recipes`` rebuilds the
+columns from scratch and backs the ``recount_recipes`` management command.
+Because these are ``.update()`` calls, which send no model signals, every
+function here also bumps the cache version of the recipes it touches.
+"""
+
+from django.db.models import Count, F, FloatField, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+from recipes.caching import bump_recipe_versions
+from recipes.models import Comment, Recipe, RecipeRating, User
+
+
+def _count_subquery(queryset, field="pk"):
+    """Correlated ``COUNT`` over ``queryset`` for the outer recipe."""
+    return Coalesce(
+        Subquery(
+            queryset.filter(recipe_id=OuterRef("pk"))
+            .order_by()
+            .values("recipe_id")
+            .annotate(total=Count(field))
+            .values("total"),
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def _sum_subquery(queryset, field):
+    """Correlated ``SUM`` over ``queryset`` for the outer recipe."""
+    return Coalesce(
+        Subquery(
+            queryset.filter(recipe_id=OuterRef("pk"))
+            .order_by()
+            .values("recipe_id")
+            .annotate(total=Sum(field))
+            .values("total"),
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def rating_average():
+    """Average rating from the recipe's own ``rating_sum`` and ``rating_total``, 0 when unrated."""
+    return Coalesce(
+        Cast(F("rating_sum"), FloatField()) / NullIf(F("rating_total"), 0),
+        Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def adjust_comment_total(recipe_id, delta):
+    """Add ``delta`` to a recipe's comment counter."""
+    Recipe.objects.filter(pk=recipe_id).update(comment_total=F("comment_total") + delta)
+    bump_recipe_versions([recipe_id])
+
+
+def adjust_favourites_total(recipe_ids, delta):
+    """Add ``delta`` to the favourite counter of each recipe in ``recipe_ids``."""
+    Recipe.objects.filter(pk__in=recipe_ids).update(favourites_total=F("favourites_total") + delta)
+    bump_recipe_versions(recipe_ids)
+
+
+def refresh_favourites_totals(recipe_ids):
+    """Recompute the favourite counter for the given recipes."""
+    Recipe.objects.filter(pk__in=recipe_ids).update(
+        favourites_total=_count_subquery(User.favourites.through.objects.all())
+    )
+    bump_recipe_versions(recipe_ids)
+
+
+def refresh_rating_totals(recipe_ids):
+    """Recompute the rating sum, count and average for the given recipes."""
+    recipes = Recipe.objects.filter(pk__in=recipe_ids)
+    recipes.update(
+        rating_sum=_sum_subquery(RecipeRating.objects.all(), "rating"),
+        rating_total=_count_subquery(RecipeRating.objects.all()),
+    )
+    recipes.update(rating_avg=rating_average())
+    bump_recipe_versions(recipe_ids)
+
+
+def recount_recipes(queryset=None, invalidate=True):
+    """
+    Rebuild every counter column for ``queryset`` (all recipes by default).
+
+    Pass ``invalidate=False`` to skip the per-recipe cache version bumps when
+    the caller clears the whole cache anyway. Returns the number of recipes
+    updated.
+    """
+    if queryset is None:
+        queryset = Recipe.objects.all()
+    updated = queryset.update(
+        favourites_total=_count_subquery(User.favourites.through.objects.all()),
+        rating_sum=_sum_subquery(RecipeRating.objects.all(), "rating"),
+        rating_total=_count_subquery(RecipeRating.objects.all()),
+        comment_total=_count_subquery(Comment.objects.all()),
+    )
+    queryset.update(rating_avg=rating_average())
+    if invalidate:
+        bump_recipe_versions(queryset.values_list("pk", flat=True))
+    return updated
@@ -1,4 +1,5 @@
 from django import forms
+from recipes.category_registry import get_registry
 from recipes.models.recipe import Recipe, Category
 
 class RecipeForm(forms.ModelForm):
@@ -39,5 +40,8 @@ class RecipeForm(forms.ModelForm):
     # Initialise the form and configure the category field
     def __init__(self, *args, **kwargs): 
         super().__init__(*args, **kwargs)
+        # Choices come from the category registry so rendering the form runs no query;
+        # the queryset is only used to validate a submission
         self.fields['categories'].queryset = Category.objects.order_by('label')
+        self.fields['categories'].choices = get_registry().choices()
         self.fields['categories'].required = False 
\ No newline at end of file
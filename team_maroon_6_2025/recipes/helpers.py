@@ -1,19 +1,27 @@
 ### Helper function and classes go here.
 
-from django.db.models import Avg, Count
+import hashlib
 
-from recipes.models import Recipe, RecipeRating
+from django.core.cache import cache
+
+from recipes.models import Recipe
 
 RECIPE_ORDERING = {
     "newest": ("-created_at",),
     "favourites": ("-favourites_total", "-created_at"),
     "rating": ("-rating_avg", "-rating_total", "-created_at"),
     "comments": ("-comment_total", "-created_at"),
-    "title": ("title",)
+    "title": ("title",),
+    "relevance": ("search_rank", "-created_at"),
 }
 
-def base_recipe_queryset(*, include_comments = False, include_images = False):
-    prefetches = ["categories"]
+# How long a computed set of recipe rails is reused before being re-ranked
+RAIL_CACHE_SECONDS = 60
+
+# Card lists load categories and images through recipes.cards instead, so they
+# pass include_categories=False to skip the prefetch
+def base_recipe_queryset(*, include_comments = False, include_images = False, include_categories = True):
+    prefetches = ["categories"] if include_categories else []
     if include_comments:
         prefetches += ["comments", "comments__author"]
     if include_images:
@@ -22,26 +30,39 @@ def base_recipe_queryset(*, include_comments = False, include_images = False):
     return (
         Recipe.objects.select_related("author")
         .prefetch_related(*prefetches)
-        .annotate(
-            favourites_total=Count("favourited_by", distinct=True),
-            rating_avg=Avg("ratings__rating"),
-            rating_total=Count("ratings", distinct=True),
-            comment_total=Count("comments", distinct=True)
-        )
     )
 
-def attach_user_ratings(recipes, user):
-    if not user.is_authenticated:
-        return
+def recipe_rails(queryset, rails, *, size=3, cache_key=None):
+    """
+    Build several short "top N" rails (e.g. top rated, latest) from one queryset.
+
+    Each rail only ranks recipe ids, which is a bounded indexed read on the
+    counter columns. The ranking is shared through the cache under
+    ``cache_key`` and the union of ids is then loaded in a single query, so
+    the cost does not grow with the size of the recipe table.
+    """
+    ranking = cache.get(cache_key) if cache_key else None
+    if ranking is None:
+        ranking = {
+            name: list(queryset.order_by(*ordering).values_list("id", flat=True)[:size])
+            for name, ordering in rails.items()
+        }
+        if cache_key:
+            cache.set(cache_key, ranking, RAIL_CACHE_SECONDS)
 
-    recipes = list(recipes)
-    if not recipes: 
-        return
+    wanted = {pk for ids in ranking.values() for pk in ids}
+    recipes = base_recipe_queryset(include_categories=False).in_bulk(wanted)
+    return {
+        name: [recipes[pk] for pk in ids if pk in recipes]
+        for name, ids in ranking.items()
+    }
 
-    recipe_ids = {r.id for r in recipes}
-    rating_map = dict(
-        RecipeRating.objects.filter(user=user, recipe_id__in=recipe_ids)
-        .values_list("recipe_id", "rating")
+def filter_cache_key(prefix, request):
+    """Return a cache key that identifies the search filters in a request."""
+    params = sorted(
+        (key, value)
+        for key in ("q", "meal", "dietary", "exclude", "ingredient", "exclude_ingredient")
+        for value in request.GET.getlist(key)
     )
-    for recipe in recipes:
-        recipe.user_rating_value = rating_map.get(recipe.id)
+    digest = hashlib.md5(repr(params).encode()).hexdigest()
+    return f"{prefix}:{digest}"
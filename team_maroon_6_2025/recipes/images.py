@@ -0,0 +1,183 @@
+"""
+Derived copies of uploaded recipe images.
+
+``process_recipe_image`` turns one ``RecipeImage`` upload into:
+
+* the original, re-saved without EXIF metadata (camera, GPS position) and
+  rotated upright, under a new name so the upload survives a failed run,
+* a thumbnail that fits inside ``RECIPE_THUMBNAIL_SIZE``,
+* JPEG, WebP and (when Pillow was built with it) AVIF copies at each width
+  in ``RECIPE_IMAGE_WIDTHS``, narrower than the original only.
+
+The storage names are kept in ``RecipeImage.variants`` together with the
+original's dimensions, so templates can emit ``srcset`` lists and reserve the
+image's space before it loads. ``recipes.signals`` runs this after every
+upload; the ``process_recipe_images`` command backfills older images.
+"""
+
+import logging
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+from recipes.caching import bump_recipe_versions
+from recipes.models import RecipeImage
+
+logger = logging.getLogger(__name__)
+
+DERIVED_DIR = "derived"
+
+# JPEG has no alpha channel; transparent pixels are flattened onto this colour
+JPEG_BACKGROUND = (255, 255, 255)
+
+# Pillow save format and keyword arguments for every derived format
+FORMATS = {
+    "jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "avif": ("AVIF", {"quality": 60}),
+}
+
+
+def image_widths():
+    return tuple(getattr(settings, "RECIPE_IMAGE_WIDTHS", (320, 640, 960)))
+
+
+def thumbnail_size():
+    return tuple(getattr(settings, "RECIPE_THUMBNAIL_SIZE", (400, 400)))
+
+
+def available_formats():
+    """Return the derived formats this Pillow build can write."""
+    return [name for name in FORMATS if name == "jpeg" or features.check(name)]
+
+
+def _flatten(image):
+    """Composite an image with an alpha channel onto ``JPEG_BACKGROUND``."""
+    if image.mode != "RGBA":
+        return image.convert("RGB")
+    background = Image.new("RGB", image.size, JPEG_BACKGROUND)
+    background.paste(image, mask=image.getchannel("A"))
+    return background
+
+
+def _encode(image, image_format):
+    pillow_format, options = FORMATS[image_format]
+    if image_format == "jpeg" and image.mode != "RGB":
+        image = _flatten(image)
+    buffer = BytesIO()
+    image.save(buffer, pillow_format, **options)
+    return buffer.getvalue()
+
+
+def _derived_name(source_name, suffix, image_format):
+    directory, filename = posixpath.split(source_name)
+    stem = posixpath.splitext(filename)[0]
+    extension = "jpg" if image_format == "jpeg" else image_format
+    return posixpath.join(directory, DERIVED_DIR, f"{stem}-{suffix}.{extension}")
+
+
+def _strip_metadata(recipe_image, image, source_format):
+    """
+    Save a copy of the upload that carries no EXIF block and return its name.
+
+    The copy gets a new storage name; the caller deletes the original only
+    once the row points at the copy, so a failure part way leaves the upload
+    intact.
+    """
+    storage = recipe_image.image.storage
+    buffer = BytesIO()
+    if source_format in ("JPEG", "MPO"):
+        image.convert("RGB").save(buffer, "JPEG", quality=90, optimize=True)
+    else:
+        image.save(buffer, source_format)
+    return storage.save(recipe_image.image.name, ContentFile(buffer.getvalue()))
+
+
+def process_recipe_image(recipe_image):
+    """
+    Generate the derivatives for one image and record them on the model.
+
+    Returns False, leaving the row untouched, if the upload is missing or is
+    not an image Pillow can read.
+    """
+    if not recipe_image.image:
+        return False
+    storage = recipe_image.image.storage
+    try:
+        with recipe_image.image.open("rb") as handle:
+            source = Image.open(handle)
+            source_format = source.format
+            has_exif = bool(source.getexif())
+            image = ImageOps.exif_transpose(source)
+            image.load()
+    except (FileNotFoundError, OSError, UnidentifiedImageError, ValueError):
+        logger.warning("Could not process recipe image %s", recipe_image.pk)
+        return False
+
+    original_name = source_name = recipe_image.image.name
+    if has_exif:
+        source_name = _strip_metadata(recipe_image, image, source_format)
+
+    if image.mode not in ("RGB", "RGBA"):
+        has_alpha = "A" in image.getbands() or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+    variants = {"source": source_name}
+    thumbnail = ImageOps.contain(image, thumbnail_size())
+    variants["thumbnail"] = storage.save(
+        _derived_name(source_name, "thumb", "jpeg"), ContentFile(_encode(thumbnail, "jpeg"))
+    )
+
+    widths = [width for width in image_widths() if width < image.width] or [image.width]
+    for image_format in available_formats():
+        variants[image_format] = {}
+        for width in widths:
+            resized = image if width == image.width else image.resize(
+                (width, round(image.height * width / image.width)), Image.LANCZOS
+            )
+            variants[image_format][str(width)] = storage.save(
+                _derived_name(source_name, f"{width}w", image_format),
+                ContentFile(_encode(resized, image_format)),
+            )
+
+    recipe_image.image.name = source_name
+    recipe_image.width, recipe_image.height = image.width, image.height
+    recipe_image.variants = variants
+    recipe_image.processed_at = timezone.now()
+    if recipe_image.pk is not None:
+        # update() rather than save() so the post_save handler does not run again
+        RecipeImage.objects.filter(pk=recipe_image.pk).update(
+            image=source_name,
+            width=recipe_image.width,
+            height=recipe_image.height,
+            variants=variants,
+            processed_at=recipe_image.processed_at,
+        )
+        bump_recipe_versions([recipe_image.recipe_id])
+    # pk is None for unsaved templates, e.g. the seeder's shared placeholder images
+    if source_name != original_name:
+        storage.delete(original_name)
+    return True
+
+
+def derivative_names(recipe_image):
+    """Return the storage names of every derived file recorded for an image."""
+    names = [recipe_image.variants.get("thumbnail")]
+    for image_format in FORMATS:
+        names += recipe_image.variants.get(image_format, {}).values()
+    return [name for name in names if name]
+
+
+def delete_files(names):
+    storage = RecipeImage._meta.get_field("image").storage
+    for name in names:
+        storage.delete(name)
+
+
+def delete_derivatives(recipe_image):
+    """Remove every derived file recorded for an image."""
+    delete_files(derivative_names(recipe_image))
@@ -0,0 +1,264 @@
+"""
+Parsing recipe ingredient lines into ``RecipeIngredient`` rows.
+
+``Recipe.ingredients`` stays the free text the author typed, one ingredient
+per line. Every line is also parsed into a quantity, a unit and a
+normalised ingredient name and stored as a ``RecipeIngredient``, kept in
+step by the ``Recipe`` ``post_save`` signal and rebuilt in bulk by the
+``backfill_ingredients`` management command. Each word of every name is
+recorded as an ``IngredientWord``, so the ingredient filters of
+``filter_recipes`` match names on whole words ("chicken" finds "chicken
+breast", "milk" finds "semi skimmed milk") with index lookups rather than
+``icontains`` scans of every recipe's text.
+
+``normalize_name`` is also how search input is normalised, so "Tomatoes",
+"2 large ripe tomatoes, diced" and "tomato" all meet at ``tomato``.
+"""
+
+import re
+import unicodedata
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Count, Q
+
+from recipes import pantry
+from recipes.models import IngredientWord, Recipe, RecipeIngredient
+
+NAME_MAX_LENGTH = 100
+QUANTITY_LIMIT = Decimal(1_000_000)
+
+# Canonical unit for every spelling an author might use
+UNITS = {
+    "g": "g", "gram": "g", "grams": "g", "gr": "g",
+    "kg": "kg", "kilo": "kg", "kilos": "kg", "kilogram": "kg", "kilograms": "kg",
+    "mg": "mg",
+    "ml": "ml", "millilitre": "ml", "millilitres": "ml", "milliliter": "ml", "milliliters": "ml",
+    "l": "l", "litre": "l", "litres": "l", "liter": "l", "liters": "l",
+    "tsp": "tsp", "teaspoon": "tsp", "teaspoons": "tsp",
+    "tbsp": "tbsp", "tbs": "tbsp", "tablespoon": "tbsp", "tablespoons": "tbsp",
+    "cup": "cup", "cups": "cup",
+    "oz": "oz", "ounce": "oz", "ounces": "oz",
+    "lb": "lb", "lbs": "lb", "pound": "lb", "pounds": "lb",
+    "pinch": "pinch", "pinches": "pinch",
+    "dash": "dash", "dashes": "dash",
+    "clove": "clove", "cloves": "clove",
+    "can": "can", "cans": "can", "tin": "can", "tins": "can",
+    "slice": "slice", "slices": "slice",
+    "handful": "handful", "handfuls": "handful",
+    "bunch": "bunch", "bunches": "bunch",
+    "pack": "pack", "packs": "pack", "packet": "pack", "packets": "pack",
+    "leaf": "leaf", "leaves": "leaf",
+    "sprig": "sprig", "sprigs": "sprig",
+    "stalk": "stalk", "stalks": "stalk",
+}
+
+# Words that describe how an ingredient is prepared or sized, not what it is
+DESCRIPTORS = {
+    "a", "an", "of", "some", "about", "approx", "approximately",
+    "large", "medium", "small", "big", "extra",
+    "fresh", "freshly", "dried", "ripe", "frozen", "raw", "cooked", "whole",
+    "chopped", "diced", "minced", "sliced", "grated", "crushed", "peeled", "shredded",
+    "finely", "roughly", "thinly", "thickly", "softened", "melted", "beaten", "halved",
+    "optional", "to", "taste",
+}
+
+# Plurals the suffix rules get wrong, and words that only look plural
+_IRREGULAR = {
+    "leaves": "leaf", "halves": "half", "loaves": "loaf", "knives": "knife",
+    "molasses": "molasses", "asparagus": "asparagus", "couscous": "couscous",
+    "hummus": "hummus", "swiss": "swiss", "species": "species",
+}
+
+_FRACTIONS = {"½": "1/2", "⅓": "1/3", "⅔": "2/3", "¼": "1/4", "¾": "3/4", "⅛": "1/8"}
+_NUMBER = r"\d+\s+\d+/\d+|\d+/\d+|\d+(?:[.,]\d+)?"
+_QUANTITY_RE = re.compile(
+    rf"^(?P<quantity>{_NUMBER})(?:\s*(?:-|–|to)\s*(?:{_NUMBER}))?\s*(?P<rest>.*)$"
+)
+_UNIT_RE = re.compile(r"^(?P<unit>[a-z]+)\.?(?:\s+|$)(?P<rest>.*)$")
+_PARENTHESES_RE = re.compile(r"\([^)]*\)")
+_WORD_RE = re.compile(r"[a-z]+")
+
+
+@dataclass
+class ParsedIngredient:
+    """One ingredient line split into its parts."""
+
+    raw: str
+    quantity: Decimal | None
+    unit: str
+    name: str
+
+
+def ingredient_lines(text):
+    """Yield the non-empty lines of an ingredients field, without list bullets."""
+    for line in text.splitlines():
+        cleaned = line.strip().lstrip("-•*").strip()
+        if cleaned:
+            yield cleaned
+
+
+def _singular(word):
+    if word in _IRREGULAR:
+        return _IRREGULAR[word]
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith(("oes", "ches", "shes", "sses", "xes")):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith(("ss", "us", "is")) and len(word) > 3:
+        return word[:-1]
+    return word
+
+
+def normalize_name(text):
+    """
+    Return the lookup form of an ingredient name.
+
+    Lowercases, drops accents, anything in parentheses or after a comma and
+    preparation words, then makes the last word singular: "Ripe Tomatoes
+    (about 4), diced" becomes ``tomato``.
+    """
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode().lower()
+    text = _PARENTHESES_RE.sub(" ", text).split(",")[0]
+    words = [word for word in _WORD_RE.findall(text) if word not in DESCRIPTORS]
+    if not words:
+        return ""
+    words[-1] = _singular(words[-1])
+    return " ".join(words)[:NAME_MAX_LENGTH]
+
+
+def _quantity(value):
+    whole, _, fraction = value.replace(",", ".").partition(" ")
+    if "/" in whole:
+        whole, fraction = "0", whole
+    try:
+        total = Decimal(whole)
+        if fraction:
+            numerator, denominator = fraction.split("/")
+            total += Decimal(numerator) / Decimal(denominator)
+    except (InvalidOperation, ZeroDivisionError):
+        return None
+    # Anything larger will not fit the column and is not a real quantity anyway
+    return total.quantize(Decimal("0.001")) if total < QUANTITY_LIMIT else None
+
+
+def parse_ingredient(line):
+    """Split one ingredient line such as "1 ½ cups plain flour" into a ``ParsedIngredient``."""
+    text = line
+    for symbol, fraction in _FRACTIONS.items():
+        text = re.sub(rf"(\d)\s*{symbol}", rf"\1 {fraction}", text).replace(symbol, fraction)
+    quantity, unit = None, ""
+    text = text.strip()
+    match = _QUANTITY_RE.match(text)
+    if match:
+        quantity = _quantity(match["quantity"])
+        text = match["rest"]
+    unit_match = _UNIT_RE.match(text.lower())
+    # Without an amount only "pinch of salt"-style units count, so "can" or "slice" stay names
+    if unit_match and unit_match["unit"] in UNITS and (match or unit_match["rest"].startswith("of ")):
+        unit = UNITS[unit_match["unit"]]
+        text = text[len(text) - len(unit_match["rest"]):]
+    name = normalize_name(text) or normalize_name(line)
+    return ParsedIngredient(raw=line[:255], quantity=quantity, unit=unit, name=name)
+
+
+def parse_ingredients(text):
+    """Parse every line of an ingredients field, skipping lines with no ingredient name."""
+    return [parsed for parsed in map(parse_ingredient, ingredient_lines(text)) if parsed.name]
+
+
+def name_words(name):
+    """The words of an ingredient name, each made singular, for ``IngredientWord`` lookups."""
+    return {_singular(word) for word in name.split()}
+
+
+def _index_words(names):
+    IngredientWord.objects.bulk_create(
+        [IngredientWord(word=word, name=name) for name in set(names) for word in name_words(name)],
+        ignore_conflicts=True,
+    )
+
+
+def _rows(recipe_id, parsed):
+    return [
+        RecipeIngredient(
+            recipe_id=recipe_id,
+            position=position,
+            raw=ingredient.raw,
+            quantity=ingredient.quantity,
+            unit=ingredient.unit,
+            name=ingredient.name,
+        )
+        for position, ingredient in enumerate(parsed)
+    ]
+
+
+def sync_recipe_ingredients(recipe):
+    """
+    Bring a recipe's ``RecipeIngredient`` rows in line with its ingredients text.
+
+    Saves that leave the text unchanged cost one query and write nothing.
+    """
+    parsed = parse_ingredients(recipe.ingredients)
+    stored = list(recipe.parsed_ingredients.values_list("raw", flat=True))
+    if stored == [ingredient.raw for ingredient in parsed]:
+        return
+    recipe.parsed_ingredients.all().delete()
+    RecipeIngredient.objects.bulk_create(_rows(recipe.pk, parsed))
+    _index_words(ingredient.name for ingredient in parsed)
+    pantry.invalidate()
+
+
+def rebuild_ingredients(queryset=None, batch_size=500):
+    """
+    Re-parse the ingredients of every recipe in ``queryset`` (default: all).
+
+    Used by the ``backfill_ingredients`` command and the seeder. Returns the
+    number of recipes parsed.
+    """
+    if queryset is None:
+        queryset = Recipe.objects.all()
+    recipes = queryset.order_by("pk").values_list("pk", "ingredients")
+    total = 0
+    for offset in range(0, recipes.count(), batch_size):
+        batch = list(recipes[offset:offset + batch_size])
+        RecipeIngredient.objects.filter(recipe_id__in=[pk for pk, _ in batch]).delete()
+        rows = [row for pk, text in batch for row in _rows(pk, parse_ingredients(text))]
+        RecipeIngredient.objects.bulk_create(rows, batch_size=batch_size)
+        _index_words(row.name for row in rows)
+        total += len(batch)
+    pantry.invalidate()
+    return total
+
+
+def split_names(values):
+    """Normalise ingredient names given as repeated and/or comma-separated query values."""
+    names = []
+    for value in values:
+        for part in value.split(","):
+            name = normalize_name(part)
+            if name and name not in names:
+                names.append(name)
+    return names
+
+
+def matching_names(name):
+    """The ingredient names containing every word of ``name``, as a subquery."""
+    words = name_words(name)
+    names = IngredientWord.objects.filter(word__in=words).values("name")
+    if len(words) > 1:
+        names = names.annotate(matched=Count("word")).filter(matched=len(words)).values("name")
+    return names
+
+
+def recipes_using(*names):
+    """
+    Ids of the recipes that use any of the normalised ingredient ``names``, as a subquery.
+
+    A name matches every ingredient containing all of its words, so "chicken"
+    covers "chicken breast" and "milk" covers "semi skimmed milk".
+    """
+    condition = Q(pk__in=[])
+    for name in names:
+        condition |= Q(name__in=matching_names(name))
+    return RecipeIngredient.objects.filter(condition).values("recipe_id")
@@ -0,0 +1,298 @@
+"""
+Per-request query and render metrics.
+
+``RequestMetrics`` is installed as a database execute wrapper for the length
+of a request by ``recipes.middleware.QueryInstrumentationMiddleware``. It
+counts queries, sums their time and groups them by SQL text, so that a
+statement repeated once per row (an N+1 pattern) shows up as a duplicate.
+Template render time is measured by timing the outermost
+``Template.render`` call of the request.
+
+Each request's metrics are sent to the browser as a ``Server-Timing``
+header, logged as JSON on the ``recipes.queries`` logger, added to the
+totals shown on the staff query dashboard, and checked against the
+per-URL-name budgets in ``QUERY_BUDGETS``.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.base import Template
+from django.urls import URLResolver, get_resolver
+
+logger = logging.getLogger("recipes.queries")
+
+STATS_CACHE_KEY = "query_stats"
+
+_active = ContextVar("recipes_request_metrics", default=None)
+_render_depth = ContextVar("recipes_render_depth", default=0)
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised in strict mode when a view runs more queries than its budget allows."""
+
+
+def instrumentation_enabled():
+    return getattr(settings, "QUERY_INSTRUMENTATION", True)
+
+
+def duplicate_threshold():
+    return getattr(settings, "QUERY_DUPLICATE_THRESHOLD", 3)
+
+
+def slow_query_threshold():
+    """Return the slow-query threshold in milliseconds, or None when the slow-query log is off."""
+    if not getattr(settings, "SLOW_QUERY_LOG", False):
+        return None
+    return getattr(settings, "SLOW_QUERY_THRESHOLD_MS", 100)
+
+
+def query_budget(url_name):
+    """Return the query budget for a URL name, or None when it has none."""
+    budgets = getattr(settings, "QUERY_BUDGETS", {})
+    return budgets.get(url_name, getattr(settings, "QUERY_BUDGET_DEFAULT", None))
+
+
+class RequestMetrics:
+    """
+    Queries, SQL time and render time collected for one request.
+
+    Attributes:
+        url_name (str): The resolved URL name, or None for unrouted requests.
+        queries (int): Number of SQL statements executed.
+        sql_ms (float): Total time spent executing them.
+        template_ms (float): Time spent rendering templates.
+        total_ms (float): Time spent in the view and inner middleware.
+        statements (Counter): Executions per distinct SQL text.
+        slow (list): ``(sql, params, ms, alias)`` for statements over the
+            slow-query threshold, when the slow-query log is on.
+    """
+
+    def __init__(self):
+        self.url_name = None
+        self.queries = 0
+        self.sql_ms = 0.0
+        self.template_ms = 0.0
+        self.total_ms = 0.0
+        self.statements = Counter()
+        self._exact = Counter()
+        self.slow = []
+        self._slow_threshold = slow_query_threshold()
+        # Queries run concurrently by recipes.concurrency.gather share these metrics
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self.sql_ms += duration
+                self.queries += 1
+                if self._slow_threshold is not None and duration >= self._slow_threshold and not many:
+                    self.slow.append((sql, params, duration, context["connection"].alias))
+                self.statements[sql] += 1
+                if not many:
+                    self._exact[(sql, repr(params))] += 1
+
+    @property
+    def duplicates(self):
+        """SQL statements run at least ``QUERY_DUPLICATE_THRESHOLD`` times, most repeated first."""
+        threshold = duplicate_threshold()
+        return {sql: total for sql, total in self.statements.most_common() if total >= threshold}
+
+    @property
+    def exact_duplicates(self):
+        """Number of executions that repeated an earlier query with identical parameters."""
+        return sum(total - 1 for total in self._exact.values())
+
+    @property
+    def budget(self):
+        return query_budget(self.url_name)
+
+    @property
+    def over_budget(self):
+        return self.budget is not None and self.queries > self.budget
+
+    def server_timing(self):
+        return ", ".join([
+            f'sql;dur={self.sql_ms:.1f};desc="{self.queries} queries"',
+            f"tpl;dur={self.template_ms:.1f}",
+            f"app;dur={self.total_ms:.1f}",
+        ])
+
+    def as_dict(self):
+        return {
+            "url_name": self.url_name,
+            "queries": self.queries,
+            "sql_ms": round(self.sql_ms, 2),
+            "template_ms": round(self.template_ms, 2),
+            "total_ms": round(self.total_ms, 2),
+            "exact_duplicates": self.exact_duplicates,
+            "duplicates": [{"sql": sql[:300], "count": total} for sql, total in list(self.duplicates.items())[:5]],
+            "budget": self.budget,
+        }
+
+
+def current_metrics():
+    """Return the metrics of the request being handled, if any."""
+    return _active.get()
+
+
+def start(metrics):
+    return _active.set(metrics)
+
+
+def stop(token):
+    _active.reset(token)
+
+
+def _timed_render(render):
+    def timed(self, context):
+        metrics = _active.get()
+        depth = _render_depth.get()
+        if metrics is None or depth:
+            return render(self, context)
+        token = _render_depth.set(depth + 1)
+        started = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            metrics.template_ms += (time.perf_counter() - started) * 1000
+            _render_depth.reset(token)
+    timed.recipes_instrumented = True
+    return timed
+
+
+def instrument_templates():
+    """Wrap ``Template.render`` once per process so render time can be measured."""
+    if not getattr(Template.render, "recipes_instrumented", False):
+        Template.render = _timed_render(Template.render)
+
+
+# Integer totals kept per URL name; the millisecond sums are stored in microseconds
+STAT_FIELDS = ("requests", "queries", "sql_us", "template_us", "over_budget", "with_duplicates")
+STAT_MARKS = ("max_queries",)
+
+
+def _stats_key(url_name, field):
+    return f"{STATS_CACHE_KEY}:{url_name}:{field}"
+
+
+def _stats_keys(url_names):
+    return {
+        (url_name, field): _stats_key(url_name, field)
+        for url_name in url_names
+        for field in STAT_FIELDS + STAT_MARKS
+    }
+
+
+def _add(key, delta):
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key, delta)
+
+
+def _raise_to(key, value):
+    """Raise a high-water mark, re-checking after each write so a concurrent lower write cannot stick."""
+    current = cache.get(key, 0)
+    while current < value:
+        cache.set(key, value, None)
+        current = cache.get(key, 0)
+
+
+def record_stats(metrics):
+    """
+    Add one request's metrics to the per-URL-name totals kept for the dashboard.
+
+    Every total is its own cache key updated with ``cache.incr``, so
+    concurrent requests, threads or worker processes never overwrite each
+    other's counts.
+    """
+    if not getattr(settings, "QUERY_STATS_ENABLED", True) or metrics.url_name is None:
+        return
+    values = {
+        "requests": 1,
+        "queries": metrics.queries,
+        "sql_us": round(metrics.sql_ms * 1000),
+        "template_us": round(metrics.template_ms * 1000),
+        "over_budget": int(metrics.over_budget),
+        "with_duplicates": int(bool(metrics.duplicates)),
+    }
+    for field, delta in values.items():
+        if delta:
+            _add(_stats_key(metrics.url_name, field), delta)
+    _raise_to(_stats_key(metrics.url_name, "max_queries"), metrics.queries)
+
+
+def _url_names(patterns=None):
+    """Every URL name in the project's URLconf, including namespaced includes."""
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    names = set()
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            names |= _url_names(pattern.url_patterns)
+        elif pattern.name:
+            names.add(pattern.name)
+    return names
+
+
+def query_stats():
+    """
+    Return the dashboard rows, heaviest views first.
+
+    Each row has the URL name, request count, average and maximum queries,
+    average SQL and template time, budget, and how many requests went over
+    budget or ran duplicate queries.
+    """
+    url_names = _url_names()
+    keys = _stats_keys(url_names)
+    totals = cache.get_many(keys.values())
+    rows = []
+    for url_name in url_names:
+        entry = {field: totals.get(keys[url_name, field], 0) for field in STAT_FIELDS + STAT_MARKS}
+        if not entry["requests"]:
+            continue
+        requests = entry["requests"]
+        rows.append({
+            "url_name": url_name,
+            "requests": requests,
+            "avg_queries": round(entry["queries"] / requests, 1),
+            "max_queries": entry["max_queries"],
+            "avg_sql_ms": round(entry["sql_us"] / requests / 1000, 2),
+            "avg_template_ms": round(entry["template_us"] / requests / 1000, 2),
+            "budget": query_budget(url_name),
+            "over_budget": entry["over_budget"],
+            "with_duplicates": entry["with_duplicates"],
+        })
+    return sorted(rows, key=lambda row: row["avg_queries"], reverse=True)
+
+
+def reset_stats():
+    cache.delete_many(_stats_keys(_url_names()).values())
+
+
+def report(metrics):
+    """Log, record and budget-check one finished request."""
+    record_stats(metrics)
+    if metrics.over_budget:
+        level = logging.WARNING
+    elif metrics.duplicates:
+        level = logging.INFO
+    else:
+        level = logging.DEBUG
+    logger.log(level, json.dumps(metrics.as_dict()))
+    if metrics.over_budget and getattr(settings, "QUERY_BUDGETS_STRICT", False):
+        raise QueryBudgetExceeded(
+            f"{metrics.url_name} ran {metrics.queries} queries, over its budget of {metrics.budget}"
+        )
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from recipes.ingredients import rebuild_ingredients
+from recipes.models import Recipe
+
+class Command(BaseCommand):
+    """
+    Management command to re-parse recipe ingredients into RecipeIngredient rows.
+
+    Recipe saves keep the parsed rows current, so this is only needed after
+    bulk writes that bypass model signals (``bulk_create``, raw SQL) or after
+    the parser in ``recipes.ingredients`` changes.
+
+    Attributes:
+        help (str): Short description displayed when running
+            `python manage.py help backfill_ingredients`.
+    """
+
+    help = 'Parses recipe ingredients into the structured ingredient table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "ids",
+            nargs="*",
+            type=int,
+            help="Only re-parse these recipe ids (defaults to every recipe).",
+        )
+        parser.add_argument("--batch-size", type=int, default=500, help="Recipes per batch (default 500).")
+
+    def handle(self, *args, **options):
+        """Re-parse the selected recipes and report how many were processed."""
+        queryset = Recipe.objects.all()
+        if options["ids"]:
+            queryset = queryset.filter(pk__in=options["ids"])
+        parsed = rebuild_ingredients(queryset, batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Parsed the ingredients of {parsed} recipes."))
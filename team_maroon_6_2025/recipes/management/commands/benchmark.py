@@ -0,0 +1,141 @@
+import argparse
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from recipes.benchmarking import compare_index_plans, compare_throughput, run_benchmarks
+from recipes.models import Recipe
+from recipes.seeding import Seeder
+
+def positive_int(value):
+    """argparse type for counts that must be at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+class Command(BaseCommand):
+    """
+    Management command to benchmark the hot pages against a seeded dataset.
+
+    By default it creates a throwaway test database, seeds it at the chosen
+    scale with ``recipes.seeding.Seeder``, requests ``recipe_list``,
+    ``dashboard``, ``explore``, ``recipe_detail``, ``profile_page`` and
+    ``inbox`` as a signed-in user, prints one JSON document with the p50/p95
+    latency, query count and rows read for each page, and drops the database
+    again. ``--keepdb`` keeps the seeded database for the next run, and
+    ``--in-place`` benchmarks the configured database without seeding.
+    ``--indexes`` reports each composite index's query plan and timing with
+    and without the index instead; it drops and recreates indexes, so only
+    combine it with ``--in-place`` on a disposable database.
+    ``--throughput`` instead sends ``--requests`` requests per page,
+    ``--concurrency`` at a time, through the WSGI handler and the ASGI
+    handler (with the sync and the async views) and reports requests per
+    second for each.
+
+    Attributes:
+        help (str): Short description displayed when running
+            `python manage.py help benchmark`.
+    """
+
+    help = 'Seeds a dataset and reports latency, queries and rows for the hot pages as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=2000, help="Users to seed (default 2000).")
+        parser.add_argument("--recipes", type=int, default=5000, help="Recipes to seed (default 5000).")
+        parser.add_argument("--ratings", type=int, default=20000, help="Ratings to seed (default 20000).")
+        parser.add_argument("--comments", type=int, default=10000, help="Comments to seed (default 10000).")
+        parser.add_argument("--follows", type=int, default=20, help="Average follows per user (default 20).")
+        parser.add_argument("--favourites", type=int, default=10, help="Average favourites per user (default 10).")
+        parser.add_argument("--follow-requests", type=int, default=2000, help="Follow requests to seed (default 2000).")
+        parser.add_argument("--shopping-items", type=int, default=10, help="Average shopping items per user (default 10).")
+        parser.add_argument("--iterations", type=positive_int, default=20, help="Timed requests per page (default 20).")
+        parser.add_argument("--warmup", type=int, default=2, help="Untimed requests per page (default 2).")
+        parser.add_argument("--only", nargs="*", default=None, help="Only benchmark these pages.")
+        parser.add_argument("--seed", type=int, default=1, help="Random seed for the dataset (default 1).")
+        parser.add_argument("--output", default=None, help="Write the JSON report to this file as well.")
+        parser.add_argument(
+            "--indexes",
+            action="store_true",
+            help="Compare query plans and timings with and without each composite index instead.",
+        )
+        parser.add_argument(
+            "--throughput",
+            action="store_true",
+            help="Compare requests per second under WSGI and ASGI instead.",
+        )
+        parser.add_argument("--concurrency", type=positive_int, default=8, help="Requests in flight for --throughput (default 8).")
+        parser.add_argument("--requests", type=positive_int, default=200, help="Requests per page and mode for --throughput (default 200).")
+        parser.add_argument("--keepdb", action="store_true", help="Keep and reuse the seeded benchmark database.")
+        parser.add_argument(
+            "--in-place",
+            action="store_true",
+            help="Benchmark the configured database as it is, without seeding.",
+        )
+
+    def handle(self, *args, **options):
+        """Seed a dataset if needed, run the benchmarks and print the JSON report."""
+        if options["in_place"]:
+            report = self.benchmark(options)
+        else:
+            report = self.benchmark_seeded(options)
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as handle:
+                handle.write(output + "\n")
+        self.stdout.write(output)
+
+    def benchmark_seeded(self, options):
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options["keepdb"])
+        try:
+            if not Recipe.objects.exists():
+                Seeder(
+                    users=options["users"],
+                    recipes=options["recipes"],
+                    ratings=options["ratings"],
+                    comments=options["comments"],
+                    follows=options["follows"],
+                    favourites=options["favourites"],
+                    follow_requests=options["follow_requests"],
+                    shopping_items=options["shopping_items"],
+                    image_pool=0,
+                    seed=options["seed"],
+                    log=lambda message: self.stderr.write(message),
+                ).run()
+            return self.benchmark(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options["keepdb"])
+            teardown_test_environment()
+
+    def benchmark(self, options):
+        if options["indexes"]:
+            return {
+                "database": connection.vendor,
+                "iterations": options["iterations"],
+                "indexes": compare_index_plans(iterations=options["iterations"]),
+            }
+        if options["throughput"]:
+            return {
+                "database": connection.vendor,
+                "concurrency": options["concurrency"],
+                "requests": options["requests"],
+                "throughput": compare_throughput(
+                    concurrency=options["concurrency"],
+                    requests=options["requests"],
+                    only=options["only"],
+                ),
+            }
+        return {
+            "database": connection.vendor,
+            "iterations": options["iterations"],
+            "pages": run_benchmarks(
+                iterations=options["iterations"],
+                warmup=options["warmup"],
+                only=options["only"],
+            ),
+        }
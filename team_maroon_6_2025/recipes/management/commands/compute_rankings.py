@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from recipes.rankings import compute_rankings, ranking_size
+
+class Command(BaseCommand):
+    """
+    Management command to recompute the trending and per-category rankings.
+
+    Intended to run from cron more often than ``RANKING_STALE_AFTER``, e.g.
+    every five minutes, so the explore page always reads a fresh ranking.
+
+    Attributes:
+        help (str): Short description displayed when running
+            `python manage.py help compute_rankings`.
+    """
+
+    help = 'Recomputes the precomputed trending and per-category recipe rankings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--size",
+            type=int,
+            default=None,
+            help=f"Recipes kept per ranking (defaults to RANKING_SIZE, currently {ranking_size()}).",
+        )
+
+    def handle(self, *args, **options):
+        """Recompute the rankings and report how many slots were written."""
+        written = compute_rankings(size=options["size"])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} ranking slots."))
@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from recipes.notifications import prune_notifications
+
+class Command(BaseCommand):
+    """
+    Management command to delete notifications past their retention period.
+
+    Removes every notification older than ``NOTIFICATION_RETENTION_DAYS`` and
+    read notifications older than ``NOTIFICATION_READ_RETENTION_DAYS``, then
+    recounts the unread totals of the users affected. Intended to run daily
+    from cron so the notification table and inboxes stay small.
+
+    Attributes:
+        help (str): Short description displayed when running
+            `python manage.py help prune_notifications`.
+    """
+
+    help = 'Deletes notifications older than the configured retention periods'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=getattr(settings, "NOTIFICATION_RETENTION_DAYS", 90),
+            help="Delete every notification older than this many days.",
+        )
+        parser.add_argument(
+            "--read-days",
+            type=int,
+            default=getattr(settings, "NOTIFICATION_READ_RETENTION_DAYS", None),
+            help="Delete read notifications older than this many days.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows deleted per transaction.")
+
+    def handle(self, *args, **options):
+        """Prune expired notifications and report how many were deleted."""
+        now = timezone.now()
+        read_days = options["read_days"]
+        deleted = prune_notifications(
+            older_than=now - timedelta(days=options["days"]),
+            read_older_than=now - timedelta(days=read_days) if read_days is not None else None,
+            batch_size=options["batch_size"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} notifications."))
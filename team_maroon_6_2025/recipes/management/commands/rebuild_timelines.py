@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from recipes.models import User
+from recipes.timeline import rebuild_all_timelines, rebuild_timeline
+
+class Command(BaseCommand):
+    """
+    Management command to rebuild users' materialised following feeds.
+
+    Timelines are maintained as recipes are posted and users follow each
+    other, so this is only needed after bulk imports that bypass model
+    signals, or after changing ``TIMELINE_FANOUT_LIMIT``/``TIMELINE_MAX_DEPTH``.
+
+    Attributes:
+        help (str): Short description displayed when running
+            `python manage.py help rebuild_timelines`.
+    """
+
+    help = 'Rebuilds the materialised following feed for users'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "usernames",
+            nargs="*",
+            help="Only rebuild these users' timelines (defaults to everyone).",
+        )
+
+    def handle(self, *args, **options):
+        """Rebuild each selected user's timeline, or every timeline in bulk."""
+        if not options["usernames"]:
+            written = rebuild_all_timelines()
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt all timelines ({written} entries)."))
+            return
+        users = User.objects.filter(username__in=options["usernames"])
+        rebuilt = 0
+        for user in users.iterator():
+            rebuild_timeline(user)
+            rebuilt += 1
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} timelines."))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from recipes.counters import recount_recipes
+from recipes.models import Recipe
+
+class Command(BaseCommand):
+    """
+    Management command to rebuild the denormalised counters on Recipe.
+
+    Recomputes ``favourites_total``, ``rating_sum``, ``rating_total``,
+    ``rating_avg`` and ``comment_total`` from the underlying favourite, rating and comment rows.
+    Run it after bulk imports that bypass model signals, or whenever the
+    counters are suspected to have drifted.
+
+    Attributes:
+        help (str): Short description displayed when running
+            `python manage.py help recount_recipes`.
+    """
+
+    help = 'Recomputes favourite, rating and comment counters for recipes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "ids",
+            nargs="*",
+            type=int,
+            help="Only recount these recipe ids (defaults to every recipe).",
+        )
+
+    def handle(self, *args, **options):
+        """Recount the selected recipes and report how many were updated."""
+        queryset = Recipe.objects.all()
+        if options["ids"]:
+            queryset = queryset.filter(pk__in=options["ids"])
+        updated = recount_recipes(queryset)
+        self.stdout.write(self.style.SUCCESS(f"Recounted {updated} recipes."))
@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from recipes.task_queue import queue_stats, run_pending
+
+class Command(BaseCommand):
+    """
+    Management command that runs queued background tasks.
+
+    Polls the ``Task`` table and runs due tasks in batches until stopped.
+    Several workers may run at once; each task is claimed by exactly one.
+    ``--once`` drains what is due and exits (useful from cron), and
+    ``--stats`` prints the queue depth without running anything.
+
+    Attributes:
+        help (str): Short description displayed when running
+            `python manage.py help run_tasks`.
+    """
+
+    help = 'Runs queued background tasks (thumbnails, notifications, counters, search index)'
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Run every due task, then exit.")
+        parser.add_argument("--stats", action="store_true", help="Print queue depth and exit.")
+        parser.add_argument("--batch", type=int, default=100, help="Tasks claimed per poll (default 100).")
+        parser.add_argument("--sleep", type=float, default=1.0, help="Seconds to wait when the queue is empty.")
+
+    def handle(self, *args, **options):
+        """Run the worker loop, a single drain, or print statistics."""
+        if options["stats"]:
+            self._print_stats()
+            return
+
+        total_ok = total_failed = 0
+        try:
+            while True:
+                succeeded, failed = run_pending(options["batch"])
+                total_ok += succeeded
+                total_failed += failed
+                if succeeded or failed:
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(options["sleep"])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"Ran {total_ok} tasks ({total_failed} failed)."))
+
+    def _print_stats(self):
+        stats = queue_stats()
+        self.stdout.write(
+            f"pending={stats['pending']} running={stats['running']} failed={stats['failed']} "
+            f"oldest_pending={stats['oldest_pending'] or '-'}"
+        )
+        for name, counts in sorted(stats["by_name"].items()):
+            summary = " ".join(f"{status}={total}" for status, total in sorted(counts.items()))
+            self.stdout.write(f"  {name}: {summary}")
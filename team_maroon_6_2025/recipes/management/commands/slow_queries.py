@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+
+from recipes.models import SlowQuery
+from recipes.slow_queries import top_offenders
+
+ORDERINGS = {"total": "total_ms", "max": "max_ms", "calls": "calls"}
+
+class Command(BaseCommand):
+    """
+    Management command to print the worst entries of the slow-query log.
+
+    Lists the ``SlowQuery`` fingerprints recorded while ``SLOW_QUERY_LOG`` was
+    on, worst first, with their timings, the view and filter parameters that
+    last produced them and, with ``--plans``, their ``EXPLAIN`` output.
+    ``--full-scans`` keeps only queries whose plan reads a whole table.
+
+    Attributes:
+        help (str): Short description displayed when running
+            `python manage.py help slow_queries`.
+    """
+
+    help = 'Prints the slowest recorded query shapes with their plans and request parameters'
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=10, help="Number of queries to show (default 10).")
+        parser.add_argument(
+            "--order",
+            choices=sorted(ORDERINGS),
+            default="total",
+            help="Rank by total time, slowest single run, or number of slow runs.",
+        )
+        parser.add_argument("--full-scans", action="store_true", help="Only show queries that scan a whole table.")
+        parser.add_argument("--plans", action="store_true", help="Print the EXPLAIN output of each query.")
+        parser.add_argument("--reset", action="store_true", help="Delete the recorded queries and exit.")
+
+    def handle(self, *args, **options):
+        """Print the top offenders, or clear the log with ``--reset``."""
+        if options["reset"]:
+            deleted, _ = SlowQuery.objects.all().delete()
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} slow query records."))
+            return
+
+        offenders = top_offenders(
+            order=ORDERINGS[options["order"]],
+            limit=options["limit"],
+            full_scans_only=options["full_scans"],
+        )
+        if not offenders:
+            self.stdout.write("No slow queries recorded.")
+            return
+
+        for rank, query in enumerate(offenders, start=1):
+            scan = " FULL SCAN" if query.full_scan else ""
+            self.stdout.write(self.style.WARNING(
+                f"{rank}. {query.calls} calls, {query.total_ms:.1f} ms total, "
+                f"{query.mean_ms:.1f} ms mean, {query.max_ms:.1f} ms max{scan}"
+            ))
+            self.stdout.write(f"   view: {query.view_name or '-'}  params: {query.request_params or {}}")
+            self.stdout.write(f"   sql: {query.normalized_sql}")
+            if options["plans"] and query.plan:
+                for line in query.plan.splitlines():
+                    self.stdout.write(f"     {line}")
+        self.stdout.write(self.style.SUCCESS(f"Listed {len(offenders)} of {SlowQuery.objects.count()} recorded queries."))
@@ -0,0 +1,82 @@
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from recipes import instrumentation, slow_queries
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Measure the queries, SQL time and template time of every request.
+
+    Adds a ``Server-Timing`` header (shown in the browser's network panel),
+    attaches the ``RequestMetrics`` to the response as ``query_metrics`` for
+    tests, and hands them to ``recipes.slow_queries`` (when the slow-query log
+    is on) and to ``recipes.instrumentation.report`` for logging, the staff
+    dashboard and budget checks. Disabled entirely with
+    ``QUERY_INSTRUMENTATION = False``.
+
+    Under ASGI the middleware runs as a coroutine, wrapping the connections
+    of the thread the request's sync code runs in.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not instrumentation.instrumentation_enabled():
+            raise MiddlewareNotUsed
+        instrumentation.instrument_templates()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = instrumentation.RequestMetrics()
+        token = instrumentation.start(metrics)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                _wrap_connections(stack, metrics)
+                response = self.get_response(request)
+        finally:
+            instrumentation.stop(token)
+        return self._finish(request, response, metrics, started)
+
+    async def __acall__(self, request):
+        metrics = instrumentation.RequestMetrics()
+        token = instrumentation.start(metrics)
+        started = time.perf_counter()
+        stack = ExitStack()
+        try:
+            # Connections are per thread, so wrap (and later unwrap) them in
+            # the thread that sync_to_async runs this request's queries in
+            await sync_to_async(_wrap_connections)(stack, metrics)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(stack.close)()
+        finally:
+            instrumentation.stop(token)
+        return await sync_to_async(self._finish)(request, response, metrics, started)
+
+    def _finish(self, request, response, metrics, started):
+        metrics.total_ms = (time.perf_counter() - started) * 1000
+        match = getattr(request, "resolver_match", None)
+        metrics.url_name = match.url_name if match else None
+
+        response["Server-Timing"] = metrics.server_timing()
+        response.query_metrics = metrics
+        slow_queries.record_slow_queries(metrics, request)
+        instrumentation.report(metrics)
+        return response
+
+
+def _wrap_connections(stack, metrics):
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(metrics))
@@ -0,0 +1,30 @@
+from django.db import migrations
+
+FTS_TABLE = "recipes_recipe_fts"
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        "title, description, ingredients, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    schema_editor.execute(
+        f"INSERT INTO {FTS_TABLE} (rowid, title, description, ingredients) "
+        "SELECT id, title, description, ingredients FROM recipes_recipe"
+    )
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("recipes", "0024_merge_0022_merge_20251214_2029_0023_delete_recipeview"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, reverse_code=drop_search_index),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:14
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def _per_recipe(queryset, aggregate):
+    return Coalesce(
+        Subquery(
+            queryset.filter(recipe_id=OuterRef("pk"))
+            .order_by()
+            .values("recipe_id")
+            .annotate(total=aggregate)
+            .values("total"),
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def backfill_counters(apps, schema_editor):
+    Recipe = apps.get_model("recipes", "Recipe")
+    User = apps.get_model("recipes", "User")
+    RecipeRating = apps.get_model("recipes", "RecipeRating")
+    Comment = apps.get_model("recipes", "Comment")
+    Recipe.objects.update(
+        favourites_total=_per_recipe(User.favourites.through.objects.all(), Count("pk")),
+        rating_sum=_per_recipe(RecipeRating.objects.all(), Sum("rating")),
+        rating_total=_per_recipe(RecipeRating.objects.all(), Count("pk")),
+        comment_total=_per_recipe(Comment.objects.all(), Count("pk")),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0025_recipe_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='comment_total',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='favourites_total',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='rating_sum',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='rating_total',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['-favourites_total', '-created_at'], name='recipe_favourites_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['-comment_total', '-created_at'], name='recipe_comments_idx'),
+        ),
+        migrations.RunPython(backfill_counters, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_ingredients(apps, schema_editor):
+    from recipes.ingredients import parse_ingredients
+
+    Recipe = apps.get_model("recipes", "Recipe")
+    RecipeIngredient = apps.get_model("recipes", "RecipeIngredient")
+    RecipeIngredient.objects.bulk_create(
+        [
+            RecipeIngredient(
+                recipe_id=recipe_id,
+                position=position,
+                raw=parsed.raw,
+                quantity=parsed.quantity,
+                unit=parsed.unit,
+                name=parsed.name,
+            )
+            for recipe_id, text in Recipe.objects.values_list("pk", "ingredients").iterator()
+            for position, parsed in enumerate(parse_ingredients(text))
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0034_notification_coalescing'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeIngredient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField(default=0)),
+                ('raw', models.CharField(max_length=255)),
+                ('quantity', models.DecimalField(blank=True, decimal_places=3, max_digits=10, null=True)),
+                ('unit', models.CharField(blank=True, max_length=20)),
+                ('name', models.CharField(max_length=100)),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='parsed_ingredients', to='recipes.recipe')),
+            ],
+            options={
+                'ordering': ['position', 'id'],
+                'indexes': [models.Index(fields=['name', 'recipe'], name='ingredient_name_recipe_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_ingredients, reverse_code=migrations.RunPython.noop),
+    ]
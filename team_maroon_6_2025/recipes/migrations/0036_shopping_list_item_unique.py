@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:26
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def remove_duplicate_items(apps, schema_editor):
+    # Keep the oldest row of every (user, name) pair so the constraint can be added
+    ShoppingListItem = apps.get_model("recipes", "ShoppingListItem")
+    keep = (
+        ShoppingListItem.objects.order_by()
+        .values("user_id", "name")
+        .annotate(keep_id=Min("id"))
+        .values("keep_id")
+    )
+    ShoppingListItem.objects.exclude(id__in=keep).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0035_recipe_ingredient'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_items, reverse_code=migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='shoppinglistitem',
+            constraint=models.UniqueConstraint(fields=('user', 'name'), name='unique_shopping_list_item_per_user'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:33
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def assign_bits(apps, schema_editor):
+    # Existing categories take bits in creation order, then every mask is built
+    Category = apps.get_model("recipes", "Category")
+    Recipe = apps.get_model("recipes", "Recipe")
+    for bit, category in enumerate(Category.objects.order_by("pk")):
+        category.bit = bit
+        category.save(update_fields=["bit"])
+        Recipe.objects.filter(
+            pk__in=Recipe.categories.through.objects.filter(category_id=category.pk).values("recipe_id")
+        ).update(category_mask=F("category_mask") + (1 << bit))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0036_shopping_list_item_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='bit',
+            field=models.PositiveSmallIntegerField(editable=False, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='category_mask',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(assign_bits, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:02
+
+from django.db import migrations, models
+
+
+def reparse_and_index_words(apps, schema_editor):
+    # Names parsed before the singular fixes are rebuilt, then every word is indexed
+    from recipes.ingredients import name_words, parse_ingredients
+
+    Recipe = apps.get_model("recipes", "Recipe")
+    RecipeIngredient = apps.get_model("recipes", "RecipeIngredient")
+    IngredientWord = apps.get_model("recipes", "IngredientWord")
+    RecipeIngredient.objects.all().delete()
+    RecipeIngredient.objects.bulk_create(
+        [
+            RecipeIngredient(
+                recipe_id=recipe_id,
+                position=position,
+                raw=parsed.raw,
+                quantity=parsed.quantity,
+                unit=parsed.unit,
+                name=parsed.name,
+            )
+            for recipe_id, text in Recipe.objects.values_list("pk", "ingredients").iterator()
+            for position, parsed in enumerate(parse_ingredients(text))
+        ],
+        batch_size=500,
+    )
+    names = RecipeIngredient.objects.values_list("name", flat=True).distinct()
+    IngredientWord.objects.bulk_create(
+        [IngredientWord(word=word, name=name) for name in names for word in name_words(name)],
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0037_category_mask'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngredientWord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('word', models.CharField(max_length=100)),
+                ('name', models.CharField(max_length=100)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('word', 'name'), name='unique_ingredient_word_name')],
+            },
+        ),
+        migrations.RunPython(reparse_and_index_words, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-18 15:40
+
+from django.db import migrations, models
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+
+def backfill_rating_avg(apps, schema_editor):
+    Recipe = apps.get_model("recipes", "Recipe")
+    Recipe.objects.update(
+        rating_avg=Coalesce(
+            Cast(F("rating_sum"), FloatField()) / NullIf(F("rating_total"), 0),
+            Value(0.0),
+            output_field=FloatField(),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0038_ingredient_word'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='rating_avg',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['-rating_avg', '-rating_total', '-created_at'], name='recipe_rating_idx'),
+        ),
+        migrations.RunPython(backfill_rating_avg, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:05
+
+from django.db import migrations
+
+
+def retarget_comment_notifications(apps, schema_editor):
+    # Comment notifications now point at the recipe, so that they coalesce per recipe
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    Notification = apps.get_model("recipes", "Notification")
+    Comment = apps.get_model("recipes", "Comment")
+    comment_type = ContentType.objects.filter(app_label="recipes", model="comment").first()
+    if comment_type is None:
+        return
+    recipe_type, _ = ContentType.objects.get_or_create(app_label="recipes", model="recipe")
+    legacy = Notification.objects.filter(notification_type="comment", content_type=comment_type)
+    recipe_ids = dict(
+        Comment.objects.filter(pk__in=legacy.values("object_id")).values_list("pk", "recipe_id")
+    )
+    for notification in legacy.iterator():
+        notification.content_type = recipe_type
+        notification.object_id = recipe_ids.get(notification.object_id)
+        notification.save(update_fields=["content_type", "object_id"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('recipes', '0039_recipe_rating_avg'),
+    ]
+
+    operations = [
+        migrations.RunPython(retarget_comment_notifications, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:30
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_follower_totals(apps, schema_editor):
+    User = apps.get_model("recipes", "User")
+    followers = (
+        User.following.through.objects.filter(to_user_id=OuterRef("pk"))
+        .order_by()
+        .values("to_user_id")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    User.objects.update(follower_total=Coalesce(Subquery(followers, output_field=IntegerField()), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('recipes', '0040_comment_notifications_target_recipe'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='follower_total',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['follower_total'], name='user_follower_total_idx'),
+        ),
+        migrations.RunPython(backfill_follower_totals, reverse_code=migrations.RunPython.noop),
+    ]
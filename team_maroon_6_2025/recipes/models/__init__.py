@@ -2,3 +2,7 @@ from .recipe import *
 from .user import *
 from .shopping_list import *
 from .notification import *
+from .timeline import *
+from .ranking import *
+from .task import *
+from .slow_query import *
@@ -10,12 +10,16 @@ class Notification(models.Model):
 
     Fields:
         recipient: The user that received the notification.
-        sender: The user that instigated the notification.
+        sender: The user that instigated the notification (the latest one, once coalesced).
         notification_type (CharField): The type of notification sent.
         content_type: The content type of the object- used for notification filtering.
         object_id (PositiveIntegerField): The id of the notification in the corresponding content table.
         target_object: The target object that the notification should lead to when clicked.
         created_at (DateTimeField): The date and time the notification was created.
+        is_read (BooleanField): Whether the recipient has marked the notification as read.
+        read_at (DateTimeField): When it was marked as read.
+        actor_count (PositiveIntegerField): How many users' actions were coalesced into this notification.
+        recent_actors (JSONField): Ids of the latest actors, newest first.
     """
 
     TYPES = [
@@ -34,9 +38,29 @@ class Notification(models.Model):
     target_object = GenericForeignKey('content_type', 'object_id')
 
     created_at = models.DateTimeField(auto_now_add=True)
+    is_read = models.BooleanField(default=False)
+    read_at = models.DateTimeField(null=True, blank=True)
+    actor_count = models.PositiveIntegerField(default=1)
+    recent_actors = models.JSONField(default=list, blank=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # The inbox, unfiltered and filtered by type, newest first
+            models.Index(fields=['recipient', '-created_at'], name='notification_inbox_idx'),
+            models.Index(fields=['recipient', 'notification_type', '-created_at'], name='notification_inbox_type_idx'),
+            # Retention pruning
+            models.Index(fields=['created_at'], name='notification_created_idx'),
+        ]
+
+    @property
+    def actor_ids(self):
+        """Ids of the latest actors, newest first; rows written before coalescing only know their sender."""
+        return self.recent_actors or [self.sender_id]
+
+    @property
+    def other_actor_count(self):
+        return self.actor_count - 1
 
     # Return a readable description of the notification
     def __str__(self):
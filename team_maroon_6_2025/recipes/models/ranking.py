@@ -0,0 +1,52 @@
+from django.db import models
+
+class RecipeRanking(models.Model):
+    """
+    Model representing one slot in a precomputed recipe ranking.
+
+    Rows are rewritten by the ``compute_rankings`` management command (see
+    ``recipes.rankings``) so pages can read a ranked rail by primary key
+    instead of aggregating the recipe table on every request.
+
+    Fields:
+        kind (CharField): Which ranking the slot belongs to.
+        category: The category a per-category ranking is for, if any.
+        position (PositiveSmallIntegerField): The 0-based rank within the list.
+        recipe: The ranked recipe.
+        score (FloatField): The score the recipe was ranked by.
+        computed_at (DateTimeField): When the ranking was computed.
+    """
+
+    TRENDING = "trending"
+    CATEGORY = "category"
+    KINDS = [
+        (TRENDING, "Trending"),
+        (CATEGORY, "Top in category"),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KINDS)
+    category = models.ForeignKey(
+        "recipes.Category",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="rankings",
+    )
+    position = models.PositiveSmallIntegerField()
+    recipe = models.ForeignKey(
+        "recipes.Recipe",
+        on_delete=models.CASCADE,
+        related_name="rankings",
+    )
+    score = models.FloatField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["kind", "category", "position"]
+        indexes = [
+            models.Index(fields=["kind", "category", "position"], name="ranking_lookup_idx"),
+        ]
+
+    # Return a readable description of the ranking slot
+    def __str__(self):
+        return f"{self.kind} #{self.position + 1}: {self.recipe_id}"
@@ -1,6 +1,9 @@
 from django.conf import settings 
 from django.db import models
 
+# Bits available in Recipe.category_mask, a signed 64-bit integer
+CATEGORY_BITS = 63
+
 class Category(models.Model):
     """
     Model representing a recipe category.
@@ -8,9 +11,11 @@ class Category(models.Model):
     Fields:
         key (CharField): The unique key of the category.
         label (CharField): The label of the category.
+        bit (PositiveSmallIntegerField): The category's stable bit in Recipe.category_mask.
     """
     key = models.CharField(max_length = 50, unique=True)
     label = models.CharField(max_length = 100)
+    bit = models.PositiveSmallIntegerField(unique=True, null=True, editable=False)
 
     class Meta: 
         ordering = ["label"]
@@ -19,6 +24,16 @@ class Category(models.Model):
     def __str__(self): 
         return self.label
 
+    # Give a new category the lowest free bit of Recipe.category_mask
+    def save(self, *args, **kwargs):
+        if self.bit is None:
+            used = set(Category.objects.exclude(bit=None).values_list("bit", flat=True))
+            free = [bit for bit in range(CATEGORY_BITS) if bit not in used]
+            if not free:
+                raise ValueError(f"Recipe.category_mask has room for only {CATEGORY_BITS} categories.")
+            self.bit = free[0]
+        super().save(*args, **kwargs)
+
 class Recipe(models.Model):
     """
     Model representing a recipe created by a user.
@@ -32,6 +47,13 @@ class Recipe(models.Model):
         likes: Stores the users that have liked the recipe.
         created_at (DateTimeField): The date and time when the recipe was created.
         updated_at (DateTimeField): The date and time when the recipe was last updated.
+        favourites_total (IntegerField): Denormalised number of users that favourited the recipe.
+        rating_sum (IntegerField): Denormalised sum of all rating values left on the recipe.
+        rating_total (IntegerField): Denormalised number of ratings left on the recipe.
+        comment_total (IntegerField): Denormalised number of comments left on the recipe.
+        rating_avg (FloatField): Denormalised average rating, 0 when the recipe is unrated.
+        category_mask (BigIntegerField): Denormalised bitset of the recipe's categories,
+            with bit Category.bit set for each one.
     """
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -46,9 +68,45 @@ class Recipe(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Counters maintained by recipes.counters; repair with `manage.py recount_recipes`
+    favourites_total = models.IntegerField(default=0, editable=False)
+    rating_sum = models.IntegerField(default=0, editable=False)
+    rating_total = models.IntegerField(default=0, editable=False)
+    comment_total = models.IntegerField(default=0, editable=False)
+    rating_avg = models.FloatField(default=0, editable=False)
+
+    # Category membership as bits, maintained by recipes.category_masks
+    category_mask = models.BigIntegerField(default=0, editable=False)
+
+    # Columns only ever written with .update(); a full save() of an instance
+    # loaded earlier would otherwise write back stale values
+    DENORMALISED_FIELDS = frozenset(
+        {"favourites_total", "rating_sum", "rating_total", "comment_total", "rating_avg", "category_mask"}
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-favourites_total", "-created_at"], name="recipe_favourites_idx"),
+            models.Index(fields=["-comment_total", "-created_at"], name="recipe_comments_idx"),
+            models.Index(fields=["-rating_avg", "-rating_total", "-created_at"], name="recipe_rating_idx"),
+            # Newest-first listings and their keyset pages, site-wide and per author
+            models.Index(fields=["-created_at", "-id"], name="recipe_created_idx"),
+            models.Index(fields=["author", "-created_at", "-id"], name="recipe_author_created_idx"),
+        ]
+
     # Return the recipe title
     def __str__(self): 
         return self.title
+
+    # Leave the denormalised columns out of full saves of an existing recipe
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get("update_fields") is None and not kwargs.get("force_insert"):
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.DENORMALISED_FIELDS
+            ]
+        super().save(*args, **kwargs)
     
     CATEGORY_CHOICES = [
         ('Breakfast', 'Breakfast'),
@@ -68,22 +126,23 @@ class Recipe(models.Model):
     def likes_count(self):
         
         return self.likes.count()
-    # Return the total number of ratings
+    # Return the total number of favourites
     @property
     def favourites_count(self):
         """Returns how many users have favourited the recipe."""
-        return self.favourited_by.count()
+        return self.favourites_total
 
-    
+    # Return the total number of ratings
     @property
     def rating_count(self): 
-        return self.ratings.count()
+        return self.rating_total
      
     # Return the average rating value
     @property 
     def average_rating(self): 
-        avg = self.ratings.aggregate(avg=models.Avg('rating'))['avg']
-        return avg or 0 
+        if not self.rating_total:
+            return 0
+        return self.rating_sum / self.rating_total
 
 class RecipeImage(models.Model):
     """
@@ -95,6 +154,10 @@ class RecipeImage(models.Model):
         caption (CharField): The caption of the image.
         position (PositiveIntegerField): The order position of the image in the recipe.
         uploaded_at (DateTimeField): The date and time of when the image was uploaded.
+        width (PositiveIntegerField): Width of the uploaded image in pixels, once processed.
+        height (PositiveIntegerField): Height of the uploaded image in pixels, once processed.
+        variants (JSONField): Storage names of the derived thumbnail and resized copies.
+        processed_at (DateTimeField): When the derivatives were last generated.
     """
     recipe = models.ForeignKey(
         Recipe,
@@ -105,6 +168,10 @@ class RecipeImage(models.Model):
     caption = models.CharField(max_length=200, blank=True)
     position = models.PositiveIntegerField(default=0)
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    variants = models.JSONField(default=dict, blank=True, editable=False)
+    processed_at = models.DateTimeField(null=True, blank=True, editable=False)
 
     class Meta:
         ordering = ["position", "id"]
@@ -113,6 +180,39 @@ class RecipeImage(models.Model):
     def __str__(self):
         return f"Image for {self.recipe.title}"
 
+    # Whether the stored derivatives were generated from the current upload
+    @property
+    def is_processed(self):
+        return self.processed_at is not None and self.variants.get("source") == self.image.name
+
+    # URL of the small fixed-size copy, falling back to the original upload
+    @property
+    def thumbnail_url(self):
+        name = self.variants.get("thumbnail") if self.is_processed else None
+        return self.image.storage.url(name) if name else self.image.url
+
+    def srcset(self, image_format):
+        """Return an HTML ``srcset`` value for one derived format, or an empty string."""
+        if not self.is_processed:
+            return ""
+        widths = self.variants.get(image_format, {})
+        return ", ".join(
+            f"{self.image.storage.url(name)} {width}w"
+            for width, name in sorted(widths.items(), key=lambda item: int(item[0]))
+        )
+
+    @property
+    def webp_srcset(self):
+        return self.srcset("webp")
+
+    @property
+    def avif_srcset(self):
+        return self.srcset("avif")
+
+    @property
+    def jpeg_srcset(self):
+        return self.srcset("jpeg")
+
 class Comment(models.Model):
     """
     Model representing a comment left on a recipe.
@@ -146,6 +246,10 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # A recipe's comments, newest first, on the detail page
+            models.Index(fields=["recipe", "-created_at"], name="comment_recipe_created_idx"),
+        ]
 
     # Return a readable description of the comment
     def __str__(self):
@@ -197,3 +301,66 @@ class RecipeRating(models.Model):
         return f'{self.recipe.title} rated {self.rating} by {self.user}'
     
 
+
+class RecipeIngredient(models.Model):
+    """
+    Model representing one parsed line of a recipe's ingredients.
+
+    Derived from ``Recipe.ingredients`` by ``recipes.ingredients``; never
+    edited directly.
+
+    Fields:
+        recipe: The recipe the ingredient belongs to.
+        position (PositiveSmallIntegerField): The line's position in the ingredients text.
+        raw (CharField): The line as the author wrote it.
+        quantity (DecimalField): The amount, when the line starts with one.
+        unit (CharField): The canonical unit of the amount, e.g. "g" or "tbsp".
+        name (CharField): The normalised ingredient name, e.g. "tomato".
+    """
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="parsed_ingredients",
+    )
+    position = models.PositiveSmallIntegerField(default=0)
+    raw = models.CharField(max_length=255)
+    quantity = models.DecimalField(max_digits=10, decimal_places=3, null=True, blank=True)
+    unit = models.CharField(max_length=20, blank=True)
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        ordering = ["position", "id"]
+        indexes = [
+            # Ingredient filters: recipe ids for a name, answered from the index alone
+            models.Index(fields=["name", "recipe"], name="ingredient_name_recipe_idx"),
+        ]
+
+    # Return the ingredient line as written
+    def __str__(self):
+        return self.raw
+
+class IngredientWord(models.Model):
+    """
+    Model mapping each word of a parsed ingredient name to that name.
+
+    Lets ingredient filters match on words, so "chicken" finds
+    "chicken breast". Written alongside ``RecipeIngredient`` by
+    ``recipes.ingredients``; rows are never removed, as a word whose names
+    are no longer used simply matches nothing.
+
+    Fields:
+        word (CharField): One word of the name, made singular, e.g. "breast".
+        name (CharField): A normalised ingredient name, e.g. "chicken breast".
+    """
+    word = models.CharField(max_length=100)
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        constraints = [
+            # Also the index the word lookups use
+            models.UniqueConstraint(fields=["word", "name"], name="unique_ingredient_word_name"),
+        ]
+
+    # Return the word and the name it belongs to
+    def __str__(self):
+        return f"{self.word} ({self.name})"
@@ -32,6 +32,14 @@ class ShoppingListItem(models.Model):
 
     class Meta:
         ordering = ["is_checked", "name"]
+        indexes = [
+            # A user's list in display order, unchecked items first
+            models.Index(fields=["user", "is_checked", "name"], name="shopping_list_user_idx"),
+        ]
+        constraints = [
+            # One row per item per user, so adds can be INSERT ... ON CONFLICT upserts
+            models.UniqueConstraint(fields=["user", "name"], name="unique_shopping_list_item_per_user"),
+        ]
 
     # Return a readable description of the shopping list item
     def __str__(self):
@@ -0,0 +1,52 @@
+from django.db import models
+
+class SlowQuery(models.Model):
+    """
+    Model aggregating slow SQL statements that share one fingerprint.
+
+    Written by ``recipes.slow_queries`` when ``SLOW_QUERY_LOG`` is on. Literal
+    values and ``IN`` lists are stripped before fingerprinting, so every
+    filter combination of a query builder maps to one row per distinct shape.
+
+    Fields:
+        fingerprint (CharField): Hash of the normalised SQL.
+        normalized_sql (TextField): The SQL with literals and parameter lists collapsed.
+        sample_sql (TextField): The SQL of the most recent slow execution.
+        sample_params (JSONField): Its parameters.
+        plan (TextField): The EXPLAIN output for the most recent slow execution.
+        full_scan (BooleanField): Whether that plan scans a table without an index.
+        view_name (CharField): The view that last ran the query.
+        request_params (JSONField): The filter and sort parameters of that request.
+        calls (PositiveIntegerField): Number of slow executions seen.
+        total_ms (FloatField): Their combined duration.
+        max_ms (FloatField): The slowest single execution.
+        first_seen (DateTimeField): When the fingerprint was first recorded.
+        last_seen (DateTimeField): When it was last recorded.
+    """
+
+    fingerprint = models.CharField(max_length=40, unique=True)
+    normalized_sql = models.TextField()
+    sample_sql = models.TextField()
+    sample_params = models.JSONField(default=list, blank=True)
+    plan = models.TextField(blank=True)
+    full_scan = models.BooleanField(default=False)
+    view_name = models.CharField(max_length=200, blank=True)
+    request_params = models.JSONField(default=dict, blank=True)
+    calls = models.PositiveIntegerField(default=0)
+    total_ms = models.FloatField(default=0)
+    max_ms = models.FloatField(default=0)
+    first_seen = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-total_ms"]
+        verbose_name_plural = "slow queries"
+
+    # Return a readable description of the query
+    def __str__(self):
+        return f"{self.calls} x {self.normalized_sql[:80]}"
+
+    # Average duration of one slow execution
+    @property
+    def mean_ms(self):
+        return self.total_ms / self.calls if self.calls else 0
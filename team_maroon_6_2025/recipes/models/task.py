@@ -0,0 +1,49 @@
+from django.db import models
+
+class Task(models.Model):
+    """
+    Model representing one unit of background work in the database task queue.
+
+    Rows are written by ``recipes.task_queue.enqueue`` inside the caller's
+    transaction, so a task exists exactly when the write that caused it was
+    committed, and are claimed and run by the ``run_tasks`` worker.
+
+    Fields:
+        name (CharField): The registered name of the function to run.
+        payload (JSONField): Keyword arguments passed to the function.
+        status (CharField): Pending, running or failed; finished tasks are deleted.
+        attempts (PositiveIntegerField): How many times the task has been started.
+        max_attempts (PositiveIntegerField): Attempts allowed before the task is marked failed.
+        run_after (DateTimeField): The earliest time the task may run (used for retry backoff).
+        locked_at (DateTimeField): When a worker claimed the task.
+        last_error (TextField): The traceback of the most recent failure.
+        created_at (DateTimeField): The date and time the task was queued.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    FAILED = "failed"
+    STATUSES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (FAILED, "Failed"),
+    ]
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUSES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField()
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_after", "id"], name="task_queue_idx"),
+        ]
+
+    # Return a readable description of the task
+    def __str__(self):
+        return f"{self.name} ({self.status})"
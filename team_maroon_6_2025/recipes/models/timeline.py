@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.db import models
+
+class TimelineEntry(models.Model):
+    """
+    Model representing a recipe in a user's materialised following feed.
+
+    Rows are written when a followed author posts (fan-out-on-write), so the
+    following feed is a range read on ``(user, created_at)`` rather than a
+    scan over every followed author's recipes. See ``recipes.timeline``.
+
+    Fields:
+        user: The user whose following feed the entry belongs to.
+        recipe: The recipe shown in the feed.
+        author: The recipe's author, copied so unfollows can prune by author.
+        created_at (DateTimeField): The recipe's creation time, copied for ordering.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="timeline_entries",
+    )
+    recipe = models.ForeignKey(
+        "recipes.Recipe",
+        on_delete=models.CASCADE,
+        related_name="timeline_entries",
+    )
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    created_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "recipe"], name="unique_timeline_entry"),
+        ]
+        indexes = [
+            models.Index(fields=["user", "-created_at", "-recipe"], name="timeline_user_feed_idx"),
+            models.Index(fields=["user", "author"], name="timeline_user_author_idx"),
+        ]
+
+    # Return a readable description of the timeline entry
+    def __str__(self):
+        return f"{self.recipe_id} in {self.user_id}'s timeline"
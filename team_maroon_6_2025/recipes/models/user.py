@@ -1,3 +1,4 @@
+from functools import lru_cache
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
@@ -10,6 +11,12 @@ def validate_bio_lines(value):
     if len(value.splitlines()) > 8:
         raise ValidationError("Bio cannot exceed 8 lines.")
 
+# Hashing the email is the costly part, and lists show the same senders many times
+@lru_cache(maxsize=4096)
+def gravatar_url(email, size):
+    """Return the gravatar URL for an email address at a pixel size."""
+    return Gravatar(email).get_image(size=size, default='mp')
+
 class User(AbstractUser):
     """
     Model representing a user.
@@ -23,6 +30,8 @@ class User(AbstractUser):
             bio (TextField): The bio of the user.
             following: Stores the users that the user follows.
             is_private (BooleanField): Whether or not the user's account is set to private.
+            unread_notification_total (IntegerField): Denormalised number of unread notifications.
+            follower_total (IntegerField): Denormalised number of followers.
     """
 
     username = models.CharField(
@@ -47,9 +56,31 @@ class User(AbstractUser):
         default=False,
         help_text="Your recipes will only be visible to followers. Other Recipify users will only be able to follow you once you approve their follow request.")
 
+    # Kept in step by recipes.notifications and recipes.signals
+    unread_notification_total = models.IntegerField(default=0, editable=False)
+    # Kept in step by recipes.timeline and recipes.signals
+    follower_total = models.IntegerField(default=0, editable=False)
+
+    # Columns only ever written with .update(); see Recipe.DENORMALISED_FIELDS
+    DENORMALISED_FIELDS = frozenset({"unread_notification_total", "follower_total"})
+
     class Meta:
         """Model options."""
         ordering = ['last_name', 'first_name']
+        indexes = [
+            # High-fanout authors for the timelines (see recipes.timeline)
+            models.Index(fields=['follower_total'], name='user_follower_total_idx'),
+        ]
+
+    # Leave the denormalised columns out of full saves of an existing user
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get("update_fields") is None and not kwargs.get("force_insert"):
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.DENORMALISED_FIELDS
+            ]
+        super().save(*args, **kwargs)
 
     def full_name(self):
         """Return a string containing the user's full name."""
@@ -57,9 +88,7 @@ class User(AbstractUser):
 
     def gravatar(self, size=120):
         """Return a URL to the user's gravatar."""
-        gravatar_object = Gravatar(self.email)
-        gravatar_url = gravatar_object.get_image(size=size, default='mp')
-        return gravatar_url
+        return gravatar_url(self.email, size)
 
     def mini_gravatar(self):
         """Return a URL to a miniature version of the user's gravatar."""
@@ -91,6 +120,10 @@ class FollowRequest(models.Model):
     class Meta:
         unique_together = ('follow_requester', 'requested_user') # Prevent duplicate requests
         ordering = ['-created_at']
+        indexes = [
+            # Pending requests received by a user, newest first
+            models.Index(fields=['requested_user', '-created_at'], name='follow_request_received_idx'),
+        ]
 
     def __str__(self):
         """Return a readable description of the follow request"""
@@ -0,0 +1,305 @@
+"""
+Creating and withdrawing user notifications.
+
+Views call ``notify`` and ``withdraw`` instead of writing ``Notification``
+rows themselves. Both only queue a task (see ``recipes.task_queue``), so the
+notification write happens after the request in production and inline in
+eager mode.
+
+Each user's unread notifications are counted in
+``User.unread_notification_total`` so the navbar and the unread-count endpoint
+never have to ``COUNT(*)`` a large inbox. New rows are counted by a signal in
+``recipes.signals``. There is deliberately no per-row delete signal, which
+would make Django load every row of a bulk delete; deletions and the bulk
+operations here recount the affected users instead.
+
+With ``NOTIFICATION_COALESCING`` on, a notification of the same type about
+the same target (e.g. favourites of, or comments on, one recipe) that arrives within
+``NOTIFICATION_COALESCE_WINDOW_HOURS`` of the recipient's latest unread one
+updates that row instead of inserting a new one: the row moves to the top of
+the inbox, ``actor_count`` goes up and the actor joins ``recent_actors``.
+Only the latest ``NOTIFICATION_RECENT_ACTORS`` actors are remembered, so
+withdrawing an action removes the actor only while they are still listed.
+Follow requests are never coalesced, since each one is accepted or declined
+on its own.
+``prune_notifications`` enforces the retention periods.
+
+Once a write commits, the recipient's channel in ``recipes.pubsub`` gets a
+``notification`` event for a new or coalesced notification, or an
+``unread`` event when only the unread count changed, for the live stream.
+"""
+
+from functools import partial
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from recipes.models import Notification, User
+from recipes.pubsub import get_broker, user_channel
+from recipes.task_queue import enqueue
+
+
+def _target_ids(target):
+    if target is None:
+        return {}
+    return {
+        "content_type_id": ContentType.objects.get_for_model(target).pk,
+        "object_id": target.pk,
+    }
+
+
+def notify(recipient, sender, notification_type, target=None):
+    """Queue a notification to ``recipient`` about ``sender``'s action on ``target``."""
+    enqueue(
+        "notifications.create",
+        recipient_id=recipient.pk,
+        sender_id=sender.pk,
+        notification_type=notification_type,
+        **_target_ids(target),
+    )
+
+
+def withdraw(recipient, sender, notification_type, target=None):
+    """Queue removal of matching notifications, e.g. after an unfavourite."""
+    enqueue(
+        "notifications.delete",
+        recipient_id=recipient.pk,
+        sender_id=sender.pk,
+        notification_type=notification_type,
+        **_target_ids(target),
+    )
+
+
+# Notification types that always get a row per sender
+UNCOALESCED_TYPES = frozenset({"request"})
+
+
+def coalescing_enabled():
+    return getattr(settings, "NOTIFICATION_COALESCING", False)
+
+
+def coalesces(notification_type):
+    """Whether notifications of ``notification_type`` are folded into one row per target."""
+    return coalescing_enabled() and notification_type not in UNCOALESCED_TYPES
+
+
+def recent_actor_limit():
+    return getattr(settings, "NOTIFICATION_RECENT_ACTORS", 3)
+
+
+def _coalescable(recipient_id, notification_type, content_type_id, object_id):
+    """Return the unread row a new notification with this key should be folded into, if any."""
+    window = timedelta(hours=getattr(settings, "NOTIFICATION_COALESCE_WINDOW_HOURS", 24))
+    return (
+        Notification.objects.select_for_update()
+        .filter(
+            recipient_id=recipient_id,
+            notification_type=notification_type,
+            content_type_id=content_type_id,
+            object_id=object_id,
+            is_read=False,
+            created_at__gte=timezone.now() - window,
+        )
+        .order_by("-created_at")
+        .first()
+    )
+
+
+def _add_actor(notification, sender_id):
+    actors = notification.actor_ids
+    if sender_id not in actors:
+        notification.actor_count += 1
+    notification.recent_actors = ([sender_id] + [pk for pk in actors if pk != sender_id])[:recent_actor_limit()]
+    notification.sender_id = sender_id
+    notification.created_at = timezone.now()
+    notification.save(update_fields=["sender", "actor_count", "recent_actors", "created_at"])
+    return notification
+
+
+def create_notification(recipient_id, sender_id, notification_type, content_type_id=None, object_id=None):
+    with transaction.atomic():
+        existing = None
+        if coalesces(notification_type):
+            existing = _coalescable(recipient_id, notification_type, content_type_id, object_id)
+        if existing is not None:
+            notification = _add_actor(existing, sender_id)
+        else:
+            notification = Notification.objects.create(
+                recipient_id=recipient_id,
+                sender_id=sender_id,
+                notification_type=notification_type,
+                content_type_id=content_type_id,
+                object_id=object_id,
+                recent_actors=[sender_id],
+            )
+        transaction.on_commit(partial(publish_notification, notification.pk), robust=True)
+    return notification
+
+
+def _remove_actor(notification, sender_id):
+    """Take ``sender_id`` out of a row; return False when no known actor is left."""
+    actors = [pk for pk in notification.actor_ids if pk != sender_id]
+    if notification.actor_count <= 1 or not actors:
+        return False
+    notification.actor_count -= 1
+    notification.recent_actors = actors
+    notification.sender_id = actors[0]
+    notification.save(update_fields=["sender", "actor_count", "recent_actors"])
+    return True
+
+
+def delete_notifications(recipient_id, sender_id, notification_type, **target):
+    """Withdraw ``sender_id``'s action from the matching notifications, deleting rows left without actors."""
+    with transaction.atomic():
+        candidates = Notification.objects.filter(
+            recipient_id=recipient_id,
+            notification_type=notification_type,
+            **target,
+        )
+        if not coalesces(notification_type):
+            candidates = candidates.filter(sender_id=sender_id)
+        emptied = [
+            notification.pk for notification in candidates
+            if sender_id in notification.actor_ids and not _remove_actor(notification, sender_id)
+        ]
+        deleted = Notification.objects.filter(pk__in=emptied).delete()
+        refresh_unread_totals([recipient_id])
+    return deleted
+
+
+def adjust_unread_total(user_id, delta):
+    """Add ``delta`` to a user's unread notification counter."""
+    User.objects.filter(pk=user_id).update(unread_notification_total=F("unread_notification_total") + delta)
+
+
+def refresh_unread_totals(user_ids=None):
+    """Recompute the unread counter for ``user_ids``, or for every user when None."""
+    unread = (
+        Notification.objects.filter(recipient_id=OuterRef("pk"), is_read=False)
+        .order_by()
+        .values("recipient_id")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    users = User.objects.all() if user_ids is None else User.objects.filter(pk__in=user_ids)
+    updated = users.update(
+        unread_notification_total=Coalesce(Subquery(unread, output_field=IntegerField()), Value(0))
+    )
+    if user_ids is not None:
+        transaction.on_commit(partial(publish_unread, list(user_ids)), robust=True)
+    return updated
+
+
+def unread_count(user):
+    """Return the stored unread counter without reloading the whole user row."""
+    return User.objects.filter(pk=user.pk).values_list("unread_notification_total", flat=True).first() or 0
+
+
+def _inbox(user, notification_type=None):
+    notifications = Notification.objects.filter(recipient=user)
+    if notification_type:
+        notifications = notifications.filter(notification_type=notification_type)
+    return notifications
+
+
+def mark_all_read(user, notification_type=None):
+    """Mark every unread notification of ``user`` (optionally of one type) as read."""
+    with transaction.atomic():
+        updated = _inbox(user, notification_type).filter(is_read=False).update(is_read=True, read_at=timezone.now())
+        refresh_unread_totals([user.pk])
+    return updated
+
+
+def delete_notification(notification):
+    """Delete one notification and recount its recipient's unread total."""
+    with transaction.atomic():
+        notification.delete()
+        refresh_unread_totals([notification.recipient_id])
+
+
+def delete_all_of_type(user, notification_type):
+    """Delete every notification of one type from ``user``'s inbox."""
+    with transaction.atomic():
+        deleted, _ = _inbox(user, notification_type).delete()
+        refresh_unread_totals([user.pk])
+    return deleted
+
+
+def attach_actors(notifications):
+    """Set ``other_actors`` on each notification to the recent actors besides its sender, in one query."""
+    notifications = list(notifications)
+    actor_ids = {pk for notification in notifications for pk in notification.actor_ids[1:]}
+    actors = User.objects.in_bulk(actor_ids) if actor_ids else {}
+    for notification in notifications:
+        notification.other_actors = [actors[pk] for pk in notification.actor_ids[1:] if pk in actors]
+    return notifications
+
+
+def prune_notifications(older_than, read_older_than=None, batch_size=1000):
+    """
+    Delete notifications created before ``older_than``, and read ones before ``read_older_than``.
+
+    Rows are deleted in primary-key batches so a large backlog never holds
+    one long write lock. Returns the number of rows deleted.
+    """
+    expired = Notification.objects.filter(created_at__lt=older_than)
+    if read_older_than is not None:
+        expired = Notification.objects.filter(
+            Q(created_at__lt=older_than) | Q(is_read=True, created_at__lt=read_older_than)
+        )
+    expired = expired.order_by()
+    deleted = 0
+    while True:
+        batch = list(expired.values_list("pk", flat=True)[:batch_size])
+        if not batch:
+            return deleted
+        with transaction.atomic():
+            recipient_ids = list(
+                Notification.objects.filter(pk__in=batch, is_read=False)
+                .order_by()
+                .values_list("recipient_id", flat=True)
+                .distinct()
+            )
+            deleted += Notification.objects.filter(pk__in=batch).delete()[0]
+            if recipient_ids:
+                refresh_unread_totals(recipient_ids)
+
+
+def serialize_notification(notification):
+    """The fields of a notification sent to the browser by the live stream."""
+    return {
+        "id": notification.pk,
+        "type": notification.notification_type,
+        "sender": notification.sender.username,
+        "avatar": notification.sender.gravatar(50),
+        "actor_count": notification.actor_count,
+        "created_at": notification.created_at.isoformat(),
+    }
+
+
+def publish_unread(user_ids):
+    """Publish each user's current unread count to their channel."""
+    broker = get_broker()
+    totals = User.objects.filter(pk__in=user_ids).values_list("pk", "unread_notification_total")
+    for user_id, unread in totals:
+        broker.publish(user_channel(user_id), {"type": "unread", "unread": unread})
+
+
+def publish_notification(notification_id):
+    """Publish a new or coalesced notification, with the recipient's unread count."""
+    notification = (
+        Notification.objects.select_related("sender", "recipient").filter(pk=notification_id).first()
+    )
+    if notification is None:
+        return
+    get_broker().publish(user_channel(notification.recipient_id), {
+        "type": "notification",
+        "unread": notification.recipient.unread_notification_total,
+        "notification": serialize_notification(notification),
+    })
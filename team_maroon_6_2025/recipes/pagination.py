@@ -0,0 +1,162 @@
+"""
+Keyset (cursor) pagination for recipe feeds.
+
+Offset pagination has to ``COUNT(*)`` the whole filtered queryset and then
+skip ``OFFSET`` rows, so deep pages get slower the further in you go. Keyset
+pagination instead remembers the sort values of the last row shown and asks
+for the rows that sort after it, which the database can answer from an index
+in the same time for page 500 as for page 1. There is no total page count.
+"""
+
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 10
+
+
+class CursorPage:
+    """
+    One page of results from ``KeysetPaginator``.
+
+    Attributes:
+        object_list (list): The objects on this page, in display order.
+        next_cursor (str): Opaque token for the following page, or None.
+        previous_cursor (str): Opaque token for the preceding page, or None.
+        param (str): The GET parameter the cursor tokens are read from.
+        base_querystring (str): The current query string without ``param``.
+    """
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None, param="cursor", base_querystring=""):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.param = param
+        self.base_querystring = base_querystring
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+
+def _parse_ordering(ordering):
+    """Turn ``("-created_at", "title")`` into ``[("created_at", True), ("title", False)]``."""
+    fields = [(name.lstrip("-"), name.startswith("-")) for name in ordering]
+    if not any(name in ("id", "pk") for name, _ in fields):
+        # A unique tie-breaker keeps the order total, so no row is skipped or repeated
+        fields.append(("id", fields[0][1] if fields else True))
+    return fields
+
+
+def _order_by(fields, reverse=False):
+    return [f"-{name}" if descending != reverse else name for name, descending in fields]
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def encode_cursor(values, direction):
+    payload = json.dumps({"d": direction, "v": [_encode_value(v) for v in values]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token, expected_length):
+    """Return ``(direction, values)`` for a token, or ``None`` if it is malformed."""
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        direction, values = payload["d"], payload["v"]
+    except (binascii.Error, ValueError, UnicodeDecodeError, KeyError, TypeError):
+        return None
+    if direction not in ("n", "p") or not isinstance(values, list) or len(values) != expected_length:
+        return None
+    return direction, values
+
+
+def _seek(fields, values, forward):
+    """Build the WHERE clause selecting rows strictly after (or before) ``values``."""
+    condition = Q()
+    equal_prefix = Q()
+    for (name, descending), value in zip(fields, values):
+        lookup = "lt" if descending == forward else "gt"
+        condition |= equal_prefix & Q(**{f"{name}__{lookup}": value})
+        equal_prefix &= Q(**{name: value})
+    return condition
+
+
+class KeysetPaginator:
+    """
+    Paginate a queryset by seeking past the sort key of the last row seen.
+
+    ``ordering`` uses the same form as ``RECIPE_ORDERING`` entries; every field
+    named in it must be a model field or an annotation on ``queryset``.
+    """
+
+    def __init__(self, queryset, ordering, per_page=DEFAULT_PAGE_SIZE):
+        self.queryset = queryset
+        self.fields = _parse_ordering(ordering)
+        self.per_page = per_page
+
+    def _key(self, obj):
+        return [getattr(obj, name) for name, _ in self.fields]
+
+    def get_page(self, cursor=None, param="cursor", base_querystring=""):
+        decoded = decode_cursor(cursor, len(self.fields))
+        forward = decoded is None or decoded[0] == "n"
+
+        queryset = self.queryset.order_by(*_order_by(self.fields, reverse=not forward))
+        if decoded is not None:
+            queryset = queryset.filter(_seek(self.fields, decoded[1], forward))
+
+        rows = list(queryset[: self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if not forward:
+            rows.reverse()
+
+        if forward:
+            has_next, has_previous = has_more, decoded is not None
+        else:
+            has_next, has_previous = True, has_more
+
+        next_cursor = encode_cursor(self._key(rows[-1]), "n") if rows and has_next else None
+        previous_cursor = encode_cursor(self._key(rows[0]), "p") if rows and has_previous else None
+        return CursorPage(rows, next_cursor, previous_cursor, param=param, base_querystring=base_querystring)
+
+
+def paginate_by_cursor(request, queryset, ordering, per_page=DEFAULT_PAGE_SIZE, param="cursor"):
+    """Return the ``CursorPage`` selected by ``request.GET[param]``."""
+    params = request.GET.copy()
+    params.pop(param, None)
+    return KeysetPaginator(queryset, ordering, per_page).get_page(
+        request.GET.get(param),
+        param=param,
+        base_querystring=params.urlencode(),
+    )
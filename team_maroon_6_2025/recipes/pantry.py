@@ -0,0 +1,207 @@
+"""
+"What can I cook?" search over an in-memory inverted ingredient index.
+
+``PantryIndex`` maps every normalised ingredient name (see
+``recipes.ingredients``) to a sorted ``array`` of the ids of the recipes
+that use it, and records how many distinct ingredients each recipe needs.
+Given a pantry, ``search`` counts how many of each recipe's ingredients are
+covered by walking the postings of the pantry's ingredients, then ranks the
+recipes by the share of their ingredients the pantry covers. Nothing touches
+the database per query, so ten or more pantry items over a large recipe
+table are answered in milliseconds.
+
+Each process builds the index from ``RecipeIngredient`` (one query over the
+``(name, recipe)`` index) the first time it is needed. Writes to the parsed
+ingredients bump a cache version; a process that sees a newer version
+rebuilds its copy, at most once every ``PANTRY_INDEX_REFRESH_SECONDS``. A
+cache that is not shared (the default local-memory one) only tells the
+writing process, so every copy is also rebuilt once it is
+``PANTRY_INDEX_MAX_AGE_SECONDS`` old. Rebuilds run on a background thread
+(``PANTRY_INDEX_BACKGROUND``), one at a time, and requests keep searching the
+previous copy until the new one is swapped in.
+
+A pantry item matches every ingredient name containing all of its words, so
+"chicken" covers "chicken breast" and "oil" covers "olive oil". The
+``PANTRY_STAPLES`` (salt, pepper, water by default) are taken to be in every
+pantry: they are left out of the index, so they neither count towards a
+recipe's ingredients nor make it match.
+"""
+
+import heapq
+import logging
+import threading
+import time
+from array import array
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from operator import truediv
+
+from django.conf import settings
+from django.db import connections
+
+from recipes.caching import bump_version, get_version
+from recipes.models import RecipeIngredient
+
+INDEX_SCOPE = "pantry_index"
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_current = None
+
+
+def staples():
+    return getattr(settings, "PANTRY_STAPLES", ("salt", "pepper", "water"))
+
+
+def refresh_seconds():
+    return getattr(settings, "PANTRY_INDEX_REFRESH_SECONDS", 60)
+
+
+def max_age_seconds():
+    return getattr(settings, "PANTRY_INDEX_MAX_AGE_SECONDS", 600)
+
+
+def rebuilds_in_background():
+    return getattr(settings, "PANTRY_INDEX_BACKGROUND", True)
+
+
+@dataclass
+class PantryMatch:
+    """How well a pantry covers one recipe."""
+
+    recipe_id: int
+    matched: int
+    total: int
+
+    @property
+    def coverage(self):
+        return self.matched / self.total
+
+    @property
+    def missing(self):
+        return self.total - self.matched
+
+
+class PantryIndex:
+    """
+    Inverted index from ingredient name to recipe ids.
+
+    Attributes:
+        postings (dict): ``{name: array of recipe ids}``, ids ascending.
+        sizes (dict): ``{recipe_id: number of distinct ingredient names}``.
+        words (dict): ``{word: names containing it}``, for partial matches.
+        version: The cache version the index was built at.
+    """
+
+    def __init__(self, rows=(), version=None, staples=()):
+        staples = set(staples)
+        postings = defaultdict(lambda: array("q"))
+        sizes = Counter()
+        for name, recipe_id in rows:
+            if name in staples:
+                continue
+            postings[name].append(recipe_id)
+            sizes[recipe_id] += 1
+        self.postings = {name: array("q", sorted(ids)) for name, ids in postings.items()}
+        self.sizes = dict(sizes)
+        self.words = defaultdict(list)
+        for name in self.postings:
+            for word in set(name.split()):
+                self.words[word].append(name)
+        self.version = version
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def build(cls, version=None, staples=()):
+        rows = RecipeIngredient.objects.order_by().values_list("name", "recipe_id").distinct()
+        return cls(rows.iterator(chunk_size=10000), version, staples)
+
+    def expand(self, name):
+        """Return the indexed names matched by the pantry item ``name``."""
+        words = name.split()
+        if not words:
+            return set()
+        candidates = set(self.words.get(words[0], ()))
+        for word in words[1:]:
+            candidates.intersection_update(self.words.get(word, ()))
+        return candidates
+
+    def search(self, names, limit=24, complete_only=False):
+        """
+        Rank the recipes the pantry ``names`` can make, best coverage first.
+
+        Ties go to the recipe with more matched ingredients, then the newest.
+        Returns up to ``limit`` ``PantryMatch`` objects.
+        """
+        matched = Counter()
+        for name in set().union(*(self.expand(name) for name in names)):
+            matched.update(self.postings[name])
+
+        sizes = self.sizes
+        recipe_ids = list(matched)
+        counts = list(matched.values())
+        # Built with map/zip rather than a Python-level loop: this is the hot
+        # path, with one entry per recipe sharing any ingredient with the pantry
+        ranked = zip(map(truediv, counts, map(sizes.__getitem__, recipe_ids)), counts, recipe_ids)
+        if complete_only:
+            ranked = (entry for entry in ranked if entry[0] == 1)
+        return [
+            PantryMatch(recipe_id, count, sizes[recipe_id])
+            for _, count, recipe_id in heapq.nlargest(limit, ranked)
+        ]
+
+
+def invalidate():
+    """Mark every process's index stale; called after parsed ingredients are written."""
+    bump_version(INDEX_SCOPE)
+
+
+def _rebuild(version, background=False):
+    """Build a new index and swap it in; the caller holds ``_lock``, which is released here."""
+    global _current
+    try:
+        _current = PantryIndex.build(version, staples())
+    except Exception:
+        if not background:
+            raise
+        logger.exception("Rebuilding the pantry index failed")
+    finally:
+        _lock.release()
+        if background:
+            # The thread opened its own connection; do not leave it behind
+            connections.close_all()
+
+
+def get_index():
+    """
+    Return this process's index, refreshing it if it is out of date.
+
+    Only the first call in a process waits for a build. Later refreshes are
+    started by whichever request notices first, without blocking, and every
+    request meanwhile gets the copy it already has.
+    """
+    global _current
+    index = _current
+    if index is None:
+        with _lock:
+            if _current is None:
+                _current = PantryIndex.build(get_version(INDEX_SCOPE), staples())
+            return _current
+
+    age = time.monotonic() - index.built_at
+    if age < max_age_seconds() and (age < refresh_seconds() or index.version == get_version(INDEX_SCOPE)):
+        return index
+    if not _lock.acquire(blocking=False):
+        return index
+    version = get_version(INDEX_SCOPE)
+    if rebuilds_in_background():
+        threading.Thread(target=_rebuild, args=(version, True), name="pantry-index", daemon=True).start()
+        return index
+    _rebuild(version)
+    return _current
+
+
+def search(names, limit=24, complete_only=False):
+    """Rank recipes for the pantry ``names`` (normalised ingredient names); see ``PantryIndex.search``."""
+    return get_index().search(names, limit=limit, complete_only=complete_only)
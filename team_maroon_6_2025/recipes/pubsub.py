@@ -0,0 +1,196 @@
+"""
+Publish/subscribe channels for live notification updates.
+
+``recipes.notifications`` publishes an event to the channel of every user
+whose inbox changes, and the notification stream view
+(``recipes.views.notification_stream_view``) waits on that channel to push
+the event to the browser. Each channel numbers its events, so a subscriber
+asks for "everything after event N" and cannot miss one published between
+two waits.
+
+``settings.NOTIFICATION_BROKER`` names the broker class:
+
+* ``InMemoryBroker`` (the default) keeps channels in process memory. Waiters
+  wake the moment an event is published, but only events published by the
+  same process are seen, so it is for development and single-process
+  servers only.
+* ``CacheBroker`` keeps channels in the Django cache and polls it. With
+  ``CACHE_URL`` pointing at Redis every worker shares the channels.
+
+A stream holds its connection open for minutes. That is free under ASGI, but
+under WSGI each open stream ties up a worker thread, so ``stream_enabled``
+only allows streaming for ASGI requests unless ``NOTIFICATION_STREAM_WSGI``
+is set. Everywhere else the browser polls the unread count on a timer.
+"""
+
+import asyncio
+import threading
+import time
+from collections import defaultdict, deque
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.utils.module_loading import import_string
+
+DEFAULT_BROKER = "recipes.pubsub.InMemoryBroker"
+
+
+def user_channel(user_id):
+    return f"user:{user_id}"
+
+
+class Broker:
+    """
+    Interface shared by the brokers.
+
+    Events are JSON-serialisable dictionaries. ``wait`` and ``wait_async``
+    return ``[(event_id, event)]`` for the events after ``after_id``, waiting
+    up to ``timeout`` seconds for one to arrive; an empty list means the
+    wait timed out.
+    """
+
+    def publish(self, channel, event):
+        """Append ``event`` to ``channel`` and return its id."""
+        raise NotImplementedError
+
+    def last_id(self, channel):
+        """Return the id of the newest event on ``channel``, or 0."""
+        raise NotImplementedError
+
+    def wait(self, channel, after_id, timeout):
+        raise NotImplementedError
+
+    async def wait_async(self, channel, after_id, timeout):
+        raise NotImplementedError
+
+
+class InMemoryBroker(Broker):
+    """Channels held in this process, keeping the latest ``history`` events of each."""
+
+    def __init__(self, history=50):
+        self._condition = threading.Condition()
+        self._events = defaultdict(lambda: deque(maxlen=history))
+        self._last_ids = defaultdict(int)
+        # Waiting coroutines, as (event loop, asyncio.Event) pairs per channel
+        self._async_waiters = defaultdict(set)
+
+    def publish(self, channel, event):
+        with self._condition:
+            self._last_ids[channel] += 1
+            event_id = self._last_ids[channel]
+            self._events[channel].append((event_id, event))
+            self._condition.notify_all()
+            waiters = list(self._async_waiters[channel])
+        # Publishers may run in any thread; wake each coroutine on its own loop
+        for loop, arrived in waiters:
+            loop.call_soon_threadsafe(arrived.set)
+        return event_id
+
+    def last_id(self, channel):
+        with self._condition:
+            return self._last_ids[channel]
+
+    def _since(self, channel, after_id):
+        return [(event_id, event) for event_id, event in self._events[channel] if event_id > after_id]
+
+    def wait(self, channel, after_id, timeout):
+        with self._condition:
+            self._condition.wait_for(lambda: self._last_ids[channel] > after_id, timeout)
+            return self._since(channel, after_id)
+
+    async def wait_async(self, channel, after_id, timeout):
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._condition:
+            if self._last_ids[channel] > after_id:
+                return self._since(channel, after_id)
+            self._async_waiters[channel].add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._condition:
+                self._async_waiters[channel].discard(waiter)
+        with self._condition:
+            return self._since(channel, after_id)
+
+
+class CacheBroker(Broker):
+    """
+    Channels stored in the default cache, shared by every worker using it.
+
+    Each channel is a counter key plus one key per event, kept for
+    ``ttl`` seconds. Waiters poll the counter every ``poll_interval`` seconds,
+    which is one cache read rather than an inbox query.
+    """
+
+    def __init__(self, history=50, ttl=300, poll_interval=0.5, prefix="pubsub"):
+        self.history = history
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        self.prefix = prefix
+
+    def _counter_key(self, channel):
+        return f"{self.prefix}:{channel}"
+
+    def _event_key(self, channel, event_id):
+        return f"{self.prefix}:{channel}:{event_id}"
+
+    def publish(self, channel, event):
+        counter = self._counter_key(channel)
+        cache.add(counter, 0, None)
+        event_id = cache.incr(counter)
+        cache.set(self._event_key(channel, event_id), event, self.ttl)
+        return event_id
+
+    def last_id(self, channel):
+        return cache.get(self._counter_key(channel), 0)
+
+    def _event_keys(self, channel, after_id, last_id):
+        first = max(after_id + 1, last_id - self.history + 1)
+        return [self._event_key(channel, event_id) for event_id in range(first, last_id + 1)]
+
+    def _collect(self, keys, found):
+        # Events that expired before they were read are skipped
+        return [(int(key.rsplit(":", 1)[1]), found[key]) for key in keys if key in found]
+
+    def wait(self, channel, after_id, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            last_id = self.last_id(channel)
+            if last_id > after_id:
+                keys = self._event_keys(channel, after_id, last_id)
+                return self._collect(keys, cache.get_many(keys))
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return []
+            time.sleep(min(self.poll_interval, remaining))
+
+    async def wait_async(self, channel, after_id, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            last_id = await cache.aget(self._counter_key(channel), 0)
+            if last_id > after_id:
+                keys = self._event_keys(channel, after_id, last_id)
+                return self._collect(keys, await cache.aget_many(keys))
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return []
+            await asyncio.sleep(min(self.poll_interval, remaining))
+
+
+@lru_cache(maxsize=None)
+def _load_broker(path):
+    return import_string(path)()
+
+
+def get_broker():
+    """Return the broker named by ``settings.NOTIFICATION_BROKER``, one instance per process."""
+    return _load_broker(getattr(settings, "NOTIFICATION_BROKER", DEFAULT_BROKER))
+
+
+def stream_enabled(request):
+    """Whether ``request`` may hold a notification stream or long poll open."""
+    return isinstance(request, ASGIRequest) or getattr(settings, "NOTIFICATION_STREAM_WSGI", False)
@@ -0,0 +1,165 @@
+"""
+Precomputed trending and per-category recipe rankings.
+
+``compute_rankings`` scores recent recipes with a time-decayed engagement
+score and writes the overall top N plus a top N for every category into
+``RecipeRanking``. The ``compute_rankings`` management command runs it from
+cron; pages read the stored lists through ``ranked_recipes``. If the stored
+ranking is older than ``RANKING_STALE_AFTER`` seconds, one request queues a
+``rankings.compute`` task and every page keeps serving the previous lists
+until the worker has written new ones.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from recipes.helpers import base_recipe_queryset
+from recipes.models import Category, Recipe, RecipeRanking
+from recipes.task_queue import enqueue
+
+REFRESH_LOCK_KEY = "rankings:refresh"
+
+# Engagement weights and the decay exponent applied to a recipe's age in hours
+FAVOURITE_WEIGHT = 3.0
+RATING_WEIGHT = 1.0
+COMMENT_WEIGHT = 2.0
+GRAVITY = 1.5
+
+
+def ranking_size():
+    return getattr(settings, "RANKING_SIZE", 24)
+
+
+def stale_after():
+    return timedelta(seconds=getattr(settings, "RANKING_STALE_AFTER", 900))
+
+
+def trending_window():
+    return timedelta(days=getattr(settings, "TRENDING_WINDOW_DAYS", 30))
+
+
+def trending_score(favourites, rating_sum, comments, created_at, now):
+    """
+    Score a recipe by engagement, decayed by age.
+
+    The ``+ 2`` hours keeps brand new recipes from dividing by almost zero.
+    """
+    engagement = FAVOURITE_WEIGHT * favourites + RATING_WEIGHT * rating_sum + COMMENT_WEIGHT * comments
+    age_hours = max((now - created_at).total_seconds() / 3600, 0)
+    return (engagement + 1) / (age_hours + 2) ** GRAVITY
+
+
+def _top(scored, size):
+    return sorted(scored, key=lambda item: (-item[1], -item[0]))[:size]
+
+
+def _top_up(ranked, size, recipes):
+    """Fill ``ranked`` up to ``size`` with the all-time most favourited of ``recipes``."""
+    if len(ranked) >= size:
+        return ranked
+    seen = {pk for pk, _ in ranked}
+    fallback = (
+        recipes.exclude(id__in=seen)
+        .order_by("-favourites_total", "-created_at")
+        .values_list("id", flat=True)[: size - len(ranked)]
+    )
+    return ranked + [(pk, 0.0) for pk in fallback]
+
+
+def compute_rankings(now=None, size=None):
+    """
+    Recompute and store every ranking.
+
+    Only recipes from the trending window are scored; the trending list and
+    categories with fewer recent recipes than ``size`` are topped up with
+    their all-time most favourited recipes, so a quiet month still has a
+    trending rail. Returns the number of ranking rows written.
+    """
+    now = now or timezone.now()
+    size = size or ranking_size()
+
+    candidates = Recipe.objects.filter(created_at__gte=now - trending_window()).values_list(
+        "id", "favourites_total", "rating_sum", "comment_total", "created_at"
+    )
+    scores = {
+        pk: trending_score(favourites, rating_sum, comments, created_at, now)
+        for pk, favourites, rating_sum, comments, created_at in candidates.iterator()
+    }
+
+    by_category = defaultdict(list)
+    memberships = Recipe.categories.through.objects.filter(recipe_id__in=list(scores)).values_list(
+        "category_id", "recipe_id"
+    )
+    for category_id, recipe_id in memberships.iterator():
+        by_category[category_id].append((recipe_id, scores[recipe_id]))
+
+    rows = [
+        RecipeRanking(kind=RecipeRanking.TRENDING, position=position, recipe_id=pk, score=score, computed_at=now)
+        for position, (pk, score) in enumerate(_top_up(_top(scores.items(), size), size, Recipe.objects.all()))
+    ]
+    for category_id in Category.objects.values_list("id", flat=True):
+        ranked = _top_up(_top(by_category[category_id], size), size, Recipe.objects.filter(categories__id=category_id))
+        rows += [
+            RecipeRanking(
+                kind=RecipeRanking.CATEGORY,
+                category_id=category_id,
+                position=position,
+                recipe_id=pk,
+                score=score,
+                computed_at=now,
+            )
+            for position, (pk, score) in enumerate(ranked)
+        ]
+
+    with transaction.atomic():
+        RecipeRanking.objects.all().delete()
+        RecipeRanking.objects.bulk_create(rows)
+    return len(rows)
+
+
+def refresh_rankings():
+    """Recompute the rankings and release ``REFRESH_LOCK_KEY``; run by the ``rankings.compute`` task."""
+    try:
+        return compute_rankings()
+    finally:
+        cache.delete(REFRESH_LOCK_KEY)
+
+
+def ensure_fresh_rankings():
+    """
+    Queue a recompute if the rankings are missing or older than the staleness window.
+
+    Only the request that takes ``REFRESH_LOCK_KEY`` queues the task; the lock
+    is held until the task finishes (or for one staleness window, should the
+    worker never run it), so pages carry on with the stored lists, or with
+    empty rails while there are none, instead of recomputing in the request.
+    """
+    latest = RecipeRanking.objects.order_by().values_list("computed_at", flat=True).first()
+    if latest is not None and timezone.now() - latest <= stale_after():
+        return
+    if not cache.add(REFRESH_LOCK_KEY, True, int(stale_after().total_seconds())):
+        return
+    enqueue("rankings.compute")
+
+
+def ranked_recipes(kind, category_ids=None, limit=6):
+    """
+    Return up to ``limit`` recipes from a stored ranking, best first.
+
+    For per-category rankings the lists of the given categories are
+    interleaved, so each category contributes its best recipes first.
+    """
+    ensure_fresh_rankings()
+    slots = RecipeRanking.objects.filter(kind=kind)
+    if category_ids is not None:
+        slots = slots.filter(category_id__in=category_ids)
+    slots = slots.filter(position__lt=limit).order_by("position", "category_id")
+
+    ordered_ids = list(dict.fromkeys(slots.values_list("recipe_id", flat=True)))[:limit]
+    recipes = base_recipe_queryset(include_categories=False).in_bulk(ordered_ids)
+    return [recipes[pk] for pk in ordered_ids if pk in recipes]
@@ -1,30 +1,35 @@
-from django.db.models import Q
-
+from recipes.category_masks import filter_by_categories
+from recipes.ingredients import recipes_using, split_names
 from recipes.models import User
+from recipes.search_index import get_search_backend
 
 # Filter a recipe queryset based on search text and category filters
 def filter_recipes(request, queryset):
    
     query = request.GET.get("q", "").strip()
-    queryset = queryset.filter(
-        Q(title__icontains=query)
-        | Q(description__icontains=query)
-        | Q(ingredients__icontains=query)
-    )
-
+    backend = get_search_backend()
+    if query:
+        queryset = backend.search(queryset, query)
+    else:
+        queryset = backend.unranked(queryset)
+
+    # Category filters are one bitwise test of Recipe.category_mask
+    required_ids = [int(x) for x in request.GET.getlist("dietary") if x.isdigit()]
     meal_id = request.GET.get("meal")
     if meal_id and meal_id.isdigit():
-        queryset = queryset.filter(categories__id=int(meal_id))
+        required_ids.append(int(meal_id))
+    exclude_ids = [int(x) for x in request.GET.getlist("exclude") if x.isdigit()]
+    queryset = filter_by_categories(queryset, required_ids, exclude_ids)
 
-    dietary_ids = [int(x) for x in request.GET.getlist("dietary") if x.isdigit()]
-    for d_id in dietary_ids:
-        queryset = queryset.filter(categories__id=d_id)
+    # Ingredient filters are lookups on the indexed parsed-ingredient names
+    for name in split_names(request.GET.getlist("ingredient")):
+        queryset = queryset.filter(id__in=recipes_using(name))
 
-    exclude_ids = [int(x) for x in request.GET.getlist("exclude") if x.isdigit()]
-    if exclude_ids:
-        queryset = queryset.exclude(categories__id__in=exclude_ids)
+    excluded_ingredients = split_names(request.GET.getlist("exclude_ingredient"))
+    if excluded_ingredients:
+        queryset = queryset.exclude(id__in=recipes_using(*excluded_ingredients))
 
-    return queryset.distinct()
+    return queryset
 
 # Filter users based on a username search query
 def filter_users(request):
@@ -0,0 +1,144 @@
+"""
+Full-text search backends for recipes.
+
+``filter_recipes`` hands the free-text part of a search to whichever backend
+``get_search_backend`` returns. The SQLite backend keeps an FTS5 virtual table
+(``recipes_recipe_fts``) in step with ``Recipe`` rows, so searches are an index
+lookup with bm25 ranking and prefix matching instead of ``icontains`` scans.
+Other databases fall back to ``ContainsSearchBackend`` until a dedicated
+backend (e.g. Postgres ``tsvector``) is configured via
+``settings.RECIPE_SEARCH_BACKEND``.
+"""
+
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+FTS_TABLE = "recipes_recipe_fts"
+SEARCH_FIELDS = ("title", "description", "ingredients")
+
+# Relative bm25 weights for title, description and ingredients matches
+FIELD_WEIGHTS = (10.0, 4.0, 1.0)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def search_terms(query):
+    """Split a raw search string into lowercase word tokens."""
+    return _TOKEN_RE.findall(query.lower())
+
+
+def build_match_expression(query):
+    """
+    Build an FTS5 MATCH expression where every term is a quoted prefix query.
+
+    Quoting each token means user input can never be parsed as FTS5 syntax,
+    and the trailing ``*`` gives search-as-you-type prefix matching.
+    """
+    return " ".join(f'"{term}"*' for term in search_terms(query))
+
+
+class SearchBackend:
+    """
+    Interface that every recipe search backend implements.
+
+    ``search`` must return the queryset filtered to matching recipes and
+    annotated with ``search_rank`` (lower is a better match).
+    """
+
+    def search(self, queryset, query):
+        raise NotImplementedError
+
+    def index(self, recipe):
+        """Add or refresh a recipe in the search index."""
+
+    def remove(self, recipe_id):
+        """Drop a recipe from the search index."""
+
+    def rebuild(self):
+        """Rebuild the whole index from the recipe table."""
+
+    def unranked(self, queryset):
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+class ContainsSearchBackend(SearchBackend):
+    """Portable fallback that keeps the original ``icontains`` behaviour."""
+
+    def search(self, queryset, query):
+        return self.unranked(
+            queryset.filter(
+                Q(title__icontains=query)
+                | Q(description__icontains=query)
+                | Q(ingredients__icontains=query)
+            )
+        )
+
+
+class SQLiteFTSSearchBackend(SearchBackend):
+    """Search backend backed by the SQLite FTS5 table ``recipes_recipe_fts``."""
+
+    def search(self, queryset, query):
+        match = build_match_expression(query)
+        if not match:
+            return ContainsSearchBackend().search(queryset, query)
+
+        # Join the FTS table so MATCH runs once and bm25 is read off the joined row
+        recipe_table = queryset.model._meta.db_table
+        weights = ", ".join(str(weight) for weight in FIELD_WEIGHTS)
+        rank = RawSQL(f"bm25({FTS_TABLE}, {weights})", [], output_field=FloatField())
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f"{FTS_TABLE}.rowid = {recipe_table}.id", f"{FTS_TABLE} MATCH %s"],
+            params=[match],
+        ).annotate(search_rank=rank)
+
+    def index(self, recipe):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [recipe.pk])
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, description, ingredients) "
+                "VALUES (%s, %s, %s, %s)",
+                [recipe.pk, recipe.title, recipe.description, recipe.ingredients],
+            )
+
+    def remove(self, recipe_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [recipe_id])
+
+    def rebuild(self):
+        from recipes.models import Recipe
+
+        recipe_table = Recipe._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, description, ingredients) "
+                f"SELECT id, title, description, ingredients FROM {recipe_table}"
+            )
+
+
+@lru_cache(maxsize=None)
+def _load_backend(path):
+    return import_string(path)()
+
+
+def get_search_backend():
+    """
+    Return the configured search backend.
+
+    ``settings.RECIPE_SEARCH_BACKEND`` may name any ``SearchBackend`` subclass;
+    when unset, SQLite databases use FTS5 and everything else uses ``icontains``.
+    """
+    path = getattr(settings, "RECIPE_SEARCH_BACKEND", None)
+    if not path:
+        if connection.vendor == "sqlite":
+            path = "recipes.search_index.SQLiteFTSSearchBackend"
+        else:
+            path = "recipes.search_index.ContainsSearchBackend"
+    return _load_backend(path)
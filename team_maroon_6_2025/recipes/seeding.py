@@ -0,0 +1,434 @@
+"""
+Bulk generation of demo and load-test datasets.
+
+``Seeder`` writes every table with batched ``bulk_create`` calls. It does
+not use ``save()`` or ``create_user()``, so a million recipes take minutes
+rather than hours:
+
+* the shared default password is hashed once and copied to every user;
+* names, words and sentences come from small Faker-generated pools that are
+  recombined at random, since calling Faker per row dominates the run time;
+* recipe images point at a small pool of placeholder files, generated and
+  processed once, instead of rendering one JPEG per recipe;
+* follows, favourites and ratings are drawn with a popularity skew, and
+  ratings follow a realistic 1-5 distribution, so rankings and feeds see
+  lifelike data.
+
+``bulk_create`` sends no model signals. ``Seeder.run`` therefore finishes by
+rebuilding every derived structure itself: search index, parsed
+ingredients, counters, timelines and rankings. The ``seed`` command and the
+``benchmark`` command both drive this class.
+"""
+
+import io
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from faker import Faker
+from PIL import Image
+
+from recipes import category_masks, counters, images, ingredients, notifications, rankings, timeline
+from recipes.models import (
+    Category,
+    Comment,
+    FollowRequest,
+    Notification,
+    Recipe,
+    RecipeImage,
+    RecipeRating,
+    ShoppingListItem,
+    User,
+)
+from recipes.search_index import get_search_backend
+
+DEFAULT_PASSWORD = "Password123"
+
+CATEGORIES = [
+    ("vegan", "Vegan"),
+    ("vegetarian", "Vegetarian"),
+    ("pescatarian", "Pescatarian"),
+    ("gluten_free", "Gluten-Free"),
+    ("breakfast", "Breakfast"),
+    ("lunch", "Lunch"),
+    ("dinner", "Dinner"),
+    ("dessert", "Dessert"),
+    ("spicy", "Spicy"),
+    ("non_spicy", "Non-Spicy"),
+]
+
+# Share of ratings given each star value, 1 to 5
+RATING_WEIGHTS = [4, 8, 20, 38, 30]
+
+# Recipes and comments are spread over this many days before now
+HISTORY_DAYS = 365
+
+POOL_SIZE = 400
+
+# Popularity-skewed draws for ratings before the rest are sampled uniformly
+RATING_DRAW_ROUNDS = 20
+IMAGE_COLOURS = [(230, 230, 230), (240, 214, 180), (198, 226, 190), (250, 200, 190), (210, 220, 245), (245, 235, 190)]
+
+
+@contextmanager
+def explicit_timestamps(model, *field_names):
+    """Let ``bulk_create`` keep the given ``auto_now_add`` values instead of overwriting them."""
+    fields = [model._meta.get_field(name) for name in field_names]
+    previous = [field.auto_now_add for field in fields]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, value in zip(fields, previous):
+            field.auto_now_add = value
+
+
+def safe_token(value, default):
+    """Return only the lowercase alphanumerics of ``value``; fall back to ``default`` if empty."""
+    cleaned = "".join(ch for ch in value.lower() if ch.isalnum())
+    return cleaned or default
+
+
+class Seeder:
+    """
+    Generate a dataset of a chosen size.
+
+    Counts are the number of rows to add, except ``users``, which is the total
+    the user table should reach. ``follows``, ``favourites`` and
+    ``shopping_items`` are averages per user.
+
+    Attributes:
+        users (int): Target total number of users.
+        recipes (int): Recipes to create.
+        ratings (int): Ratings to create (capped by the distinct user/recipe pairs).
+        comments (int): Comments to create.
+        follows (int): Average number of accounts each user follows.
+        favourites (int): Average number of recipes each user favourites.
+        follow_requests (int): Pending follow requests to create.
+        shopping_items (int): Average number of shopping list items per user.
+        image_pool (int): Distinct placeholder images shared by the recipes; 0 for none.
+        batch_size (int): Rows per ``bulk_create`` statement.
+    """
+
+    def __init__(self, *, users=1000, recipes=500, ratings=0, comments=0, follows=0, favourites=0,
+                 follow_requests=0, shopping_items=0, image_pool=8, batch_size=2000, seed=None, log=None):
+        self.users = users
+        self.recipes = recipes
+        self.ratings = ratings
+        self.comments = comments
+        self.follows = follows
+        self.favourites = favourites
+        self.follow_requests = follow_requests
+        self.shopping_items = shopping_items
+        self.image_pool = image_pool
+        self.batch_size = batch_size
+        self.random = random.Random(seed)
+        self.faker = Faker("en_GB")
+        if seed is not None:
+            self.faker.seed_instance(seed)
+        self.log = log or (lambda message: None)
+        self.now = timezone.now()
+
+    def run(self):
+        """Seed everything, rebuild the derived tables and return the created row counts."""
+        self._build_pools()
+        created = {"categories": self.seed_categories()}
+        created["users"] = self.seed_users()
+        user_ids = list(User.objects.values_list("id", flat=True))
+        category_ids = list(Category.objects.values_list("id", flat=True))
+        if not user_ids:
+            return created
+
+        recipe_ids = self.seed_recipes(user_ids, category_ids)
+        created["recipes"] = len(recipe_ids)
+        all_recipe_ids = list(Recipe.objects.values_list("id", flat=True))
+        created["follows"] = self.seed_follows(user_ids)
+        created["favourites"] = self.seed_favourites(user_ids, all_recipe_ids)
+        created["ratings"] = self.seed_ratings(user_ids, all_recipe_ids)
+        created["comments"] = self.seed_comments(user_ids, all_recipe_ids)
+        created["follow_requests"] = self.seed_follow_requests(user_ids)
+        created["shopping_items"] = self.seed_shopping_items(user_ids, all_recipe_ids)
+        self.rebuild_derived()
+        return created
+
+    # Pools of generated text -------------------------------------------------
+
+    def _build_pools(self):
+        faker = self.faker
+        self.first_names = [faker.first_name() for _ in range(POOL_SIZE)]
+        self.last_names = [faker.last_name() for _ in range(POOL_SIZE)]
+        self.titles = [faker.catch_phrase() for _ in range(POOL_SIZE)]
+        self.words = [faker.word() for _ in range(POOL_SIZE)]
+        self.sentences = [faker.sentence(nb_words=8) for _ in range(POOL_SIZE)]
+
+    def _when(self, after=None):
+        """Return a random moment between ``after`` (default a year ago) and now."""
+        start = after or self.now - timedelta(days=HISTORY_DAYS)
+        span = max((self.now - start).total_seconds(), 1)
+        return start + timedelta(seconds=self.random.random() * span)
+
+    def _popular(self, ids, count):
+        """Draw ``count`` ids, favouring those early in ``ids`` (a Zipf-like skew)."""
+        size = len(ids)
+        return [ids[min(int(size * self.random.random() ** 2.5), size - 1)] for _ in range(count)]
+
+    def _bulk(self, model, objects, **options):
+        """Bulk-insert ``objects`` and return the number of rows actually written."""
+        if not options.get("ignore_conflicts"):
+            model.objects.bulk_create(objects, batch_size=self.batch_size, **options)
+            return len(objects)
+        # Rows dropped as conflicts are not reported back, so count the table instead
+        before = model.objects.count()
+        model.objects.bulk_create(objects, batch_size=self.batch_size, **options)
+        return model.objects.count() - before
+
+    # Tables --------------------------------------------------------------------
+
+    def seed_categories(self):
+        created = 0
+        for key, label in CATEGORIES:
+            obj, was_created = Category.objects.get_or_create(key=key, defaults={"label": label})
+            if not was_created and obj.label != label:
+                obj.label = label
+                obj.save(update_fields=["label"])
+            created += int(was_created)
+        return created
+
+    def seed_users(self):
+        missing = self.users - User.objects.count()
+        if missing <= 0:
+            return 0
+        password = make_password(DEFAULT_PASSWORD)
+        start = (User.objects.order_by("-id").values_list("id", flat=True).first() or 0) + 1
+        created = 0
+        for offset in range(0, missing, self.batch_size):
+            batch = []
+            for number in range(start + offset, start + min(offset + self.batch_size, missing)):
+                first_name = self.random.choice(self.first_names)
+                last_name = self.random.choice(self.last_names)
+                token = (safe_token(first_name, "user") + safe_token(last_name, "seed"))[:20]
+                batch.append(User(
+                    username=f"@{token}{number}"[:30],
+                    email=f"{token}.{number}@example.org",
+                    first_name=first_name,
+                    last_name=last_name,
+                    password=password,
+                ))
+            created += self._bulk(User, batch, ignore_conflicts=True)
+            self.log(f"Seeded {created}/{missing} users")
+        return created
+
+    def _recipe(self, author_id):
+        rng = self.random
+        return Recipe(
+            author_id=author_id,
+            title=f"{rng.choice(self.titles)} {rng.choice(self.words).title()}"[:200],
+            description=rng.choice(self.sentences),
+            ingredients="\n".join(f"{rng.randint(1, 3)} {rng.choice(self.words)}" for _ in range(rng.randint(4, 8))),
+            instructions="\n".join(rng.sample(self.sentences, rng.randint(3, 6))),
+            created_at=self._when(),
+        )
+
+    def seed_recipes(self, user_ids, category_ids):
+        pool = self._image_pool()
+        authors = self._popular(user_ids, self.recipes)
+        recipe_ids = []
+        for offset in range(0, self.recipes, self.batch_size):
+            batch = [self._recipe(author_id) for author_id in authors[offset:offset + self.batch_size]]
+            with explicit_timestamps(Recipe, "created_at"):
+                Recipe.objects.bulk_create(batch)
+            ids = [recipe.pk for recipe in batch]
+            recipe_ids += ids
+
+            memberships = {
+                (pk, category_id)
+                for pk in ids
+                for category_id in self.random.sample(category_ids, min(len(category_ids), self.random.randint(1, 3)))
+            }
+            self._bulk(Recipe.categories.through, [
+                Recipe.categories.through(recipe_id=pk, category_id=category_id) for pk, category_id in memberships
+            ])
+            if pool:
+                self._bulk(RecipeImage, [
+                    RecipeImage(recipe_id=recipe.pk, caption=recipe.title[:200], **self.random.choice(pool))
+                    for recipe in batch
+                ])
+            self.log(f"Seeded {len(recipe_ids)}/{self.recipes} recipes")
+        return recipe_ids
+
+    def _image_pool(self):
+        """Save and process ``image_pool`` placeholder images once; return RecipeImage field values."""
+        pool = []
+        for index in range(self.image_pool):
+            buffer = io.BytesIO()
+            Image.new("RGB", (800, 450), color=IMAGE_COLOURS[index % len(IMAGE_COLOURS)]).save(buffer, format="JPEG")
+            name = default_storage.save(f"recipes/seed-{index}.jpg", ContentFile(buffer.getvalue()))
+            sample = RecipeImage(image=name)
+            images.process_recipe_image(sample)
+            pool.append({
+                "image": sample.image.name,
+                "width": sample.width,
+                "height": sample.height,
+                "variants": sample.variants,
+                "processed_at": sample.processed_at,
+            })
+        return pool
+
+    def seed_follows(self, user_ids):
+        if not self.follows or len(user_ids) < 2:
+            return 0
+        pairs = set()
+        for follower_id in user_ids:
+            for followed_id in self._popular(user_ids, self.random.randint(0, 2 * self.follows)):
+                if followed_id != follower_id:
+                    pairs.add((follower_id, followed_id))
+        through = User.following.through
+        created = self._bulk(through, [through(from_user_id=a, to_user_id=b) for a, b in pairs], ignore_conflicts=True)
+        self._notify("follow", [(b, a, None) for a, b in pairs])
+        return created
+
+    def seed_favourites(self, user_ids, recipe_ids):
+        if not self.favourites or not recipe_ids:
+            return 0
+        pairs = {
+            (user_id, recipe_id)
+            for user_id in user_ids
+            for recipe_id in self._popular(recipe_ids, self.random.randint(0, 2 * self.favourites))
+        }
+        through = User.favourites.through
+        created = self._bulk(through, [through(user_id=u, recipe_id=r) for u, r in pairs], ignore_conflicts=True)
+        recipe_authors = dict(Recipe.objects.values_list("id", "author_id"))
+        self._notify("favourite", [
+            (recipe_authors[r], u, r) for u, r in pairs if recipe_authors[r] != u
+        ], target_model=Recipe)
+        return created
+
+    def seed_ratings(self, user_ids, recipe_ids):
+        if not self.ratings or not recipe_ids:
+            return 0
+        total_pairs = len(user_ids) * len(recipe_ids)
+        target = min(self.ratings, total_pairs)
+        pairs = set()
+        for _ in range(RATING_DRAW_ROUNDS):
+            if len(pairs) >= target:
+                break
+            pairs.update(zip(
+                self._popular(recipe_ids, target - len(pairs)),
+                (self.random.choice(user_ids) for _ in range(target - len(pairs))),
+            ))
+        if len(pairs) < target:
+            # The skewed draws keep hitting used pairs as the target nears every
+            # pair, so take the rest uniformly: ``target`` distinct pairs hold at
+            # least the missing number of unused ones
+            for index in self.random.sample(range(total_pairs), target):
+                pairs.add((recipe_ids[index % len(recipe_ids)], user_ids[index // len(recipe_ids)]))
+                if len(pairs) >= target:
+                    break
+        stars = self.random.choices(range(1, 6), weights=RATING_WEIGHTS, k=len(pairs))
+        return self._bulk(RecipeRating, [
+            RecipeRating(recipe_id=recipe_id, user_id=user_id, rating=rating)
+            for (recipe_id, user_id), rating in zip(pairs, stars)
+        ], ignore_conflicts=True)
+
+    def seed_comments(self, user_ids, recipe_ids):
+        if not self.comments or not recipe_ids:
+            return 0
+        created = 0
+        recipe_authors = dict(Recipe.objects.values_list("id", "author_id"))
+        for offset in range(0, self.comments, self.batch_size):
+            size = min(self.batch_size, self.comments - offset)
+            batch = []
+            for recipe_id in self._popular(recipe_ids, size):
+                created_at = self._when()
+                batch.append(Comment(
+                    recipe_id=recipe_id,
+                    author_id=self.random.choice(user_ids),
+                    body=self.random.choice(self.sentences),
+                    created_at=created_at,
+                ))
+            with explicit_timestamps(Comment, "created_at"):
+                Comment.objects.bulk_create(batch, batch_size=self.batch_size)
+            self._notify("comment", [
+                (recipe_authors[c.recipe_id], c.author_id, c.recipe_id) for c in batch if recipe_authors[c.recipe_id] != c.author_id
+            ], target_model=Recipe)
+            created += size
+            self.log(f"Seeded {created}/{self.comments} comments")
+        return created
+
+    def seed_follow_requests(self, user_ids):
+        if not self.follow_requests or len(user_ids) < 2:
+            return 0
+        pairs = {
+            (requester_id, requested_id)
+            for requester_id, requested_id in zip(
+                (self.random.choice(user_ids) for _ in range(self.follow_requests)),
+                self._popular(user_ids, self.follow_requests),
+            )
+            if requester_id != requested_id
+        }
+        with explicit_timestamps(FollowRequest, "created_at"):
+            created = self._bulk(FollowRequest, [
+                FollowRequest(follow_requester_id=a, requested_user_id=b, created_at=self._when()) for a, b in pairs
+            ], ignore_conflicts=True)
+        self._notify("request", [(b, a, None) for a, b in pairs])
+        return created
+
+    def seed_shopping_items(self, user_ids, recipe_ids):
+        if not self.shopping_items:
+            return 0
+        users_per_batch = max(1, self.batch_size // self.shopping_items)
+        created = 0
+        for offset in range(0, len(user_ids), users_per_batch):
+            batch = [
+                ShoppingListItem(
+                    user_id=user_id,
+                    source_recipe_id=self.random.choice(recipe_ids) if recipe_ids else None,
+                    name=self.random.choice(self.words),
+                    is_checked=self.random.random() < 0.3,
+                )
+                for user_id in user_ids[offset:offset + users_per_batch]
+                for _ in range(self.random.randint(0, 2 * self.shopping_items))
+            ]
+            created += self._bulk(ShoppingListItem, batch, ignore_conflicts=True)
+        return created
+
+    def _notify(self, notification_type, rows, target_model=None):
+        """Bulk-create notifications for ``(recipient_id, sender_id, object_id)`` rows."""
+        content_type = ContentType.objects.get_for_model(target_model) if target_model else None
+        with explicit_timestamps(Notification, "created_at"):
+            self._bulk(Notification, [
+                Notification(
+                    recipient_id=recipient_id,
+                    sender_id=sender_id,
+                    notification_type=notification_type,
+                    content_type=content_type,
+                    object_id=object_id,
+                    recent_actors=[sender_id],
+                    created_at=self._when(),
+                )
+                for recipient_id, sender_id, object_id in rows
+            ])
+
+    # Derived data --------------------------------------------------------------
+
+    def rebuild_derived(self):
+        """Rebuild what model signals would normally maintain, then drop stale cache entries."""
+        self.log("Rebuilding search index, parsed ingredients, category masks, counters, timelines and rankings")
+        with transaction.atomic():
+            get_search_backend().rebuild()
+            ingredients.rebuild_ingredients()
+            category_masks.rebuild_category_masks()
+            counters.recount_recipes(invalidate=False)
+            notifications.refresh_unread_totals()
+            timeline.refresh_follower_totals()
+            timeline.rebuild_all_timelines()
+        rankings.compute_rankings()
+        cache.clear()
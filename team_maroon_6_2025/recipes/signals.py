@@ -0,0 +1,194 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from recipes import category_masks, category_registry, counters, images, ingredients, notifications, timeline
+from recipes.caching import CATEGORY_SCOPE, RECIPE_SCOPE, bump_recipe_versions, bump_version
+from recipes.models import Category, Comment, Notification, Recipe, RecipeImage, RecipeRating, User
+from recipes.task_queue import enqueue
+
+# Keep the full-text search index in step with recipe writes
+@receiver(post_save, sender=Recipe)
+def index_recipe(sender, instance, **kwargs):
+    enqueue("search.index", recipe_id=instance.pk)
+
+# Fan new recipes out to their author's followers' timelines
+@receiver(post_save, sender=Recipe)
+def fan_out_recipe(sender, instance, created, **kwargs):
+    if created:
+        enqueue("timeline.fan_out", recipe_id=instance.pk)
+
+# Keep the parsed ingredient rows in step with the ingredients text
+@receiver(post_save, sender=Recipe)
+def parse_recipe_ingredients(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or (update_fields is not None and "ingredients" not in update_fields):
+        return
+    ingredients.sync_recipe_ingredients(instance)
+
+@receiver(post_delete, sender=Recipe)
+def unindex_recipe(sender, instance, **kwargs):
+    enqueue("search.remove", recipe_id=instance.pk)
+
+# Keep the denormalised counters on Recipe in step with comments, ratings and favourites
+@receiver(post_save, sender=Comment)
+def count_new_comment(sender, instance, created, **kwargs):
+    if created:
+        counters.adjust_comment_total(instance.recipe_id, 1)
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    counters.adjust_comment_total(instance.recipe_id, -1)
+
+@receiver(post_save, sender=RecipeRating)
+@receiver(post_delete, sender=RecipeRating)
+def count_ratings(sender, instance, **kwargs):
+    counters.refresh_rating_totals([instance.recipe_id])
+
+@receiver(m2m_changed, sender=User.favourites.through)
+def count_favourites(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear":
+        if reverse:
+            instance._cleared_favourite_ids = [instance.pk]
+        else:
+            instance._cleared_favourite_ids = list(instance.favourites.values_list("pk", flat=True))
+    elif action == "post_clear":
+        counters.refresh_favourites_totals(getattr(instance, "_cleared_favourite_ids", []))
+    elif action == "post_add" and pk_set:
+        # pk_set only holds newly inserted rows here, so a plain increment is exact
+        if reverse:
+            counters.adjust_favourites_total([instance.pk], len(pk_set))
+        else:
+            counters.adjust_favourites_total(pk_set, 1)
+    elif action == "post_remove" and pk_set:
+        counters.refresh_favourites_totals([instance.pk] if reverse else sorted(pk_set))
+
+# Keep each user's unread notification counter in step (see recipes.notifications)
+@receiver(post_save, sender=Notification)
+def count_new_notification(sender, instance, created, **kwargs):
+    if created and not instance.is_read:
+        notifications.adjust_unread_total(instance.recipient_id, 1)
+
+@receiver(pre_delete, sender=User)
+def collect_notified_users(sender, instance, **kwargs):
+    # Notifications the user sent disappear with them by cascade
+    instance._notified_user_ids = list(
+        Notification.objects.filter(sender=instance, is_read=False)
+        .exclude(recipient=instance)
+        .order_by()
+        .values_list("recipient_id", flat=True)
+        .distinct()
+    )
+
+@receiver(post_delete, sender=User)
+def recount_notified_users(sender, instance, **kwargs):
+    user_ids = getattr(instance, "_notified_user_ids", [])
+    if user_ids:
+        notifications.refresh_unread_totals(user_ids)
+
+# Keep User.follower_total in step with follows and unfollows
+@receiver(m2m_changed, sender=User.following.through)
+def count_followers(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear" and not reverse:
+        instance._cleared_followed_ids = list(instance.following.values_list("pk", flat=True))
+    elif action == "post_clear":
+        timeline.refresh_follower_totals([instance.pk] if reverse else getattr(instance, "_cleared_followed_ids", []))
+    elif action == "post_add" and pk_set:
+        # pk_set only holds newly inserted rows here, so a plain increment is exact
+        if reverse:
+            timeline.adjust_follower_totals([instance.pk], len(pk_set))
+        else:
+            timeline.adjust_follower_totals(pk_set, 1)
+    elif action == "post_remove" and pk_set:
+        timeline.refresh_follower_totals([instance.pk] if reverse else sorted(pk_set))
+
+@receiver(pre_delete, sender=User)
+def collect_followed_users(sender, instance, **kwargs):
+    # The user's follows disappear with them by cascade
+    instance._followed_user_ids = list(instance.following.values_list("pk", flat=True))
+
+@receiver(post_delete, sender=User)
+def recount_followed_users(sender, instance, **kwargs):
+    user_ids = getattr(instance, "_followed_user_ids", [])
+    if user_ids:
+        timeline.refresh_follower_totals(user_ids)
+
+# Keep materialised timelines in step with follows and unfollows
+@receiver(m2m_changed, sender=User.following.through)
+def sync_timelines(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear":
+        related = instance.followers if reverse else instance.following
+        instance._cleared_follow_ids = list(related.values_list("pk", flat=True))
+        return
+    if action == "post_clear":
+        pk_set = getattr(instance, "_cleared_follow_ids", [])
+    elif action not in ("post_add", "post_remove") or not pk_set:
+        return
+
+    for other_id in pk_set:
+        user_id, author_id = (other_id, instance.pk) if reverse else (instance.pk, other_id)
+        if action == "post_add":
+            timeline.backfill_timeline(user_id, author_id)
+        else:
+            timeline.remove_author(user_id, author_id)
+
+# Invalidate cached recipe fragments (see recipes.caching); counter updates bump
+# their own versions inside recipes.counters
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def invalidate_recipe(sender, instance, **kwargs):
+    bump_version(RECIPE_SCOPE, instance.pk)
+
+@receiver(post_save, sender=RecipeImage)
+@receiver(post_delete, sender=RecipeImage)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_parent_recipe(sender, instance, **kwargs):
+    bump_version(RECIPE_SCOPE, instance.recipe_id)
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_categories(sender, instance, **kwargs):
+    bump_version(CATEGORY_SCOPE)
+    category_registry.invalidate()
+
+@receiver(m2m_changed, sender=Recipe.categories.through)
+def invalidate_recipe_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if reverse:
+        # pk_set may be unknown (clear), so move the shared category version instead
+        bump_version(CATEGORY_SCOPE)
+    else:
+        bump_recipe_versions([instance.pk])
+
+# Keep Recipe.category_mask in step with the recipes' categories
+@receiver(m2m_changed, sender=Recipe.categories.through)
+def mask_recipe_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            category_masks.refresh_category_masks([instance.pk])
+    elif action == "pre_clear":
+        instance._cleared_recipe_ids = list(instance.recipes.values_list("pk", flat=True))
+    elif action == "post_clear":
+        category_masks.refresh_category_masks(getattr(instance, "_cleared_recipe_ids", []))
+    elif action in ("post_add", "post_remove") and pk_set:
+        category_masks.refresh_category_masks(pk_set)
+
+@receiver(post_delete, sender=Category)
+def unmask_deleted_category(sender, instance, **kwargs):
+    if instance.bit is not None:
+        category_masks.clear_category_bit(instance.bit)
+
+# Generate thumbnails and resized copies for new or replaced uploads
+@receiver(post_save, sender=RecipeImage)
+def process_recipe_image(sender, instance, **kwargs):
+    if instance.image and not instance.is_processed:
+        enqueue("images.process", image_id=instance.pk)
+
+@receiver(post_delete, sender=RecipeImage)
+def delete_recipe_image_derivatives(sender, instance, **kwargs):
+    # seeded rows share one set of files; keep them while any row still uses them
+    if RecipeImage.objects.filter(image=instance.image.name).exists():
+        return
+    names = images.derivative_names(instance)
+    if names:
+        enqueue("images.delete_files", names=names)
@@ -0,0 +1,122 @@
+"""
+Opt-in slow-query log.
+
+With ``SLOW_QUERY_LOG = True`` every statement a request runs for longer
+than ``SLOW_QUERY_THRESHOLD_MS`` is kept by ``RequestMetrics`` and, once the
+response is ready, stored by ``record_slow_queries``. The statement is
+normalised (literals, parameters and ``IN`` lists collapsed) and hashed, so
+each shape of query produced by ``base_recipe_queryset`` and
+``filter_recipes`` aggregates into one ``SlowQuery`` row. Each row keeps the
+count and timings, the latest ``EXPLAIN`` plan, the view that ran it and the
+request's filter parameters. ``manage.py slow_queries`` prints the worst
+offenders.
+"""
+
+import hashlib
+import logging
+import re
+
+from django.db import DatabaseError, connections
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from recipes.models import SlowQuery
+
+logger = logging.getLogger("recipes.queries")
+
+# Request parameters that shape the recipe query builders
+FILTER_PARAMS = ("sort", "q", "meal", "dietary", "exclude", "ingredient", "exclude_ingredient")
+
+_IN_LIST = re.compile(r"\bIN\s*\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)", re.IGNORECASE)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w\"])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|\?")
+_SPACE = re.compile(r"\s+")
+_FULL_SCAN = re.compile(r"^\s*SCAN (?!CONSTANT)(?!.*USING (?:COVERING )?INDEX)|Seq Scan", re.MULTILINE)
+
+
+def normalize_sql(sql):
+    """Collapse literals, placeholders and ``IN`` lists so equal query shapes compare equal."""
+    sql = _IN_LIST.sub("IN (...)", sql)
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+def fingerprint(sql):
+    return hashlib.sha1(normalize_sql(sql).encode()).hexdigest()
+
+
+def _json_params(params):
+    if not isinstance(params, (list, tuple)):
+        return []
+    return [value if isinstance(value, (bool, int, float, str, type(None))) else str(value) for value in params]
+
+
+def explain(sql, params, using="default"):
+    """Return the database's plan for a SELECT, one step per line, or an empty string."""
+    if not sql.lstrip().upper().startswith(("SELECT", "WITH")):
+        return ""
+    connection = connections[using]
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}", params)
+            return "\n".join(str(row[-1]) for row in cursor.fetchall())
+    except DatabaseError:
+        logger.debug("Could not explain slow query", exc_info=True)
+        return ""
+
+
+def is_full_scan(plan):
+    """Whether a plan reads a whole table without using an index."""
+    return bool(_FULL_SCAN.search(plan))
+
+
+def request_params(request):
+    return {key: request.GET.getlist(key) for key in FILTER_PARAMS if key in request.GET}
+
+
+def record_slow_queries(metrics, request):
+    """Store the slow statements kept by a request's ``RequestMetrics``."""
+    if not metrics.slow:
+        return
+    match = getattr(request, "resolver_match", None)
+    view_name = match.view_name if match else request.path
+    params_of_request = request_params(request)
+
+    # Group this request's executions by shape; only the slowest one is explained
+    grouped = {}
+    for sql, params, duration, using in metrics.slow:
+        group = grouped.setdefault(fingerprint(sql), {"calls": 0, "total_ms": 0.0, "slowest": None})
+        group["calls"] += 1
+        group["total_ms"] += duration
+        if group["slowest"] is None or duration > group["slowest"][2]:
+            group["slowest"] = (sql, params, duration, using)
+
+    now = timezone.now()
+    for key, group in grouped.items():
+        sql, params, duration, using = group["slowest"]
+        plan = explain(sql, params, using)
+        SlowQuery.objects.get_or_create(fingerprint=key, defaults={"normalized_sql": normalize_sql(sql)})
+        SlowQuery.objects.filter(fingerprint=key).update(
+            sample_sql=sql,
+            sample_params=_json_params(params),
+            plan=plan,
+            full_scan=is_full_scan(plan),
+            view_name=view_name,
+            request_params=params_of_request,
+            calls=F("calls") + group["calls"],
+            total_ms=F("total_ms") + group["total_ms"],
+            max_ms=Greatest(F("max_ms"), duration),
+            last_seen=now,
+        )
+
+
+def top_offenders(order="total_ms", limit=10, full_scans_only=False):
+    """Return the worst ``SlowQuery`` rows by ``total_ms``, ``max_ms`` or ``calls``."""
+    queryset = SlowQuery.objects.all()
+    if full_scans_only:
+        queryset = queryset.filter(full_scan=True)
+    return list(queryset.order_by(f"-{order}", "-last_seen")[:limit])
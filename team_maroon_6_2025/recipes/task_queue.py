@@ -0,0 +1,146 @@
+"""
+A small database-backed background task queue.
+
+Functions are registered under a name with ``@task("name")`` and queued
+with ``enqueue("name", **payload)``. The payload must be JSON-serialisable,
+so pass ids rather than model instances. Queued tasks are ``Task`` rows
+written in the caller's transaction; the ``run_tasks`` management command
+claims and runs them, retrying failures with exponential backoff until
+``max_attempts`` is reached. No broker is needed.
+
+With ``TASK_QUEUE_EAGER = True`` (the default, and what the tests use)
+``enqueue`` runs the function immediately instead, so everything works
+without a worker. Set it to False in production and run the worker next to
+the web processes.
+"""
+
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Min
+from django.utils import timezone
+
+from recipes.models import Task
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+
+
+def is_eager():
+    return getattr(settings, "TASK_QUEUE_EAGER", True)
+
+
+def retry_delay(attempts):
+    """Seconds to wait before the next attempt: 2, 4, 8, ... capped at an hour."""
+    base = getattr(settings, "TASK_RETRY_BASE_SECONDS", 2)
+    return min(base ** attempts, 3600)
+
+
+def visibility_timeout():
+    return timedelta(seconds=getattr(settings, "TASK_VISIBILITY_TIMEOUT", 300))
+
+
+def task(name):
+    """Register the decorated function as the handler for tasks called ``name``."""
+    def register(func):
+        TASKS[name] = func
+        return func
+    return register
+
+
+def enqueue(name, max_attempts=5, **payload):
+    """Queue ``name`` to run with ``payload``, or run it now in eager mode."""
+    if name not in TASKS:
+        raise KeyError(f"Unknown task {name!r}")
+    if is_eager():
+        TASKS[name](**payload)
+        return None
+    return Task.objects.create(name=name, payload=payload, max_attempts=max_attempts, run_after=timezone.now())
+
+
+def requeue_stale():
+    """Return tasks whose worker disappeared mid-run to the queue."""
+    return Task.objects.filter(status=Task.RUNNING, locked_at__lt=timezone.now() - visibility_timeout()).update(
+        status=Task.PENDING, locked_at=None
+    )
+
+
+def claim(limit):
+    """
+    Claim up to ``limit`` due tasks for this worker.
+
+    Each row is claimed with a conditional UPDATE, so several workers can poll
+    the same table without running a task twice, on any database backend.
+    """
+    now = timezone.now()
+    candidates = (
+        Task.objects.filter(status=Task.PENDING, run_after__lte=now)
+        .order_by("run_after", "id")
+        .values_list("id", flat=True)[:limit]
+    )
+    claimed = []
+    for pk in list(candidates):
+        taken = Task.objects.filter(pk=pk, status=Task.PENDING).update(
+            status=Task.RUNNING, locked_at=now, attempts=F("attempts") + 1
+        )
+        if taken:
+            claimed.append(pk)
+    return list(Task.objects.filter(pk__in=claimed).order_by("run_after", "id"))
+
+
+def run_task(queued):
+    """Run one claimed task, deleting it on success and scheduling a retry on failure."""
+    func = TASKS.get(queued.name)
+    try:
+        if func is None:
+            raise KeyError(f"Unknown task {queued.name!r}")
+        with transaction.atomic():
+            func(**queued.payload)
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning("Task %s (%s) failed on attempt %s", queued.pk, queued.name, queued.attempts)
+        if queued.attempts >= queued.max_attempts:
+            Task.objects.filter(pk=queued.pk).update(status=Task.FAILED, locked_at=None, last_error=error)
+        else:
+            Task.objects.filter(pk=queued.pk).update(
+                status=Task.PENDING,
+                locked_at=None,
+                last_error=error,
+                run_after=timezone.now() + timedelta(seconds=retry_delay(queued.attempts)),
+            )
+        return False
+    Task.objects.filter(pk=queued.pk).delete()
+    return True
+
+
+def run_pending(limit=100):
+    """Claim and run one batch of due tasks. Returns ``(succeeded, failed)``."""
+    requeue_stale()
+    succeeded = failed = 0
+    for queued in claim(limit):
+        if run_task(queued):
+            succeeded += 1
+        else:
+            failed += 1
+    return succeeded, failed
+
+
+def queue_stats():
+    """
+    Summarise the queue for monitoring.
+
+    Returns ``{"pending": n, "running": n, "failed": n, "oldest_pending": datetime,
+    "by_name": {name: {status: n}}}``.
+    """
+    stats = {status: 0 for status, _ in Task.STATUSES}
+    by_name = {}
+    for name, status, total in Task.objects.values_list("name", "status").annotate(total=Count("id")).order_by():
+        stats[status] += total
+        by_name.setdefault(name, {})[status] = total
+    stats["oldest_pending"] = Task.objects.filter(status=Task.PENDING).aggregate(oldest=Min("created_at"))["oldest"]
+    stats["by_name"] = by_name
+    return stats
@@ -0,0 +1,65 @@
+"""
+Background tasks run through ``recipes.task_queue``.
+
+Each task takes plain ids so it can be stored as JSON, and tolerates the
+object having been deleted before the worker gets to it.
+"""
+
+from recipes import images, notifications, rankings, timeline
+from recipes.models import Recipe, RecipeImage
+from recipes.search_index import get_search_backend
+from recipes.task_queue import task
+
+
+@task("images.process")
+def process_image(image_id):
+    recipe_image = RecipeImage.objects.filter(pk=image_id).first()
+    if recipe_image is None or not recipe_image.image or recipe_image.is_processed:
+        return
+    if recipe_image.variants:
+        images.delete_derivatives(recipe_image)
+    images.process_recipe_image(recipe_image)
+
+
+@task("images.delete_files")
+def delete_image_files(names):
+    images.delete_files(names)
+
+
+@task("notifications.create")
+def create_notification(**fields):
+    notifications.create_notification(**fields)
+
+
+@task("notifications.delete")
+def delete_notifications(**fields):
+    notifications.delete_notifications(**fields)
+
+
+@task("rankings.compute")
+def compute_rankings():
+    rankings.refresh_rankings()
+
+
+@task("search.index")
+def index_recipe(recipe_id):
+    recipe = Recipe.objects.filter(pk=recipe_id).first()
+    if recipe is not None:
+        get_search_backend().index(recipe)
+
+
+@task("search.remove")
+def unindex_recipe(recipe_id):
+    get_search_backend().remove(recipe_id)
+
+
+@task("timeline.fan_out")
+def fan_out_recipe(recipe_id):
+    recipe = Recipe.objects.filter(pk=recipe_id).first()
+    if recipe is not None:
+        timeline.fan_out_recipe(recipe)
+
+
+@task("timeline.trim")
+def trim_timelines(user_ids):
+    timeline.trim_timelines(user_ids)
@@ -0,0 +1,57 @@
+from django import template
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+
+from recipes.caching import fragment_cache_seconds, recipe_fragment_version
+
+register = template.Library()
+
+STAR_RANGE = range(1, 6)
+
+
+class RecipeFragmentNode(template.Node):
+    def __init__(self, nodelist, recipe, fragment_name, vary_on):
+        self.nodelist = nodelist
+        self.recipe = recipe
+        self.fragment_name = fragment_name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        recipe = self.recipe.resolve(context)
+        vary_on = [recipe_fragment_version(recipe)] + [var.resolve(context) for var in self.vary_on]
+        key = make_template_fragment_key(self.fragment_name, vary_on)
+        content = cache.get(key)
+        if content is None:
+            content = self.nodelist.render(context)
+            cache.set(key, content, fragment_cache_seconds())
+        return content
+
+
+# {% recipecache recipe "fragment_name" [vary_on ...] %} ... {% endrecipecache %}
+# Caches the enclosed block under the recipe's current fragment version, so any
+# write to the recipe, its images, comments, counters or categories misses it.
+# Never put per-user content (forms, csrf tokens, favourite state) inside.
+@register.tag
+def recipecache(parser, token):
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' tag requires a recipe and a fragment name.")
+    fragment_name = bits[2]
+    if fragment_name[0] in "'\"" and fragment_name[-1] == fragment_name[0]:
+        fragment_name = fragment_name[1:-1]
+    nodelist = parser.parse(("endrecipecache",))
+    parser.delete_first_token()
+    return RecipeFragmentNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        fragment_name,
+        [parser.compile_filter(bit) for bit in bits[3:]],
+    )
+
+
+# {% star_range as stars %}
+# The rating stars as a constant, so cached fragments do not depend on
+# whether the view happened to pass ``star_range`` in its context.
+@register.simple_tag
+def star_range():
+    return STAR_RANGE
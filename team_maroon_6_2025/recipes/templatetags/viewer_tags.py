@@ -0,0 +1,31 @@
+from django import template
+
+register = template.Library()
+
+
+# Usage: {% if recipe|favourited_by:viewer %} ... {% endif %}
+# ``viewer`` is the per-request ViewerState added by the viewer_state context
+# processor; views can preload a whole page first so these answer from memory.
+@register.filter
+def favourited_by(obj, viewer):
+    return viewer.has_favourited(obj)
+
+
+@register.filter
+def liked_by(obj, viewer):
+    return viewer.has_liked(obj)
+
+
+@register.filter
+def rated_by(obj, viewer):
+    return viewer.rating_for(obj)
+
+
+@register.filter
+def comment_liked_by(obj, viewer):
+    return viewer.has_liked_comment(obj)
+
+
+@register.filter
+def followed_by(obj, viewer):
+    return viewer.is_following(obj)
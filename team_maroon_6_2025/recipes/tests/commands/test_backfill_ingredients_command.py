@@ -0,0 +1,35 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from recipes.models import Recipe, RecipeIngredient, User
+
+
+class BackfillIngredientsCommandTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='@backfill',
+            email='backfill@example.com',
+            password='Password123',
+            first_name='Back',
+            last_name='Fill',
+        )
+        self.recipe = Recipe.objects.create(
+            author=self.user,
+            title='Backfill Recipe',
+            description='Desc',
+            ingredients='2 eggs\n100g sugar',
+            instructions='Cook',
+        )
+        RecipeIngredient.objects.all().delete()
+
+    def test_backfill_parses_every_recipe(self):
+        out = StringIO()
+        call_command('backfill_ingredients', stdout=out)
+        self.assertEqual(list(self.recipe.parsed_ingredients.values_list('name', flat=True)), ['egg', 'sugar'])
+        self.assertIn('Parsed the ingredients of 1 recipes', out.getvalue())
+
+    def test_backfill_limited_to_ids(self):
+        call_command('backfill_ingredients', str(self.recipe.pk + 1), stdout=StringIO())
+        self.assertFalse(RecipeIngredient.objects.exists())
@@ -0,0 +1,88 @@
+import json
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, TransactionTestCase
+
+from recipes.benchmarking import percentile
+from recipes.seeding import Seeder
+
+PAGES = ['recipe_list', 'dashboard', 'explore', 'recipe_detail', 'profile_page', 'inbox']
+
+THROUGHPUT_MODES = ['wsgi', 'asgi_sync_views', 'asgi_async_views']
+
+
+class BenchmarkCommandTestCase(TestCase):
+
+    def test_percentile_interpolates(self):
+        self.assertEqual(percentile([10], 0.95), 10)
+        self.assertEqual(percentile([1, 2, 3, 4, 5], 0.5), 3)
+        self.assertAlmostEqual(percentile([0, 10], 0.95), 9.5)
+        self.assertIsNone(percentile([], 0.5))
+
+    def test_iterations_must_be_positive(self):
+        with self.assertRaisesMessage(CommandError, 'must be at least 1'):
+            call_command('benchmark', '--in-place', '--iterations', '0', stdout=StringIO())
+
+    def test_in_place_run_reports_every_page_as_json(self):
+        Seeder(users=20, recipes=30, ratings=40, comments=30, follows=3, favourites=3, image_pool=0, seed=3).run()
+        out = StringIO()
+        call_command('benchmark', in_place=True, iterations=2, warmup=0, stdout=out)
+        report = json.loads(out.getvalue())
+
+        self.assertEqual([page['name'] for page in report['pages']], PAGES)
+        for page in report['pages']:
+            self.assertEqual(page['status'], 200)
+            self.assertGreater(page['queries'], 0)
+            self.assertGreater(page['rows'], 0)
+            self.assertLessEqual(page['p50_ms'], page['p95_ms'])
+
+    def test_only_limits_the_pages(self):
+        Seeder(users=5, recipes=5, image_pool=0, seed=3).run()
+        out = StringIO()
+        call_command('benchmark', in_place=True, iterations=1, warmup=0, only=['recipe_list'], stdout=out)
+        self.assertEqual([page['name'] for page in json.loads(out.getvalue())['pages']], ['recipe_list'])
+
+    def test_empty_database_reports_no_pages(self):
+        out = StringIO()
+        call_command('benchmark', in_place=True, stdout=out)
+        self.assertEqual(json.loads(out.getvalue())['pages'], [])
+
+
+
+class BenchmarkIndexesCommandTestCase(TransactionTestCase):
+    # The schema editor cannot run inside the transaction a TestCase wraps each test in
+    serialized_rollback = True
+
+    def test_indexes_report_plans_with_and_without_each_index(self):
+        Seeder(users=10, recipes=20, comments=20, follows=2, follow_requests=10, shopping_items=2,
+               image_pool=0, seed=3).run()
+        out = StringIO()
+        call_command('benchmark', in_place=True, indexes=True, iterations=1, stdout=out)
+        report = json.loads(out.getvalue())['indexes']
+
+        self.assertIn('recipe_created_idx', [row['index'] for row in report])
+        for row in report:
+            self.assertIn(row['index'], row['after_plan'])
+            self.assertNotIn(row['index'], row['before_plan'])
+
+
+class BenchmarkThroughputCommandTestCase(TransactionTestCase):
+    # The concurrent requests run on connections of their own, which only see committed rows
+    serialized_rollback = True
+
+    def test_throughput_reports_every_mode_per_page(self):
+        Seeder(users=10, recipes=10, comments=10, follows=2, image_pool=0, seed=3).run()
+        out = StringIO()
+        call_command('benchmark', in_place=True, throughput=True, concurrency=2, requests=4,
+                     only=['recipe_detail', 'profile_page'], stdout=out)
+        report = json.loads(out.getvalue())['throughput']
+
+        self.assertEqual(
+            [(row['name'], row['mode']) for row in report],
+            [(name, mode) for name in ['recipe_detail', 'profile_page'] for mode in THROUGHPUT_MODES],
+        )
+        for row in report:
+            self.assertEqual(row['requests'], 4)
+            self.assertEqual(row['errors'], 0)
+            self.assertGreater(row['requests_per_second'], 0)
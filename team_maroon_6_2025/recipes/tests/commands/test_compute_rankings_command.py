@@ -0,0 +1,31 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from recipes.models import Recipe, RecipeRanking, User
+
+
+class ComputeRankingsCommandTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='@cron',
+            email='cron@example.com',
+            password='Password123',
+            first_name='Cr',
+            last_name='On',
+        )
+        for i in range(3):
+            Recipe.objects.create(
+                author=self.user,
+                title=f'Ranked Recipe {i}',
+                description='Desc',
+                ingredients='Eggs',
+                instructions='Cook',
+            )
+
+    def test_compute_rankings_writes_trending(self):
+        out = StringIO()
+        call_command('compute_rankings', '--size', '2', stdout=out)
+        self.assertEqual(RecipeRanking.objects.filter(kind=RecipeRanking.TRENDING).count(), 2)
+        self.assertIn('ranking slots', out.getvalue())
@@ -0,0 +1,62 @@
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from recipes.models import Recipe, RecipeImage, User
+
+
+class ProcessRecipeImagesCommandTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.user = User.objects.create_user(
+            username='@backfill',
+            email='backfill@example.com',
+            password='Password123',
+            first_name='Back',
+            last_name='Fill',
+        )
+        self.recipe = Recipe.objects.create(
+            author=self.user,
+            title='Backfill Recipe',
+            description='Desc',
+            ingredients='Eggs',
+            instructions='Cook',
+        )
+        buffer = BytesIO()
+        Image.new('RGB', (700, 500), (10, 20, 30)).save(buffer, 'JPEG')
+        self.recipe_image = RecipeImage.objects.create(
+            recipe=self.recipe,
+            image=ContentFile(buffer.getvalue(), name='old.jpg'),
+        )
+        # Simulate an image uploaded before the pipeline existed
+        RecipeImage.objects.filter(pk=self.recipe_image.pk).update(
+            variants={}, processed_at=None, width=None, height=None
+        )
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_backfills_unprocessed_images(self):
+        out = StringIO()
+        call_command('process_recipe_images', stdout=out)
+        self.recipe_image.refresh_from_db()
+        self.assertTrue(self.recipe_image.is_processed)
+        self.assertEqual(self.recipe_image.width, 700)
+        self.assertIn('Processed 1 images', out.getvalue())
+
+    def test_skips_processed_images_unless_forced(self):
+        call_command('process_recipe_images', stdout=StringIO())
+        out = StringIO()
+        call_command('process_recipe_images', stdout=out)
+        self.assertIn('Processed 0 images', out.getvalue())
+        out = StringIO()
+        call_command('process_recipe_images', '--force', stdout=out)
+        self.assertIn('Processed 1 images', out.getvalue())
@@ -0,0 +1,39 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from recipes.models import Notification, User
+
+
+class PruneNotificationsCommandTestCase(TestCase):
+
+    def setUp(self):
+        recipient = User.objects.create_user(
+            username='@inboxed', email='inboxed@example.com', password='Password123',
+            first_name='In', last_name='Boxed',
+        )
+        sender = User.objects.create_user(
+            username='@noisy', email='noisy@example.com', password='Password123',
+            first_name='No', last_name='Isy',
+        )
+        self.old = Notification.objects.create(recipient=recipient, sender=sender, notification_type='follow')
+        self.recent = Notification.objects.create(recipient=recipient, sender=sender, notification_type='request')
+        Notification.objects.filter(pk=self.old.pk).update(created_at=timezone.now() - timedelta(days=10))
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command('prune_notifications', *args, stdout=out)
+        return out.getvalue()
+
+    def test_defaults_keep_recent_notifications(self):
+        output = self.run_command()
+        self.assertIn('Deleted 0 notifications.', output)
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_days_option(self):
+        output = self.run_command('--days', '5')
+        self.assertIn('Deleted 1 notifications.', output)
+        self.assertEqual(list(Notification.objects.all()), [self.recent])
@@ -0,0 +1,38 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from recipes.models import Recipe, User
+
+
+class RecountRecipesCommandTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='@recount',
+            email='recount@example.com',
+            password='Password123',
+            first_name='Re',
+            last_name='Count',
+        )
+        self.recipe = Recipe.objects.create(
+            author=self.user,
+            title='Recount Recipe',
+            description='Desc',
+            ingredients='Eggs',
+            instructions='Cook',
+        )
+        self.user.favourites.add(self.recipe)
+        Recipe.objects.filter(pk=self.recipe.pk).update(favourites_total=0)
+
+    def test_recount_restores_counters(self):
+        out = StringIO()
+        call_command('recount_recipes', stdout=out)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.favourites_total, 1)
+        self.assertIn('Recounted 1 recipes', out.getvalue())
+
+    def test_recount_limited_to_ids(self):
+        call_command('recount_recipes', str(self.recipe.pk + 1), stdout=StringIO())
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.favourites_total, 0)
@@ -0,0 +1,37 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from recipes.models import Recipe, Task, User
+
+
+@override_settings(TASK_QUEUE_EAGER=False)
+class RunTasksCommandTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='@worker',
+            email='worker@example.com',
+            password='Password123',
+            first_name='Work',
+            last_name='Er',
+        )
+        self.recipe = Recipe.objects.create(
+            author=self.user,
+            title='Worker Recipe',
+            description='Desc',
+            ingredients='Eggs',
+            instructions='Cook',
+        )
+
+    def test_stats_reports_queue_depth(self):
+        out = StringIO()
+        call_command('run_tasks', '--stats', stdout=out)
+        self.assertIn('pending=2 running=0 failed=0', out.getvalue())
+        self.assertIn('search.index: pending=1', out.getvalue())
+
+    def test_once_drains_the_queue(self):
+        out = StringIO()
+        call_command('run_tasks', '--once', stdout=out)
+        self.assertFalse(Task.objects.exists())
+        self.assertIn('Ran 2 tasks (0 failed)', out.getvalue())
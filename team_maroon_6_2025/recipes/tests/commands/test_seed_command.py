@@ -1,18 +1,35 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from io import StringIO
 
-from recipes.management.commands.seed import _safe_token, create_email, create_username
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from recipes.models import Recipe, User
+from recipes.seeding import safe_token
 
 
 class SeedCommandHelpersTestCase(TestCase):
     def test_safe_token_fallback(self):
-        self.assertEqual(_safe_token('!!!', 'user'), 'user')
-        self.assertEqual(_safe_token('Jane', 'user'), 'jane')
+        self.assertEqual(safe_token('!!!', 'user'), 'user')
+        self.assertEqual(safe_token('Jane', 'user'), 'jane')
+
+
+class SeedCommandTestCase(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
 
-    def test_create_username_format(self):
-        username = create_username('Jane', 'Doe')
-        self.assertTrue(username.startswith('@'))
-        self.assertLessEqual(len(username), 30)
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
 
-    def test_create_email_domain(self):
-        email = create_email('Jane', 'Doe')
-        self.assertTrue(email.endswith('@example.org'))
+    def test_seed_command_accepts_scale_options(self):
+        out = StringIO()
+        call_command('seed', users=10, recipes=5, ratings=10, images=0, seed=1, stdout=out)
+        self.assertEqual(User.objects.count(), 10)
+        self.assertEqual(Recipe.objects.count(), 5)
+        self.assertTrue(User.objects.filter(username='@johndoe', is_superuser=True).exists())
+        self.assertIn('Seeding complete', out.getvalue())
@@ -0,0 +1,46 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from recipes.models import SlowQuery
+
+
+class SlowQueriesCommandTestCase(TestCase):
+
+    def setUp(self):
+        SlowQuery.objects.create(
+            fingerprint='a', normalized_sql='SELECT * FROM recipes_recipe', sample_sql='SELECT 1',
+            plan='SCAN recipes_recipe', full_scan=True, view_name='recipe_list',
+            request_params={'sort': ['rating']}, calls=4, total_ms=400, max_ms=150,
+        )
+        SlowQuery.objects.create(
+            fingerprint='b', normalized_sql='SELECT * FROM recipes_comment WHERE id = ?', sample_sql='SELECT 2',
+            plan='SEARCH recipes_comment USING INTEGER PRIMARY KEY (rowid=?)', view_name='inbox',
+            calls=20, total_ms=300, max_ms=20,
+        )
+
+    def run_command(self, **options):
+        out = StringIO()
+        call_command('slow_queries', stdout=out, **options)
+        return out.getvalue()
+
+    def test_lists_worst_total_first(self):
+        output = self.run_command()
+        self.assertLess(output.index('recipes_recipe'), output.index('recipes_comment'))
+        self.assertIn("{'sort': ['rating']}", output)
+        self.assertIn('FULL SCAN', output)
+
+    def test_order_by_calls(self):
+        output = self.run_command(order='calls')
+        self.assertLess(output.index('recipes_comment'), output.index('recipes_recipe'))
+
+    def test_full_scans_only_and_plans(self):
+        output = self.run_command(full_scans=True, plans=True)
+        self.assertIn('SCAN recipes_recipe', output)
+        self.assertNotIn('recipes_comment', output)
+
+    def test_reset_deletes_records(self):
+        self.run_command(reset=True)
+        self.assertFalse(SlowQuery.objects.exists())
+        self.assertIn('No slow queries recorded.', self.run_command())
@@ -1,3 +1,6 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from with_asserts.mixin import AssertHTMLMixin
 
@@ -29,4 +32,34 @@ class MenuTesterMixin(AssertHTMLMixin):
     def assert_no_menu(self, response):
         
         for url in self.menu_urls:
-            self.assertNotHTML(response, f'a[href="{url}"]')
\ No newline at end of file
+            self.assertNotHTML(response, f'a[href="{url}"]')
+
+class QueryCountTesterMixin:
+
+    def assert_constant_query_count(self, fetch, grow):
+        """Asserts fetch() runs the same number of queries before and after grow() adds rows."""
+
+        cache.clear()
+        with CaptureQueriesContext(connection) as before:
+            fetch()
+        grow()
+        cache.clear()
+        with CaptureQueriesContext(connection) as after:
+            fetch()
+        self.assertEqual(
+            len(before), len(after),
+            f"Query count grew from {len(before)} to {len(after)}",
+        )
+
+class QueryBudgetTesterMixin:
+
+    def assert_within_query_budget(self, response):
+        """Asserts the request behind response ran no more queries than its URL name's budget."""
+
+        metrics = response.query_metrics
+        self.assertIsNotNone(metrics.budget, f"No query budget is set for {metrics.url_name}")
+        self.assertLessEqual(
+            metrics.queries, metrics.budget,
+            f"{metrics.url_name} ran {metrics.queries} queries, over its budget of {metrics.budget}: "
+            f"{list(metrics.duplicates.items())[:3]}",
+        )
@@ -0,0 +1,102 @@
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import TestCase
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+from recipes.caching import CATEGORY_SCOPE, RECIPE_SCOPE, attach_fragment_versions, get_version
+from recipes.models import Category, Comment, Recipe, RecipeImage, User
+from recipes.viewer_state import ViewerState
+
+
+class RecipeCachingTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='@cacheuser',
+            email='cache@example.com',
+            password='Password123',
+            first_name='Cache',
+            last_name='User'
+        )
+        self.recipe = Recipe.objects.create(
+            author=self.user,
+            title='Cached Soup',
+            description='Warm',
+            ingredients='Water',
+            instructions='Boil the water'
+        )
+
+    def test_recipe_save_bumps_version(self):
+        before = get_version(RECIPE_SCOPE, self.recipe.pk)
+        self.recipe.title = 'Renamed Soup'
+        self.recipe.save()
+        self.assertGreater(get_version(RECIPE_SCOPE, self.recipe.pk), before)
+
+    def test_comment_and_image_writes_bump_recipe_version(self):
+        before = get_version(RECIPE_SCOPE, self.recipe.pk)
+        comment = Comment.objects.create(recipe=self.recipe, author=self.user, body='Tasty')
+        after_comment = get_version(RECIPE_SCOPE, self.recipe.pk)
+        self.assertGreater(after_comment, before)
+
+        comment.delete()
+        RecipeImage.objects.create(recipe=self.recipe, image='recipe_images/soup.jpg')
+        self.assertGreater(get_version(RECIPE_SCOPE, self.recipe.pk), after_comment)
+
+    def test_favourite_counter_update_bumps_version(self):
+        before = get_version(RECIPE_SCOPE, self.recipe.pk)
+        self.user.favourites.add(self.recipe)
+        self.assertGreater(get_version(RECIPE_SCOPE, self.recipe.pk), before)
+
+    def test_category_changes_bump_versions(self):
+        category = Category.objects.create(key='cached-cat', label='Cached')
+        category_before = get_version(CATEGORY_SCOPE)
+        recipe_before = get_version(RECIPE_SCOPE, self.recipe.pk)
+
+        self.recipe.categories.add(category)
+        self.assertGreater(get_version(RECIPE_SCOPE, self.recipe.pk), recipe_before)
+
+        category.label = 'Renamed'
+        category.save()
+        self.assertGreater(get_version(CATEGORY_SCOPE), category_before)
+
+    def test_attach_fragment_versions_matches_single_lookup(self):
+        recipe = attach_fragment_versions([Recipe.objects.get(pk=self.recipe.pk)])[0]
+        expected = f'{self.recipe.pk}.{get_version(RECIPE_SCOPE, self.recipe.pk)}.{get_version(CATEGORY_SCOPE)}'
+        self.assertEqual(recipe.fragment_version, expected)
+
+    def test_recipe_card_fragment_is_invalidated_on_write(self):
+        url = reverse('recipe_list')
+        self.assertContains(self.client.get(url), 'Cached Soup')
+
+        Recipe.objects.filter(pk=self.recipe.pk).update(title='Stale Soup')
+        self.assertContains(self.client.get(url), 'Cached Soup')
+
+        self.recipe.title = 'Fresh Soup'
+        self.recipe.save()
+        response = self.client.get(url)
+        self.assertContains(response, 'Fresh Soup')
+        self.assertNotContains(response, 'Cached Soup')
+
+    def test_detail_body_fragment_is_invalidated_on_write(self):
+        url = reverse('recipe_detail', kwargs={'pk': self.recipe.pk})
+        self.assertContains(self.client.get(url), 'Boil the water')
+
+        self.recipe.instructions = 'Simmer gently'
+        self.recipe.save()
+        self.assertContains(self.client.get(url), 'Simmer gently')
+
+    def test_favourite_button_is_not_cached_between_users(self):
+        url = reverse('recipe_list')
+        self.assertNotContains(self.client.get(url), 'Favourited')
+        self.user.favourites.add(self.recipe)
+        self.client.login(username='@cacheuser', password='Password123')
+        self.assertContains(self.client.get(url), 'Favourited')
+
+    def test_recipe_card_renders_stars_without_star_range_in_context(self):
+        recipe = attach_fragment_versions([Recipe.objects.select_related('author').get(pk=self.recipe.pk)])[0]
+        html = render_to_string('partials/recipe_rows.html', {'recipes': [recipe], 'viewer': ViewerState(AnonymousUser())})
+        self.assertEqual(html.count('bi bi-star text-warning'), 5)
+        # The fragment cached above is what recipe_list serves next
+        self.assertContains(self.client.get(reverse('recipe_list')), 'bi bi-star text-warning', count=5)
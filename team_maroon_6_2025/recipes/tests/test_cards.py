@@ -0,0 +1,69 @@
+from django.test import TestCase
+
+from recipes.cards import RecipeCard, build_card_lists, build_recipe_cards
+from recipes.models import Category, Recipe, RecipeImage, User
+from recipes.viewer_state import ViewerState
+
+
+class RecipeCardsTestCase(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='@carduser',
+            email='card@example.com',
+            password='Password123',
+            first_name='Card',
+            last_name='User'
+        )
+        self.recipe = Recipe.objects.create(
+            author=self.user,
+            title='Card Recipe',
+            description='Desc',
+            ingredients='Eggs',
+            instructions='Cook'
+        )
+        self.other = Recipe.objects.create(
+            author=self.user,
+            title='Plain Recipe',
+            description='Desc',
+            ingredients='Eggs',
+            instructions='Cook'
+        )
+
+    def test_card_holds_first_image_and_top_categories(self):
+        RecipeImage.objects.create(recipe=self.recipe, image='recipes/second.jpg', position=2)
+        first = RecipeImage.objects.create(recipe=self.recipe, image='recipes/first.jpg', position=1)
+        for key, label in [('card-c', 'Cc'), ('card-a', 'Aa'), ('card-b', 'Bb')]:
+            self.recipe.categories.add(Category.objects.create(key=key, label=label))
+
+        card, plain = build_recipe_cards([self.recipe, self.other])
+        self.assertEqual(card.preview, first)
+        self.assertEqual([c.label for c in card.top_categories], ['Aa', 'Bb'])
+        self.assertIsNone(plain.preview)
+        self.assertEqual(plain.top_categories, [])
+
+    def test_card_holds_viewer_state(self):
+        self.user.favourites.add(self.recipe)
+
+        card, plain = build_recipe_cards([self.recipe, self.other], ViewerState(self.user))
+        self.assertTrue(card.is_favourited)
+        self.assertFalse(plain.is_favourited)
+
+    def test_card_stands_in_for_recipe(self):
+        card = build_recipe_cards([self.recipe])[0]
+        self.assertIsInstance(card, RecipeCard)
+        self.assertEqual(card, self.recipe)
+        self.assertEqual(card.title, 'Card Recipe')
+        self.assertTrue(card.fragment_version.startswith(f'{self.recipe.pk}.'))
+
+    def test_card_queries_do_not_grow_with_page(self):
+        recipes = list(Recipe.objects.all())
+        with self.assertNumQueries(3):
+            build_recipe_cards(recipes, ViewerState(self.user))
+
+    def test_build_card_lists_keeps_shape(self):
+        with self.assertNumQueries(3):
+            first, second, empty = build_card_lists([[self.recipe], [self.other, self.recipe], []], ViewerState(self.user))
+        self.assertEqual(first, [self.recipe])
+        self.assertEqual(second, [self.other, self.recipe])
+        self.assertEqual(empty, [])
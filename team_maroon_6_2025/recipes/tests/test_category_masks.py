@@ -0,0 +1,120 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.client import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from recipes import category_masks, category_registry
+from recipes.models import Category, Recipe, User
+from recipes.search_filters import filter_recipes
+
+
+class CategoryMaskTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='@masker',
+            email='masker@example.com',
+            password='Password123',
+            first_name='Mask',
+            last_name='User',
+        )
+        self.breakfast = Category.objects.get(key='breakfast')
+        self.vegan = Category.objects.get(key='vegan')
+        self.recipe = Recipe.objects.create(
+            author=self.user, title='Porridge', description='Desc', ingredients='Oats', instructions='Cook',
+        )
+
+    def mask(self):
+        self.recipe.refresh_from_db()
+        return self.recipe.category_mask
+
+    def test_seeded_categories_have_distinct_bits(self):
+        bits = list(Category.objects.values_list('bit', flat=True))
+        self.assertNotIn(None, bits)
+        self.assertEqual(len(set(bits)), len(bits))
+
+    def test_new_category_takes_lowest_free_bit(self):
+        self.vegan.delete()
+        self.assertEqual(Category.objects.create(key='snack', label='Snack').bit, self.vegan.bit)
+
+    def test_mask_follows_category_changes(self):
+        self.recipe.categories.add(self.breakfast, self.vegan)
+        self.assertEqual(self.mask(), (1 << self.breakfast.bit) | (1 << self.vegan.bit))
+        self.recipe.categories.remove(self.vegan)
+        self.assertEqual(self.mask(), 1 << self.breakfast.bit)
+        self.recipe.categories.clear()
+        self.assertEqual(self.mask(), 0)
+
+    def test_mask_follows_reverse_category_changes(self):
+        self.vegan.recipes.add(self.recipe)
+        self.assertEqual(self.mask(), 1 << self.vegan.bit)
+        self.vegan.recipes.clear()
+        self.assertEqual(self.mask(), 0)
+
+    def test_deleting_category_clears_its_bit(self):
+        self.recipe.categories.add(self.breakfast, self.vegan)
+        self.vegan.delete()
+        self.assertEqual(self.mask(), 1 << self.breakfast.bit)
+
+    def test_rebuild_category_masks(self):
+        self.recipe.categories.add(self.breakfast)
+        Recipe.objects.update(category_mask=0)
+        category_masks.rebuild_category_masks()
+        self.assertEqual(self.mask(), 1 << self.breakfast.bit)
+
+
+class CategoryFilterTestCase(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user(
+            username='@categoryfilter',
+            email='categoryfilter@example.com',
+            password='Password123',
+            first_name='Filter',
+            last_name='User',
+        )
+        self.breakfast = Category.objects.get(key='breakfast')
+        self.vegan = Category.objects.get(key='vegan')
+        self.gluten_free = Category.objects.get(key='gluten_free')
+        self.porridge = self._recipe('Porridge', self.breakfast, self.vegan, self.gluten_free)
+        self.toast = self._recipe('Toast', self.breakfast, self.vegan)
+        self.omelette = self._recipe('Omelette', self.breakfast)
+
+    def _recipe(self, title, *categories):
+        recipe = Recipe.objects.create(
+            author=self.user, title=title, description='Desc', ingredients='Eggs', instructions='Cook',
+        )
+        recipe.categories.add(*categories)
+        return recipe
+
+    def _titles(self, query):
+        return sorted(recipe.title for recipe in filter_recipes(self.factory.get('/', query), Recipe.objects.all()))
+
+    def test_meal_and_every_dietary_category_required(self):
+        query = {'meal': self.breakfast.pk, 'dietary': [self.vegan.pk, self.gluten_free.pk]}
+        self.assertEqual(self._titles(query), ['Porridge'])
+
+    def test_excluded_categories(self):
+        query = {'meal': self.breakfast.pk, 'exclude': [self.gluten_free.pk]}
+        self.assertEqual(self._titles(query), ['Omelette', 'Toast'])
+
+    def test_category_created_elsewhere_is_found_before_the_registry_reloads(self):
+        category_registry.get_registry()
+        with mock.patch('recipes.category_registry.invalidate'):
+            snack = Category.objects.create(key='snack', label='Snack')
+        self.toast.categories.add(snack)
+        self.assertEqual(self._titles({'meal': snack.pk}), ['Toast'])
+        self.assertEqual(self._titles({'exclude': snack.pk}), ['Omelette', 'Porridge'])
+
+    def test_unknown_required_category_matches_nothing(self):
+        self.assertEqual(self._titles({'meal': 9999}), [])
+        self.assertEqual(self._titles({'exclude': 9999}), ['Omelette', 'Porridge', 'Toast'])
+
+    def test_category_filter_has_no_join_or_distinct(self):
+        request = self.factory.get('/', {'meal': self.breakfast.pk, 'dietary': [self.vegan.pk], 'exclude': [self.gluten_free.pk]})
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(list(filter_recipes(request, Recipe.objects.all())), [self.toast])
+        sql = queries[-1]['sql']
+        self.assertNotIn('JOIN', sql)
+        self.assertNotIn('DISTINCT', sql)
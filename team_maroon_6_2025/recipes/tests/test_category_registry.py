@@ -0,0 +1,46 @@
+from django.test import TestCase
+from django.test.client import RequestFactory
+
+from recipes import category_registry
+from recipes.context_processors import navbar_search
+from recipes.forms import RecipeForm
+from recipes.models import Category
+
+
+class CategoryRegistryTestCase(TestCase):
+    def setUp(self):
+        category_registry.invalidate()
+
+    def test_splits_meal_and_dietary_categories(self):
+        registry = category_registry.get_registry()
+        self.assertEqual({category.key for category in registry.meal}, set(category_registry.MEAL_KEYS))
+        self.assertIn('vegan', {category.key for category in registry.dietary})
+        self.assertEqual([category.label for category in registry.all], sorted(category.label for category in registry.all))
+
+    def test_loads_once(self):
+        registry = category_registry.get_registry()
+        with self.assertNumQueries(0):
+            self.assertIs(category_registry.get_registry(), registry)
+
+    def test_reloads_after_category_change(self):
+        category_registry.get_registry()
+        snack = Category.objects.create(key='snack', label='Snack')
+        registry = category_registry.get_registry()
+        self.assertIn(snack.pk, registry.by_id)
+        self.assertEqual(registry.bits[snack.pk], 1 << snack.bit)
+        snack.delete()
+        self.assertNotIn(snack.pk, category_registry.get_registry().by_id)
+
+    def test_reloads_once_older_than_max_age(self):
+        registry = category_registry.get_registry()
+        registry.loaded_at -= category_registry.max_age_seconds()
+        self.assertIsNot(category_registry.get_registry(), registry)
+
+    def test_navbar_and_form_read_no_categories_from_the_database(self):
+        category_registry.get_registry()
+        request = RequestFactory().get('/')
+        with self.assertNumQueries(0):
+            context = navbar_search(request)
+            html = str(RecipeForm()['categories'])
+        self.assertEqual(len(context['nav_all_categories']), Category.objects.count())
+        self.assertIn('Vegan', html)
@@ -0,0 +1,69 @@
+import threading
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from recipes import instrumentation
+from recipes.concurrency import _on_own_connection, gather, worker_count
+from recipes.models import User
+
+
+def _thread_and_count():
+    return threading.get_ident(), User.objects.count()
+
+
+class GatherTestCase(TestCase):
+
+    def test_returns_results_in_order(self):
+        self.assertEqual(async_to_sync(gather)(lambda: 1, lambda: 2, lambda: 3), [1, 2, 3])
+
+    def test_runs_in_turn_inside_a_transaction(self):
+        User.objects.create_user(username='@gather', email='gather@example.com', password='Password123')
+        # Other connections could not see the uncommitted user
+        results = async_to_sync(gather)(_thread_and_count, _thread_and_count)
+        self.assertEqual([count for _, count in results], [1, 1])
+        self.assertEqual(len({thread for thread, _ in results}), 1)
+
+
+@override_settings(ASYNC_CONCURRENT_QUERIES=True)
+class ConcurrentGatherTestCase(TransactionTestCase):
+    # Worker connections only see committed rows
+    serialized_rollback = True
+
+    def setUp(self):
+        User.objects.create_user(username='@gather', email='gather@example.com', password='Password123')
+
+    def test_runs_each_call_on_its_own_thread(self):
+        results = async_to_sync(gather)(_thread_and_count, _thread_and_count)
+        self.assertEqual([count for _, count in results], [1, 1])
+        self.assertNotIn(threading.get_ident(), {thread for thread, _ in results})
+
+    def test_counts_worker_queries_towards_the_request(self):
+        metrics = instrumentation.RequestMetrics()
+        token = instrumentation.start(metrics)
+        try:
+            async_to_sync(gather)(_thread_and_count, _thread_and_count)
+        finally:
+            instrumentation.stop(token)
+        self.assertEqual(metrics.queries, 2)
+
+    def test_reuses_a_bounded_pool_of_worker_threads(self):
+        threads = set()
+        for _ in range(3):
+            results = async_to_sync(gather)(*[_thread_and_count] * 6)
+            threads |= {thread for thread, _ in results}
+        self.assertLessEqual(len(threads), worker_count())
+
+    def test_worker_connections_are_released_by_conn_max_age(self):
+        with mock.patch.object(connection, 'close_if_unusable_or_obsolete') as release, \
+                mock.patch.object(connection, 'close') as close:
+            self.assertEqual(_on_own_connection(User.objects.count)(), 1)
+        release.assert_called_once_with()
+        close.assert_not_called()
+
+    @override_settings(ASYNC_CONCURRENT_QUERIES=False)
+    def test_setting_turns_concurrency_off(self):
+        results = async_to_sync(gather)(_thread_and_count, _thread_and_count)
+        self.assertEqual(len({thread for thread, _ in results}), 1)
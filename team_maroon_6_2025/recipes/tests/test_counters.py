@@ -0,0 +1,107 @@
+from django.test import TestCase, override_settings
+
+from recipes.counters import recount_recipes
+from recipes.helpers import base_recipe_queryset
+from recipes.models import Comment, Recipe, RecipeRating, Task, User
+
+
+class RecipeCountersTestCase(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(
+            username='@counted',
+            email='counted@example.com',
+            password='Password123',
+            first_name='Count',
+            last_name='Ed',
+        )
+        self.fan = User.objects.create_user(
+            username='@counter',
+            email='counter@example.com',
+            password='Password123',
+            first_name='Count',
+            last_name='Er',
+        )
+        self.recipe = Recipe.objects.create(
+            author=self.author,
+            title='Counted Recipe',
+            description='Desc',
+            ingredients='Eggs',
+            instructions='Cook',
+        )
+
+    def test_comments_update_comment_total(self):
+        comment = Comment.objects.create(recipe=self.recipe, author=self.fan, body='Yum')
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.comment_total, 1)
+        comment.delete()
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.comment_total, 0)
+
+    def test_ratings_update_sum_and_total(self):
+        rating = RecipeRating.objects.create(recipe=self.recipe, user=self.fan, rating=4)
+        RecipeRating.objects.create(recipe=self.recipe, user=self.author, rating=1)
+        rating.rating = 5
+        rating.save()
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.rating_sum, 6)
+        self.assertEqual(self.recipe.rating_total, 2)
+        self.assertEqual(self.recipe.average_rating, 3)
+
+    def test_favourites_update_favourites_total(self):
+        self.fan.favourites.add(self.recipe)
+        self.fan.favourites.add(self.recipe)
+        self.recipe.favourited_by.add(self.author)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.favourites_total, 2)
+
+        self.fan.favourites.remove(self.recipe)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.favourites_count, 1)
+
+        self.recipe.favourited_by.clear()
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.favourites_total, 0)
+
+    @override_settings(TASK_QUEUE_EAGER=False)
+    def test_counters_update_without_a_worker(self):
+        rating = RecipeRating.objects.create(recipe=self.recipe, user=self.fan, rating=4)
+        self.fan.favourites.add(self.recipe)
+        self.author.favourites.add(self.recipe)
+        self.fan.favourites.remove(self.recipe)
+        self.recipe.refresh_from_db()
+        self.assertEqual((self.recipe.rating_sum, self.recipe.rating_total, self.recipe.favourites_total), (4, 1, 1))
+        rating.delete()
+        self.author.favourites.clear()
+        self.recipe.refresh_from_db()
+        self.assertEqual((self.recipe.rating_total, self.recipe.favourites_total), (0, 0))
+        self.assertFalse(Task.objects.filter(name__startswith='counters.').exists())
+
+    def test_recount_repairs_drifted_counters(self):
+        self.fan.favourites.add(self.recipe)
+        Comment.objects.create(recipe=self.recipe, author=self.fan, body='Yum')
+        Recipe.objects.filter(pk=self.recipe.pk).update(favourites_total=9, comment_total=9, rating_total=9)
+        self.assertEqual(recount_recipes(), 1)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.favourites_total, 1)
+        self.assertEqual(self.recipe.comment_total, 1)
+        self.assertEqual(self.recipe.rating_total, 0)
+
+    def test_rating_avg_annotation_uses_counters(self):
+        RecipeRating.objects.create(recipe=self.recipe, user=self.fan, rating=3)
+        RecipeRating.objects.create(recipe=self.recipe, user=self.author, rating=4)
+        recipe = base_recipe_queryset().get(pk=self.recipe.pk)
+        self.assertAlmostEqual(recipe.rating_avg, 3.5)
+
+    def test_rating_avg_defaults_to_zero(self):
+        recipe = base_recipe_queryset().get(pk=self.recipe.pk)
+        self.assertEqual(recipe.rating_avg, 0)
+
+    def test_full_save_keeps_counters_written_since_load(self):
+        stale = Recipe.objects.get(pk=self.recipe.pk)
+        RecipeRating.objects.create(recipe=self.recipe, user=self.fan, rating=4)
+        Comment.objects.create(recipe=self.recipe, author=self.fan, body='Yum')
+        stale.title = 'Renamed Recipe'
+        stale.save()
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.title, 'Renamed Recipe')
+        self.assertEqual((self.recipe.rating_total, self.recipe.rating_avg, self.recipe.comment_total), (1, 4, 1))
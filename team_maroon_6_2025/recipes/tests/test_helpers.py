@@ -1,7 +1,6 @@
-from django.contrib.auth.models import AnonymousUser
 from django.test import TestCase
 
-from recipes.helpers import base_recipe_queryset, attach_user_ratings
+from recipes.helpers import base_recipe_queryset
 from recipes.models import Comment, Recipe, RecipeRating, User
 
 
@@ -29,12 +28,3 @@ class HelpersTestCase(TestCase):
         self.assertEqual(recipe.rating_total, 1)
         self.assertEqual(recipe.comment_total, 1)
         self.assertEqual(recipe.favourites_total, 0)
-
-    def test_attach_user_ratings_sets_value(self):
-        RecipeRating.objects.create(recipe=self.recipe, user=self.user, rating=5)
-        attach_user_ratings([self.recipe], self.user)
-        self.assertEqual(self.recipe.user_rating_value, 5)
-
-    def test_attach_user_ratings_skips_anonymous(self):
-        attach_user_ratings([self.recipe], AnonymousUser())
-        self.assertFalse(hasattr(self.recipe, 'user_rating_value'))
@@ -0,0 +1,118 @@
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from recipes.images import available_formats, process_recipe_image
+from recipes.models import Recipe, RecipeImage, User
+
+
+def make_jpeg(size=(1200, 800), with_exif=False):
+    image = Image.new('RGB', size, (200, 120, 40))
+    buffer = BytesIO()
+    if with_exif:
+        exif = Image.Exif()
+        exif[0x010F] = 'Test Camera'
+        image.save(buffer, 'JPEG', exif=exif)
+    else:
+        image.save(buffer, 'JPEG')
+    return SimpleUploadedFile('dish.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+
+class RecipeImagePipelineTestCase(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            RECIPE_IMAGE_WIDTHS=(320, 640),
+            RECIPE_THUMBNAIL_SIZE=(200, 200),
+        )
+        self.settings_override.enable()
+        self.user = User.objects.create_user(
+            username='@photo',
+            email='photo@example.com',
+            password='Password123',
+            first_name='Pho',
+            last_name='To'
+        )
+        self.recipe = Recipe.objects.create(
+            author=self.user,
+            title='Photo Recipe',
+            description='Desc',
+            ingredients='Eggs',
+            instructions='Cook'
+        )
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_upload_generates_derivatives_and_dimensions(self):
+        recipe_image = RecipeImage.objects.create(recipe=self.recipe, image=make_jpeg())
+        recipe_image.refresh_from_db()
+
+        self.assertTrue(recipe_image.is_processed)
+        self.assertEqual((recipe_image.width, recipe_image.height), (1200, 800))
+        with recipe_image.image.storage.open(recipe_image.variants['thumbnail']) as handle:
+            self.assertEqual(Image.open(handle).size, (200, 133))
+        for image_format in available_formats():
+            self.assertEqual(set(recipe_image.variants[image_format]), {'320', '640'})
+        self.assertIn('webp', available_formats())
+        self.assertIn(' 640w', recipe_image.webp_srcset)
+
+    def test_upload_strips_exif(self):
+        recipe_image = RecipeImage.objects.create(recipe=self.recipe, image=make_jpeg(with_exif=True))
+        recipe_image.refresh_from_db()
+        with recipe_image.image.open('rb') as handle:
+            self.assertFalse(Image.open(handle).getexif())
+
+    @override_settings(TASK_QUEUE_EAGER=False)
+    def test_failed_processing_keeps_the_upload(self):
+        recipe_image = RecipeImage.objects.create(recipe=self.recipe, image=make_jpeg(with_exif=True))
+        storage = recipe_image.image.storage
+        with mock.patch.object(storage, 'save', side_effect=OSError('disk full')):
+            with self.assertRaises(OSError):
+                process_recipe_image(recipe_image)
+        recipe_image.refresh_from_db()
+        self.assertFalse(recipe_image.is_processed)
+        self.assertTrue(storage.exists(recipe_image.image.name))
+
+    def test_stripped_copy_replaces_the_upload(self):
+        recipe_image = RecipeImage.objects.create(recipe=self.recipe, image=make_jpeg(with_exif=True))
+        storage = recipe_image.image.storage
+        original_name = recipe_image.image.name
+        recipe_image.refresh_from_db()
+        self.assertNotEqual(recipe_image.image.name, original_name)
+        self.assertFalse(storage.exists(original_name))
+
+    def test_transparent_upload_is_flattened_onto_white_in_jpeg(self):
+        buffer = BytesIO()
+        Image.new('RGBA', (400, 400), (0, 0, 0, 0)).save(buffer, 'PNG')
+        upload = SimpleUploadedFile('clear.png', buffer.getvalue(), content_type='image/png')
+        recipe_image = RecipeImage.objects.create(recipe=self.recipe, image=upload)
+        recipe_image.refresh_from_db()
+        for name in (recipe_image.variants['thumbnail'], recipe_image.variants['jpeg']['320']):
+            with recipe_image.image.storage.open(name) as handle:
+                self.assertEqual(Image.open(handle).convert('RGB').getpixel((0, 0)), (255, 255, 255))
+
+    def test_small_image_keeps_its_own_width(self):
+        recipe_image = RecipeImage.objects.create(recipe=self.recipe, image=make_jpeg(size=(200, 100)))
+        recipe_image.refresh_from_db()
+        self.assertEqual(set(recipe_image.variants['jpeg']), {'200'})
+
+    def test_unreadable_upload_is_left_unprocessed(self):
+        recipe_image = RecipeImage.objects.create(recipe=self.recipe, image='recipes/missing.jpg')
+        recipe_image.refresh_from_db()
+        self.assertFalse(recipe_image.is_processed)
+        self.assertEqual(recipe_image.srcset('webp'), '')
+
+    def test_card_renders_srcset(self):
+        RecipeImage.objects.create(recipe=self.recipe, image=make_jpeg())
+        response = self.client.get('/recipes/')
+        self.assertContains(response, 'type="image/webp"')
+        self.assertContains(response, 'width="1200" height="800"')
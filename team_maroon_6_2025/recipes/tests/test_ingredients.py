@@ -0,0 +1,136 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.client import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from recipes import ingredients
+from recipes.models import Recipe, RecipeIngredient, User
+from recipes.search_filters import filter_recipes
+
+
+class IngredientParsingTestCase(TestCase):
+
+    def test_parses_quantity_unit_and_name(self):
+        parsed = ingredients.parse_ingredient('200g plain flour')
+        self.assertEqual((parsed.quantity, parsed.unit, parsed.name), (Decimal('200.000'), 'g', 'plain flour'))
+
+    def test_parses_fractions(self):
+        self.assertEqual(ingredients.parse_ingredient('1 1/2 cups milk').quantity, Decimal('1.5'))
+        self.assertEqual(ingredients.parse_ingredient('½ tsp salt').quantity, Decimal('0.5'))
+        self.assertEqual(ingredients.parse_ingredient('1½ tablespoons honey').unit, 'tbsp')
+
+    def test_range_keeps_lower_bound(self):
+        parsed = ingredients.parse_ingredient('2-3 cloves garlic, minced')
+        self.assertEqual((parsed.quantity, parsed.unit, parsed.name), (Decimal('2'), 'clove', 'garlic'))
+
+    def test_line_without_quantity(self):
+        parsed = ingredients.parse_ingredient('Salt and pepper to taste')
+        self.assertEqual((parsed.quantity, parsed.unit, parsed.name), (None, '', 'salt and pepper'))
+
+    def test_unit_without_quantity(self):
+        parsed = ingredients.parse_ingredient('Pinch of salt')
+        self.assertEqual((parsed.quantity, parsed.unit, parsed.name), (None, 'pinch', 'salt'))
+        self.assertEqual(ingredients.parse_ingredient('Slice cheese').name, 'slice cheese')
+
+    def test_normalize_name(self):
+        self.assertEqual(ingredients.normalize_name('Ripe Tomatoes (about 4), diced'), 'tomato')
+        self.assertEqual(ingredients.normalize_name('3 large EGGS'), 'egg')
+        self.assertEqual(ingredients.normalize_name('Fresh berries'), 'berry')
+        self.assertEqual(ingredients.normalize_name('Jalapeño'), 'jalapeno')
+
+    def test_irregular_plurals(self):
+        self.assertEqual(ingredients.normalize_name('Molasses'), 'molasses')
+        self.assertEqual(ingredients.normalize_name('Basil leaves'), 'basil leaf')
+        parsed = ingredients.parse_ingredient('3 leaves basil')
+        self.assertEqual((parsed.unit, parsed.name), ('leaf', 'basil'))
+
+    def test_parse_ingredients_skips_bullets_and_blank_lines(self):
+        parsed = ingredients.parse_ingredients('- Eggs\n\n• Milk\n*  \n')
+        self.assertEqual([ingredient.name for ingredient in parsed], ['egg', 'milk'])
+
+    def test_split_names(self):
+        self.assertEqual(ingredients.split_names(['Tomatoes, garlic', 'tomato', '']), ['tomato', 'garlic'])
+
+
+class IngredientSyncTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='@parser',
+            email='parser@example.com',
+            password='Password123',
+            first_name='Par',
+            last_name='Ser',
+        )
+        self.recipe = Recipe.objects.create(
+            author=self.user,
+            title='Omelette',
+            description='Desc',
+            ingredients='3 eggs\n50 ml milk',
+            instructions='Cook',
+        )
+
+    def test_saving_a_recipe_parses_its_ingredients(self):
+        rows = list(self.recipe.parsed_ingredients.values_list('position', 'name', 'unit'))
+        self.assertEqual(rows, [(0, 'egg', ''), (1, 'milk', 'ml')])
+
+    def test_changed_ingredients_are_reparsed(self):
+        self.recipe.ingredients = '3 eggs\n1 tbsp butter'
+        self.recipe.save()
+        self.assertEqual(list(self.recipe.parsed_ingredients.values_list('name', flat=True)), ['egg', 'butter'])
+
+    def test_unchanged_ingredients_are_not_rewritten(self):
+        first_id = self.recipe.parsed_ingredients.first().pk
+        self.recipe.title = 'Fluffy Omelette'
+        with CaptureQueriesContext(connection) as queries:
+            self.recipe.save()
+        table = RecipeIngredient._meta.db_table
+        self.assertEqual(len([query for query in queries if table in query['sql']]), 1)
+        self.assertEqual(self.recipe.parsed_ingredients.first().pk, first_id)
+
+    def test_rebuild_reparses_rows_written_without_signals(self):
+        Recipe.objects.filter(pk=self.recipe.pk).update(ingredients='Butter')
+        self.assertEqual(ingredients.rebuild_ingredients(), 1)
+        self.assertEqual(list(RecipeIngredient.objects.values_list('name', flat=True)), ['butter'])
+
+
+class IngredientFilterTestCase(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user(
+            username='@ingredientfilter',
+            email='ingredientfilter@example.com',
+            password='Password123',
+            first_name='Filter',
+            last_name='User',
+        )
+        self.avocado_toast = Recipe.objects.create(
+            author=self.user, title='Avocado Toast', description='Desc',
+            ingredients='1 ripe avocado\n2 slices bread', instructions='Toast',
+        )
+        self.plain_toast = Recipe.objects.create(
+            author=self.user, title='Plain Toast', description='Desc', ingredients='2 slices bread', instructions='Toast',
+        )
+
+    def test_filter_recipes_by_ingredients(self):
+        request = self.factory.get('/?ingredient=avocados,+bread')
+        self.assertEqual(list(filter_recipes(request, Recipe.objects.all())), [self.avocado_toast])
+
+    def test_filter_recipes_excludes_ingredients(self):
+        request = self.factory.get('/?exclude_ingredient=Avocado&exclude_ingredient=nuts')
+        self.assertEqual(list(filter_recipes(request, Recipe.objects.all())), [self.plain_toast])
+
+    def test_ingredient_filters_match_whole_words_of_names(self):
+        curry = Recipe.objects.create(
+            author=self.user, title='Curry', description='Desc',
+            ingredients='2 chicken breasts\n250 ml semi-skimmed milk', instructions='Simmer',
+        )
+        request = self.factory.get('/?ingredient=chicken')
+        self.assertEqual(list(filter_recipes(request, Recipe.objects.all())), [curry])
+        request = self.factory.get('/?ingredient=chicken+breast')
+        self.assertEqual(list(filter_recipes(request, Recipe.objects.all())), [curry])
+        request = self.factory.get('/?ingredient=chicken+thigh')
+        self.assertEqual(list(filter_recipes(request, Recipe.objects.all())), [])
+        request = self.factory.get('/?exclude_ingredient=milk')
+        self.assertNotIn(curry, filter_recipes(request, Recipe.objects.all()))
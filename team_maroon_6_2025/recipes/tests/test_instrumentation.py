@@ -0,0 +1,133 @@
+import threading
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from recipes.instrumentation import QueryBudgetExceeded, RequestMetrics, query_stats, record_stats
+from recipes.models import Recipe, User
+from recipes.seeding import Seeder
+from recipes.tests.helpers import QueryBudgetTesterMixin
+
+
+def run(metrics, sql, params=()):
+    return metrics(lambda *args: None, sql, params, False, {})
+
+
+class RequestMetricsTestCase(TestCase):
+
+    def test_counts_queries_and_groups_duplicates(self):
+        metrics = RequestMetrics()
+        for pk in range(4):
+            run(metrics, 'SELECT * FROM recipes_user WHERE id = %s', (pk,))
+        run(metrics, 'SELECT * FROM recipes_user WHERE id = %s', (0,))
+        run(metrics, 'SELECT 1')
+
+        self.assertEqual(metrics.queries, 6)
+        self.assertEqual(metrics.duplicates, {'SELECT * FROM recipes_user WHERE id = %s': 5})
+        self.assertEqual(metrics.exact_duplicates, 1)
+
+    @override_settings(QUERY_BUDGETS={'recipe_list': 2})
+    def test_budget_comes_from_the_url_name(self):
+        metrics = RequestMetrics()
+        metrics.url_name = 'recipe_list'
+        for _ in range(3):
+            run(metrics, 'SELECT 1')
+        self.assertEqual(metrics.budget, 2)
+        self.assertTrue(metrics.over_budget)
+
+    def test_server_timing_lists_sql_template_and_app_time(self):
+        metrics = RequestMetrics()
+        run(metrics, 'SELECT 1')
+        self.assertIn('sql;dur=', metrics.server_timing())
+        self.assertIn('desc="1 queries"', metrics.server_timing())
+        self.assertIn('tpl;dur=', metrics.server_timing())
+
+
+class QueryInstrumentationMiddlewareTestCase(TestCase, QueryBudgetTesterMixin):
+
+    def setUp(self):
+        cache.clear()
+        Seeder(users=20, recipes=40, ratings=60, comments=40, follows=3, favourites=3, image_pool=0, seed=5).run()
+        self.user = User.objects.filter(following__isnull=False).first()
+        self.client.force_login(self.user)
+
+    def test_response_has_server_timing_and_metrics(self):
+        response = self.client.get(reverse('recipe_list'))
+        self.assertIn('sql;dur=', response['Server-Timing'])
+        self.assertEqual(response.query_metrics.url_name, 'recipe_list')
+        self.assertGreater(response.query_metrics.queries, 0)
+        self.assertGreater(response.query_metrics.template_ms, 0)
+
+    def test_hot_views_stay_within_their_budgets(self):
+        recipe = Recipe.objects.order_by('-comment_total').first()
+        urls = [
+            reverse('recipe_list'),
+            reverse('dashboard'),
+            reverse('recipe_detail', args=[recipe.pk]),
+            reverse('profile_page', args=[recipe.author.username]),
+        ]
+        for url in urls:
+            cache.clear()
+            with self.subTest(url=url):
+                self.assert_within_query_budget(self.client.get(url))
+
+    @override_settings(QUERY_BUDGETS={'recipe_list': 1}, QUERY_BUDGETS_STRICT=True)
+    def test_strict_mode_fails_requests_over_budget(self):
+        with self.assertLogs('recipes.queries', 'WARNING'), self.assertRaises(QueryBudgetExceeded):
+            self.client.get(reverse('recipe_list'))
+
+    @override_settings(QUERY_INSTRUMENTATION=False)
+    def test_disabled_instrumentation_adds_no_header(self):
+        response = self.client.get(reverse('recipe_list'))
+        self.assertNotIn('Server-Timing', response)
+
+    def test_requests_are_added_to_the_stats(self):
+        self.client.get(reverse('recipe_list'))
+        self.client.get(reverse('recipe_list'))
+        row = next(row for row in query_stats() if row['url_name'] == 'recipe_list')
+        self.assertEqual(row['requests'], 2)
+        self.assertEqual(row['budget'], 15)
+
+
+    def test_concurrent_requests_are_all_counted(self):
+        cache.clear()
+        metrics = RequestMetrics()
+        metrics.url_name, metrics.queries, metrics.sql_ms = 'recipe_list', 4, 1.5
+        workers = [threading.Thread(target=lambda: [record_stats(metrics) for _ in range(50)]) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        row = next(row for row in query_stats() if row['url_name'] == 'recipe_list')
+        self.assertEqual((row['requests'], row['avg_queries'], row['max_queries'], row['avg_sql_ms']), (200, 4, 4, 1.5))
+
+class QueryStatsDashboardTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.staff = User.objects.create_user(
+            username='@staffer', email='staff@example.com', password='Password123', is_staff=True
+        )
+        self.member = User.objects.create_user(
+            username='@member', email='member@example.com', password='Password123'
+        )
+
+    def test_staff_see_recorded_views(self):
+        self.client.force_login(self.staff)
+        self.client.get(reverse('home'))
+        response = self.client.get(reverse('query_stats'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Query Statistics')
+        self.assertTrue(any(row['url_name'] == 'home' for row in response.context['rows']))
+
+    def test_non_staff_are_redirected(self):
+        self.client.force_login(self.member)
+        response = self.client.get(reverse('query_stats'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_reset_clears_the_stats(self):
+        self.client.force_login(self.staff)
+        self.client.get(reverse('home'))
+        self.client.post(reverse('reset_query_stats'))
+        self.assertFalse(any(row['url_name'] == 'home' for row in query_stats()))
@@ -0,0 +1,230 @@
+from datetime import timedelta
+
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from recipes import notifications
+from recipes.models import Notification, Recipe, User
+
+
+class UnreadNotificationCounterTestCase(TestCase):
+    def setUp(self):
+        self.recipient = User.objects.create_user(
+            username='@reader',
+            email='reader@example.com',
+            password='Password123',
+            first_name='Read',
+            last_name='Er',
+        )
+        self.sender = User.objects.create_user(
+            username='@writer',
+            email='writer@example.com',
+            password='Password123',
+            first_name='Writ',
+            last_name='Er',
+        )
+
+    def _notify(self, notification_type='follow', **fields):
+        return Notification.objects.create(
+            recipient=self.recipient, sender=self.sender, notification_type=notification_type, **fields
+        )
+
+    def _unread(self):
+        self.recipient.refresh_from_db()
+        return self.recipient.unread_notification_total
+
+    def test_new_notifications_are_counted(self):
+        self._notify()
+        self._notify('comment')
+        self._notify('favourite', is_read=True)
+        self.assertEqual(self._unread(), 2)
+
+    def test_mark_all_read(self):
+        self._notify()
+        self._notify('comment')
+        self.assertEqual(notifications.mark_all_read(self.recipient), 2)
+        self.assertEqual(self._unread(), 0)
+        self.assertFalse(Notification.objects.filter(is_read=False).exists())
+        self.assertFalse(Notification.objects.filter(read_at__isnull=True).exists())
+
+    def test_mark_all_read_of_one_type(self):
+        self._notify()
+        self._notify('comment')
+        notifications.mark_all_read(self.recipient, 'comment')
+        self.assertEqual(self._unread(), 1)
+        self.assertTrue(Notification.objects.get(notification_type='follow').is_read is False)
+
+    def test_delete_all_of_type(self):
+        self._notify()
+        self._notify('comment')
+        self._notify('comment')
+        self.assertEqual(notifications.delete_all_of_type(self.recipient, 'comment'), 2)
+        self.assertEqual(self._unread(), 1)
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_withdrawn_notifications_are_uncounted(self):
+        self._notify()
+        notifications.delete_notifications(self.recipient.pk, self.sender.pk, 'follow')
+        self.assertEqual(self._unread(), 0)
+
+    def test_deleting_the_sender_recounts_recipients(self):
+        self._notify()
+        self.sender.delete()
+        self.assertEqual(self._unread(), 0)
+
+    def test_refresh_unread_totals_repairs_drift(self):
+        self._notify()
+        User.objects.filter(pk=self.recipient.pk).update(unread_notification_total=40)
+        notifications.refresh_unread_totals()
+        self.assertEqual(self._unread(), 1)
+
+
+class NotificationCoalescingTestCase(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(
+            username='@popular',
+            email='popular@example.com',
+            password='Password123',
+            first_name='Pop',
+            last_name='Ular',
+        )
+        self.fans = [
+            User.objects.create_user(
+                username=f'@fan{index}',
+                email=f'fan{index}@example.com',
+                password='Password123',
+                first_name='Fan',
+                last_name=str(index),
+            )
+            for index in range(5)
+        ]
+        self.recipe = Recipe.objects.create(
+            author=self.author,
+            title='Popular Recipe',
+            description='Desc',
+            ingredients='Eggs',
+            instructions='Cook',
+        )
+        self.target = {
+            'content_type_id': ContentType.objects.get_for_model(Recipe).pk,
+            'object_id': self.recipe.pk,
+        }
+
+    def _favourite(self, fan):
+        return notifications.create_notification(self.author.pk, fan.pk, 'favourite', **self.target)
+
+    def _unread(self):
+        self.author.refresh_from_db()
+        return self.author.unread_notification_total
+
+    def test_actions_on_one_target_share_a_row(self):
+        for fan in self.fans:
+            self._favourite(fan)
+        notification = Notification.objects.get()
+        self.assertEqual(notification.actor_count, 5)
+        self.assertEqual(notification.sender, self.fans[-1])
+        self.assertEqual(notification.recent_actors, [fan.pk for fan in reversed(self.fans)][:3])
+        self.assertEqual(self._unread(), 1)
+
+    def test_repeat_actor_is_counted_once(self):
+        self._favourite(self.fans[0])
+        self._favourite(self.fans[1])
+        self._favourite(self.fans[0])
+        notification = Notification.objects.get()
+        self.assertEqual(notification.actor_count, 2)
+        self.assertEqual(notification.recent_actors, [self.fans[0].pk, self.fans[1].pk])
+
+    def test_read_rows_are_not_reopened(self):
+        self._favourite(self.fans[0])
+        notifications.mark_all_read(self.author)
+        self._favourite(self.fans[1])
+        self.assertEqual(Notification.objects.count(), 2)
+        self.assertEqual(self._unread(), 1)
+
+    @override_settings(NOTIFICATION_COALESCE_WINDOW_HOURS=1)
+    def test_rows_outside_the_window_are_not_reused(self):
+        self._favourite(self.fans[0])
+        Notification.objects.update(created_at=timezone.now() - timedelta(hours=2))
+        self._favourite(self.fans[1])
+        self.assertEqual(Notification.objects.count(), 2)
+
+    @override_settings(NOTIFICATION_COALESCING=False)
+    def test_coalescing_can_be_switched_off(self):
+        self._favourite(self.fans[0])
+        self._favourite(self.fans[1])
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_withdrawing_removes_the_actor(self):
+        self._favourite(self.fans[0])
+        self._favourite(self.fans[1])
+        notifications.delete_notifications(self.author.pk, self.fans[1].pk, 'favourite', **self.target)
+        notification = Notification.objects.get()
+        self.assertEqual(notification.actor_count, 1)
+        self.assertEqual(notification.sender, self.fans[0])
+
+        notifications.delete_notifications(self.author.pk, self.fans[0].pk, 'favourite', **self.target)
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(self._unread(), 0)
+
+    def test_comments_on_one_recipe_share_a_row(self):
+        for fan in self.fans[:2]:
+            notifications.create_notification(self.author.pk, fan.pk, 'comment', **self.target)
+        notification = Notification.objects.get()
+        self.assertEqual((notification.notification_type, notification.actor_count), ('comment', 2))
+
+    def test_follow_requests_are_not_coalesced(self):
+        for fan in self.fans[:2]:
+            notifications.create_notification(self.author.pk, fan.pk, 'request')
+        self.assertEqual(Notification.objects.count(), 2)
+
+        notifications.delete_notifications(self.author.pk, self.fans[0].pk, 'request')
+        self.assertEqual(Notification.objects.get().sender, self.fans[1])
+
+    def test_attach_actors(self):
+        for fan in self.fans[:3]:
+            self._favourite(fan)
+        notification, = notifications.attach_actors(Notification.objects.all())
+        self.assertEqual(notification.other_actors, [self.fans[1], self.fans[0]])
+
+
+class PruneNotificationsTestCase(TestCase):
+    def setUp(self):
+        self.recipient = User.objects.create_user(
+            username='@pruned',
+            email='pruned@example.com',
+            password='Password123',
+            first_name='Pru',
+            last_name='Ned',
+        )
+        self.sender = User.objects.create_user(
+            username='@pruner',
+            email='pruner@example.com',
+            password='Password123',
+            first_name='Pru',
+            last_name='Ner',
+        )
+
+    def _notify(self, days_ago, is_read=False):
+        notification = Notification.objects.create(
+            recipient=self.recipient, sender=self.sender, notification_type='follow', is_read=is_read
+        )
+        Notification.objects.filter(pk=notification.pk).update(created_at=timezone.now() - timedelta(days=days_ago))
+        return notification
+
+    def test_prunes_by_age_and_read_state(self):
+        old = self._notify(100)
+        old_read = self._notify(40, is_read=True)
+        old_unread = self._notify(40)
+        fresh_read = self._notify(1, is_read=True)
+        now = timezone.now()
+        deleted = notifications.prune_notifications(
+            now - timedelta(days=90), read_older_than=now - timedelta(days=30), batch_size=1
+        )
+        self.assertEqual(deleted, 2)
+        self.assertEqual(
+            set(Notification.objects.values_list('pk', flat=True)), {old_unread.pk, fresh_read.pk}
+        )
+        self.assertFalse(Notification.objects.filter(pk__in=[old.pk, old_read.pk]).exists())
+        self.recipient.refresh_from_db()
+        self.assertEqual(self.recipient.unread_notification_total, 1)
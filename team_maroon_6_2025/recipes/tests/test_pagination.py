@@ -0,0 +1,77 @@
+from django.test import TestCase
+from django.test.client import RequestFactory
+
+from recipes.helpers import RECIPE_ORDERING, base_recipe_queryset
+from recipes.models import Recipe, User
+from recipes.pagination import KeysetPaginator, decode_cursor, encode_cursor, paginate_by_cursor
+
+
+class KeysetPaginatorTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='@pager',
+            email='pager@example.com',
+            password='Password123',
+            first_name='Pa',
+            last_name='Ger',
+        )
+        Recipe.objects.bulk_create([
+            Recipe(
+                author=self.user,
+                title=f'Recipe {i:02d}',
+                description='Desc',
+                ingredients='Eggs',
+                instructions='Cook',
+                favourites_total=i % 4,
+            )
+            for i in range(23)
+        ])
+
+    def _walk_forward(self, ordering, per_page=5):
+        paginator = KeysetPaginator(base_recipe_queryset(), ordering, per_page)
+        pages = [paginator.get_page()]
+        while pages[-1].has_next:
+            pages.append(paginator.get_page(pages[-1].next_cursor))
+        return paginator, pages
+
+    def test_forward_walk_visits_every_recipe_once(self):
+        for sort, ordering in RECIPE_ORDERING.items():
+            if sort == 'relevance':
+                continue
+            _, pages = self._walk_forward(ordering)
+            seen = [recipe.pk for page in pages for recipe in page]
+            tiebreak = '-id' if ordering[0].startswith('-') else 'id'
+            expected = list(base_recipe_queryset().order_by(*ordering, tiebreak).values_list('pk', flat=True))
+            self.assertEqual(seen, expected, sort)
+            self.assertEqual([len(page) for page in pages], [5, 5, 5, 5, 3])
+
+    def test_first_and_last_page_flags(self):
+        _, pages = self._walk_forward(RECIPE_ORDERING['newest'])
+        self.assertFalse(pages[0].has_previous)
+        self.assertTrue(pages[0].has_next)
+        self.assertTrue(pages[-1].has_previous)
+        self.assertFalse(pages[-1].has_next)
+
+    def test_previous_cursor_returns_to_earlier_page(self):
+        paginator, pages = self._walk_forward(RECIPE_ORDERING['favourites'])
+        for index in range(len(pages) - 1, 0, -1):
+            previous = paginator.get_page(pages[index].previous_cursor)
+            self.assertEqual(list(previous), list(pages[index - 1]))
+        self.assertFalse(paginator.get_page(pages[1].previous_cursor).has_previous)
+
+    def test_malformed_cursor_returns_first_page(self):
+        paginator = KeysetPaginator(base_recipe_queryset(), RECIPE_ORDERING['newest'], 5)
+        first = paginator.get_page()
+        for token in ['garbage', encode_cursor([1], 'n'), encode_cursor([1, 2], 'x')]:
+            self.assertEqual(list(paginator.get_page(token)), list(first))
+
+    def test_cursor_round_trip(self):
+        token = encode_cursor(['2025-01-01T00:00:00+00:00', 7], 'p')
+        self.assertEqual(decode_cursor(token, 2), ('p', ['2025-01-01T00:00:00+00:00', 7]))
+
+    def test_paginate_by_cursor_keeps_other_parameters(self):
+        request = RequestFactory().get('/recipes/', {'sort': 'title', 'cursor': 'abc', 'q': 'egg'})
+        page = paginate_by_cursor(request, base_recipe_queryset(), ('title',), per_page=5)
+        self.assertEqual(page.param, 'cursor')
+        self.assertNotIn('cursor', page.base_querystring)
+        self.assertIn('sort=title', page.base_querystring)
@@ -0,0 +1,91 @@
+import threading
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from recipes import pantry
+from recipes.caching import get_version
+from recipes.models import Recipe, User
+from recipes.pantry import PantryIndex
+
+
+class PantryIndexTestCase(TestCase):
+
+    def setUp(self):
+        self.index = PantryIndex([
+            ('egg', 1), ('flour', 1), ('milk', 1), ('salt', 1),
+            ('egg', 2), ('chicken breast', 2),
+            ('olive oil', 3), ('garlic', 3), ('bell pepper', 3), ('pepper', 3),
+        ], staples=['salt', 'pepper'])
+
+    def test_ranks_by_coverage(self):
+        matches = self.index.search(['egg', 'flour', 'milk'])
+        self.assertEqual([(match.recipe_id, match.matched, match.total) for match in matches], [(1, 3, 3), (2, 1, 2)])
+        self.assertEqual(matches[0].coverage, 1)
+
+    def test_partial_names_match_longer_ingredients(self):
+        self.assertEqual(self.index.expand('chicken'), {'chicken breast'})
+        self.assertEqual([match.recipe_id for match in self.index.search(['oil'])], [3])
+
+    def test_staples_are_left_out_of_the_index(self):
+        self.assertEqual(self.index.search(['salt']), [])
+        self.assertEqual(self.index.sizes[3], 3)
+        self.assertEqual(self.index.expand('pepper'), {'bell pepper'})
+
+    def test_complete_only_and_limit(self):
+        self.assertEqual([match.recipe_id for match in self.index.search(['egg'], complete_only=True)], [])
+        self.assertEqual(len(self.index.search(['egg'], limit=1)), 1)
+
+
+@override_settings(PANTRY_INDEX_REFRESH_SECONDS=0, PANTRY_INDEX_BACKGROUND=False)
+class PantryIndexRefreshTestCase(TestCase):
+
+    def test_index_is_rebuilt_after_ingredients_change(self):
+        user = User.objects.create_user(username='@pantry', email='pantry@example.com', password='Password123')
+        recipe = Recipe.objects.create(
+            author=user, title='Toast', description='Desc', ingredients='2 slices bread', instructions='Toast',
+        )
+        self.assertEqual([match.recipe_id for match in pantry.search(['bread'])], [recipe.pk])
+        recipe.ingredients = 'Bagel'
+        recipe.save()
+        self.assertEqual(pantry.search(['bread']), [])
+
+
+class PantryIndexRebuildTestCase(TestCase):
+
+    def setUp(self):
+        self.old = PantryIndex([('egg', 1)], version=get_version(pantry.INDEX_SCOPE))
+        self.new = PantryIndex([('egg', 2)])
+        self.addCleanup(setattr, pantry, '_current', None)
+        pantry._current = self.old
+
+    def age(self, seconds):
+        self.old.built_at -= seconds
+
+    @override_settings(PANTRY_INDEX_BACKGROUND=False)
+    def test_unchanged_index_is_rebuilt_once_it_reaches_max_age(self):
+        self.age(30)
+        with mock.patch.object(PantryIndex, 'build', return_value=self.new):
+            self.assertIs(pantry.get_index(), self.old)
+            self.age(pantry.max_age_seconds())
+            self.assertIs(pantry.get_index(), self.new)
+
+    @override_settings(PANTRY_INDEX_BACKGROUND=False)
+    def test_requests_keep_the_old_index_while_another_rebuilds(self):
+        self.age(pantry.max_age_seconds())
+        pantry._lock.acquire()
+        try:
+            with mock.patch.object(PantryIndex, 'build', return_value=self.new) as build:
+                self.assertIs(pantry.get_index(), self.old)
+            build.assert_not_called()
+        finally:
+            pantry._lock.release()
+
+    def test_rebuild_runs_off_the_request_thread(self):
+        self.age(pantry.max_age_seconds())
+        with mock.patch.object(PantryIndex, 'build', return_value=self.new):
+            self.assertIs(pantry.get_index(), self.old)
+            for thread in threading.enumerate():
+                if thread.name == 'pantry-index':
+                    thread.join()
+        self.assertIs(pantry._current, self.new)
@@ -0,0 +1,113 @@
+import asyncio
+import threading
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from recipes import notifications, pubsub
+from recipes.models import Notification, User
+from recipes.pubsub import CacheBroker, InMemoryBroker
+
+
+class BrokerTests:
+    """Behaviour every broker must share; subclasses provide ``make_broker``."""
+
+    def test_publish_numbers_events(self):
+        broker = self.make_broker()
+        self.assertEqual(broker.last_id('user:1'), 0)
+        self.assertEqual(broker.publish('user:1', {'type': 'unread', 'unread': 1}), 1)
+        self.assertEqual(broker.publish('user:1', {'type': 'unread', 'unread': 2}), 2)
+        self.assertEqual(broker.last_id('user:1'), 2)
+        self.assertEqual(broker.last_id('user:2'), 0)
+
+    def test_wait_returns_events_after_cursor(self):
+        broker = self.make_broker()
+        broker.publish('user:1', {'n': 1})
+        broker.publish('user:1', {'n': 2})
+        self.assertEqual(broker.wait('user:1', 1, timeout=0), [(2, {'n': 2})])
+
+    def test_wait_times_out_without_events(self):
+        self.assertEqual(self.make_broker().wait('user:1', 0, timeout=0.01), [])
+
+    def test_wait_wakes_on_publish_from_another_thread(self):
+        broker = self.make_broker()
+        timer = threading.Timer(0.05, broker.publish, args=('user:1', {'n': 1}))
+        timer.start()
+        self.assertEqual(broker.wait('user:1', 0, timeout=5), [(1, {'n': 1})])
+        timer.join()
+
+    def test_wait_async_wakes_on_publish_from_another_thread(self):
+        broker = self.make_broker()
+
+        async def listen():
+            timer = threading.Timer(0.05, broker.publish, args=('user:1', {'n': 1}))
+            timer.start()
+            try:
+                return await broker.wait_async('user:1', 0, timeout=5)
+            finally:
+                timer.join()
+
+        self.assertEqual(asyncio.run(listen()), [(1, {'n': 1})])
+
+    def test_wait_async_times_out(self):
+        broker = self.make_broker()
+        self.assertEqual(asyncio.run(broker.wait_async('user:1', 0, timeout=0.01)), [])
+
+
+class InMemoryBrokerTestCase(BrokerTests, SimpleTestCase):
+
+    def make_broker(self):
+        return InMemoryBroker(history=10)
+
+    def test_history_is_bounded(self):
+        broker = InMemoryBroker(history=2)
+        for n in range(5):
+            broker.publish('user:1', {'n': n})
+        self.assertEqual([event_id for event_id, _ in broker.wait('user:1', 0, timeout=0)], [4, 5])
+
+
+class CacheBrokerTestCase(BrokerTests, SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def make_broker(self):
+        return CacheBroker(poll_interval=0.01)
+
+
+class NotificationPublishingTestCase(TestCase):
+
+    def setUp(self):
+        pubsub._load_broker.cache_clear()
+        self.addCleanup(pubsub._load_broker.cache_clear)
+        self.recipient = User.objects.create_user(
+            username='@listener', email='listener@example.com', password='Password123',
+            first_name='Lis', last_name='Tener',
+        )
+        self.sender = User.objects.create_user(
+            username='@talker', email='talker@example.com', password='Password123',
+            first_name='Tal', last_name='Ker',
+        )
+        self.channel = pubsub.user_channel(self.recipient.pk)
+
+    def _events(self):
+        return [event for _, event in pubsub.get_broker().wait(self.channel, 0, timeout=0)]
+
+    def test_new_notification_is_published_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            notifications.create_notification(self.recipient.pk, self.sender.pk, 'follow')
+        event, = self._events()
+        self.assertEqual(event['type'], 'notification')
+        self.assertEqual(event['unread'], 1)
+        self.assertEqual(event['notification']['sender'], '@talker')
+
+    def test_mark_all_read_publishes_unread_count(self):
+        Notification.objects.create(recipient=self.recipient, sender=self.sender, notification_type='follow')
+        with self.captureOnCommitCallbacks(execute=True):
+            notifications.mark_all_read(self.recipient)
+        self.assertEqual(self._events(), [{'type': 'unread', 'unread': 0}])
+
+    @override_settings(NOTIFICATION_BROKER='recipes.pubsub.CacheBroker')
+    def test_broker_is_swappable(self):
+        cache.clear()
+        self.assertIsInstance(pubsub.get_broker(), CacheBroker)
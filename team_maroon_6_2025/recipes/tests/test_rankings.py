@@ -0,0 +1,99 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from recipes.models import Category, Recipe, RecipeRanking, Task, User
+from recipes.rankings import REFRESH_LOCK_KEY, compute_rankings, ranked_recipes, trending_score
+from recipes.task_queue import run_pending
+
+
+class RankingsTestCase(TestCase):
+    def setUp(self):
+        cache.delete(REFRESH_LOCK_KEY)
+        self.user = User.objects.create_user(
+            username='@ranker',
+            email='ranker@example.com',
+            password='Password123',
+            first_name='Ran',
+            last_name='Ker',
+        )
+        self.category = Category.objects.create(key='ranking_test', label='Ranking Test')
+        self.quiet = self._recipe('Quiet Recipe', favourites=0)
+        self.popular = self._recipe('Popular Recipe', favourites=5)
+        self.popular.categories.add(self.category)
+
+    def _recipe(self, title, favourites=0, age=timedelta()):
+        recipe = Recipe.objects.create(
+            author=self.user,
+            title=title,
+            description='Desc',
+            ingredients='Eggs',
+            instructions='Cook',
+        )
+        Recipe.objects.filter(pk=recipe.pk).update(
+            favourites_total=favourites,
+            created_at=timezone.now() - age,
+        )
+        recipe.refresh_from_db()
+        return recipe
+
+    def test_trending_score_decays_with_age(self):
+        now = timezone.now()
+        fresh = trending_score(5, 0, 0, now, now)
+        old = trending_score(5, 0, 0, now - timedelta(days=2), now)
+        self.assertGreater(fresh, old)
+
+    def test_trending_ranks_by_score(self):
+        compute_rankings()
+        self.assertEqual(ranked_recipes(RecipeRanking.TRENDING)[:2], [self.popular, self.quiet])
+
+    def test_category_ranking_falls_back_to_all_time_favourites(self):
+        veteran = self._recipe('Veteran Recipe', favourites=50, age=timedelta(days=400))
+        veteran.categories.add(self.category)
+        compute_rankings()
+        self.assertEqual(
+            ranked_recipes(RecipeRanking.CATEGORY, category_ids=[self.category.id]),
+            [self.popular, veteran],
+        )
+        # Trending is topped up too, after every recipe from the window
+        self.assertEqual(ranked_recipes(RecipeRanking.TRENDING), [self.popular, self.quiet, veteran])
+
+    def test_trending_falls_back_to_all_time_top_when_window_is_empty(self):
+        Recipe.objects.update(created_at=timezone.now() - timedelta(days=400))
+        compute_rankings()
+        self.assertEqual(ranked_recipes(RecipeRanking.TRENDING), [self.popular, self.quiet])
+
+    def test_rankings_computed_when_missing(self):
+        self.assertFalse(RecipeRanking.objects.exists())
+        self.assertIn(self.popular, ranked_recipes(RecipeRanking.TRENDING))
+        self.assertTrue(RecipeRanking.objects.exists())
+
+    @override_settings(RANKING_STALE_AFTER=60)
+    def test_stale_rankings_are_refreshed(self):
+        compute_rankings(now=timezone.now() - timedelta(hours=1))
+        newcomer = self._recipe('Newcomer Recipe', favourites=100)
+        self.assertEqual(ranked_recipes(RecipeRanking.TRENDING)[0], newcomer)
+
+    @override_settings(RANKING_STALE_AFTER=60, TASK_QUEUE_EAGER=False)
+    def test_stale_rankings_are_recomputed_in_a_task(self):
+        compute_rankings(now=timezone.now() - timedelta(hours=1))
+        newcomer = self._recipe('Newcomer Recipe', favourites=100)
+        self.assertEqual(ranked_recipes(RecipeRanking.TRENDING)[0], self.popular)
+        ranked_recipes(RecipeRanking.TRENDING)
+        self.assertEqual(Task.objects.filter(name='rankings.compute').count(), 1)
+        run_pending()
+        self.assertEqual(ranked_recipes(RecipeRanking.TRENDING)[0], newcomer)
+        self.assertFalse(Task.objects.filter(name='rankings.compute').exists())
+
+    def test_fresh_rankings_are_reused(self):
+        compute_rankings()
+        self._recipe('Newcomer Recipe', favourites=100)
+        self.assertEqual(ranked_recipes(RecipeRanking.TRENDING)[0], self.popular)
+
+    def test_missing_rankings_are_not_recomputed_while_locked(self):
+        cache.add(REFRESH_LOCK_KEY, True, 60)
+        self.addCleanup(cache.delete, REFRESH_LOCK_KEY)
+        self.assertEqual(ranked_recipes(RecipeRanking.TRENDING), [])
+        self.assertFalse(RecipeRanking.objects.exists())
@@ -0,0 +1,88 @@
+from django.db import connection
+from django.test import TestCase
+
+from recipes.models import Recipe, User
+from recipes.search_index import (
+    ContainsSearchBackend,
+    SQLiteFTSSearchBackend,
+    build_match_expression,
+    get_search_backend,
+)
+
+
+class SearchIndexTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='@searcher',
+            email='searcher@example.com',
+            password='Password123',
+            first_name='Search',
+            last_name='Er',
+        )
+        self.pancakes = Recipe.objects.create(
+            author=self.user,
+            title='Fluffy Pancakes',
+            description='Weekend breakfast',
+            ingredients='Flour\nMilk\nEggs',
+            instructions='Whisk and fry',
+        )
+        self.omelette = Recipe.objects.create(
+            author=self.user,
+            title='Cheese Omelette',
+            description='Quick lunch',
+            ingredients='Eggs\nCheese\nPancake mix',
+            instructions='Whisk and fry',
+        )
+        self.backend = SQLiteFTSSearchBackend()
+
+    def test_default_backend_on_sqlite(self):
+        self.assertIsInstance(get_search_backend(), SQLiteFTSSearchBackend)
+
+    def test_build_match_expression_quotes_terms(self):
+        self.assertEqual(build_match_expression('Pan "cake" OR'), '"pan"* "cake"* "or"*')
+        self.assertEqual(build_match_expression('!!!'), '')
+
+    def test_search_matches_prefix(self):
+        results = self.backend.search(Recipe.objects.all(), 'pan')
+        self.assertEqual(set(results), {self.pancakes, self.omelette})
+
+    def test_search_ranks_title_matches_first(self):
+        results = list(self.backend.search(Recipe.objects.all(), 'pancake').order_by('search_rank'))
+        self.assertEqual(results, [self.pancakes, self.omelette])
+
+    def test_search_runs_match_once(self):
+        results = self.backend.search(Recipe.objects.all(), 'pancake')
+        sql = str(results.order_by('search_rank').query)
+        self.assertEqual(sql.count('MATCH'), 1)
+        best = results.order_by('search_rank')[0].search_rank
+        self.assertEqual(list(results.filter(search_rank__gt=best)), [self.omelette])
+
+    def test_search_requires_every_term(self):
+        results = self.backend.search(Recipe.objects.all(), 'cheese eggs')
+        self.assertEqual(list(results), [self.omelette])
+
+    def test_index_follows_recipe_updates(self):
+        self.pancakes.title = 'Fluffy Crepes'
+        self.pancakes.ingredients = 'Flour'
+        self.pancakes.save()
+        self.assertFalse(self.backend.search(Recipe.objects.filter(pk=self.pancakes.pk), 'pancake').exists())
+        self.assertTrue(self.backend.search(Recipe.objects.all(), 'crepes').exists())
+
+    def test_index_drops_deleted_recipes(self):
+        pk = self.omelette.pk
+        self.omelette.delete()
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM recipes_recipe_fts WHERE rowid = %s', [pk])
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+    def test_rebuild_indexes_existing_recipes(self):
+        Recipe.objects.bulk_create([
+            Recipe(author=self.user, title='Bulk Brownies', description='', ingredients='Cocoa', instructions='Bake'),
+        ])
+        self.assertFalse(self.backend.search(Recipe.objects.all(), 'brownies').exists())
+        self.backend.rebuild()
+        self.assertTrue(self.backend.search(Recipe.objects.all(), 'brownies').exists())
+
+    def test_contains_backend_matches_substrings(self):
+        results = ContainsSearchBackend().search(Recipe.objects.all(), 'ncake')
+        self.assertEqual(set(results), {self.pancakes, self.omelette})
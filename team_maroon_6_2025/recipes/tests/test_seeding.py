@@ -0,0 +1,86 @@
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+
+from recipes.models import Comment, Notification, Recipe, RecipeImage, RecipeRating, TimelineEntry, User
+from recipes.search_index import get_search_backend
+from recipes.seeding import Seeder
+
+
+class SeederTestCase(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root, RECIPE_IMAGE_WIDTHS=(320,))
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def seed(self, **options):
+        defaults = dict(users=30, recipes=60, ratings=200, comments=50, follows=3, favourites=3,
+                        image_pool=2, batch_size=25, seed=7)
+        defaults.update(options)
+        return Seeder(**defaults).run()
+
+    def test_creates_requested_rows(self):
+        created = self.seed()
+        self.assertEqual(User.objects.count(), 30)
+        self.assertEqual(Recipe.objects.count(), 60)
+        self.assertEqual(RecipeRating.objects.count(), 200)
+        self.assertEqual(Comment.objects.count(), 50)
+        self.assertEqual(created['recipes'], 60)
+        self.assertTrue(Notification.objects.filter(notification_type='comment').exists())
+
+    def test_ratings_can_fill_every_pair(self):
+        created = self.seed(users=6, recipes=10, ratings=1000, comments=0, follows=0, favourites=0, image_pool=0)
+        self.assertEqual(created['ratings'], 60)
+        self.assertEqual(RecipeRating.objects.count(), 60)
+
+    def test_reports_rows_actually_written(self):
+        self.seed(users=6, recipes=10, ratings=60, comments=0, follows=0, favourites=0, image_pool=0)
+        created = Seeder(users=6, recipes=0, ratings=60, image_pool=0, seed=8).run()
+        self.assertEqual(created['ratings'], 0)
+        self.assertEqual(created['users'], 0)
+
+    def test_users_are_valid_and_share_the_default_password(self):
+        self.seed(recipes=0)
+        for user in User.objects.all()[:5]:
+            user.full_clean()
+            self.assertTrue(user.check_password('Password123'))
+
+    def test_recipes_use_the_shared_image_pool(self):
+        self.seed()
+        self.assertEqual(RecipeImage.objects.count(), 60)
+        self.assertLessEqual(RecipeImage.objects.values('image').distinct().count(), 2)
+        self.assertTrue(all(image.is_processed for image in RecipeImage.objects.all()[:5]))
+
+    def test_recipe_timestamps_are_spread_out(self):
+        self.seed()
+        self.assertGreater(Recipe.objects.dates('created_at', 'day').count(), 1)
+
+    def test_derived_data_is_rebuilt(self):
+        self.seed()
+        recipe = Recipe.objects.filter(rating_total__gt=0).first()
+        self.assertEqual(recipe.rating_total, recipe.ratings.count())
+        self.assertEqual(sum(r.comment_total for r in Recipe.objects.all()), 50)
+        self.assertTrue(TimelineEntry.objects.exists())
+        title_word = Recipe.objects.first().title.split()[0]
+        self.assertTrue(get_search_backend().search(Recipe.objects.all(), title_word).exists())
+
+    def test_same_seed_gives_same_titles(self):
+        self.seed(users=5, recipes=10, ratings=0, comments=0, follows=0, favourites=0, image_pool=0)
+        first = list(Recipe.objects.order_by('id').values_list('title', flat=True))
+        User.objects.all().delete()
+        self.seed(users=5, recipes=10, ratings=0, comments=0, follows=0, favourites=0, image_pool=0)
+        self.assertEqual(list(Recipe.objects.order_by('id').values_list('title', flat=True)), first)
+
+    def test_deleting_one_pooled_image_keeps_the_shared_files(self):
+        self.seed(recipes=3, image_pool=1, ratings=0, comments=0)
+        first, second = RecipeImage.objects.all()[:2]
+        first.delete()
+        second.refresh_from_db()
+        self.assertTrue(second.image.storage.exists(second.variants['thumbnail']))
+
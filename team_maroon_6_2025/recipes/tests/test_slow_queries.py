@@ -0,0 +1,69 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from recipes.models import Category, Recipe, SlowQuery, User
+from recipes.slow_queries import explain, fingerprint, is_full_scan, normalize_sql
+
+
+class NormalizeSqlTestCase(TestCase):
+
+    def test_literals_and_parameters_collapse(self):
+        self.assertEqual(
+            normalize_sql("SELECT * FROM t WHERE a = 5 AND b = 'x'  AND c = %s"),
+            "SELECT * FROM t WHERE a = ? AND b = ? AND c = ?",
+        )
+
+    def test_in_lists_of_any_length_share_a_fingerprint(self):
+        self.assertEqual(
+            fingerprint('SELECT * FROM "t" WHERE "id" IN (%s, %s)'),
+            fingerprint('SELECT * FROM "t" WHERE "id" IN (%s, %s, %s, %s)'),
+        )
+
+    def test_identifiers_with_digits_are_kept(self):
+        self.assertIn('"T3"', normalize_sql('SELECT "T3"."id" FROM "recipes_recipe" "T3"'))
+
+    def test_full_scan_detection(self):
+        self.assertTrue(is_full_scan("SCAN recipes_recipe"))
+        self.assertFalse(is_full_scan("SCAN recipes_recipe USING INDEX recipe_favourites_idx"))
+        self.assertFalse(is_full_scan("SEARCH recipes_recipe USING INTEGER PRIMARY KEY (rowid=?)"))
+        self.assertTrue(is_full_scan("Seq Scan on recipes_recipe"))
+
+    def test_explain_returns_a_plan_for_selects_only(self):
+        self.assertTrue(explain('SELECT * FROM "recipes_recipe" WHERE "id" = %s', [1]))
+        self.assertEqual(explain('DELETE FROM "recipes_recipe" WHERE "id" = %s', [1]), "")
+
+
+@override_settings(SLOW_QUERY_LOG=True, SLOW_QUERY_THRESHOLD_MS=0)
+class SlowQueryLogTestCase(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='@slowpoke', email='slow@example.com', password='Password123'
+        )
+        self.category, _ = Category.objects.get_or_create(key='dinner', defaults={'label': 'Dinner'})
+        recipe = Recipe.objects.create(
+            author=self.user, title='Stew', description='d', ingredients='i', instructions='x'
+        )
+        recipe.categories.add(self.category)
+        self.client.force_login(self.user)
+
+    def test_request_queries_are_recorded_with_view_and_params(self):
+        self.client.get(reverse('recipe_list'), {'q': 'stew', 'sort': 'rating', 'meal': self.category.pk})
+        self.assertTrue(SlowQuery.objects.exists())
+        query = SlowQuery.objects.filter(view_name='recipe_list').exclude(plan='').first()
+        self.assertEqual(query.request_params['q'], ['stew'])
+        self.assertEqual(query.request_params['sort'], ['rating'])
+        self.assertGreater(query.calls, 0)
+
+    def test_repeated_requests_aggregate_by_fingerprint(self):
+        self.client.get(reverse('recipe_list'), {'q': 'stew'})
+        rows = SlowQuery.objects.count()
+        calls = sum(SlowQuery.objects.values_list('calls', flat=True))
+        self.client.get(reverse('recipe_list'), {'q': 'soup'})
+        self.assertEqual(SlowQuery.objects.count(), rows)
+        self.assertGreater(sum(SlowQuery.objects.values_list('calls', flat=True)), calls)
+
+    @override_settings(SLOW_QUERY_LOG=False)
+    def test_nothing_is_recorded_when_off(self):
+        self.client.get(reverse('recipe_list'))
+        self.assertFalse(SlowQuery.objects.exists())
@@ -0,0 +1,110 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from recipes import task_queue
+from recipes.models import Notification, Recipe, Task, User
+from recipes.task_queue import enqueue, queue_stats, run_pending, task
+
+CALLS = []
+
+
+@task("tests.record")
+def record(value):
+    CALLS.append(value)
+
+
+@task("tests.explode")
+def explode():
+    raise RuntimeError("boom")
+
+
+@override_settings(TASK_QUEUE_EAGER=False)
+class TaskQueueTestCase(TestCase):
+
+    def setUp(self):
+        CALLS.clear()
+
+    def test_enqueue_stores_task_until_worker_runs_it(self):
+        enqueue("tests.record", value=3)
+        self.assertEqual(CALLS, [])
+        self.assertEqual(Task.objects.get().payload, {"value": 3})
+
+        self.assertEqual(run_pending(), (1, 0))
+        self.assertEqual(CALLS, [3])
+        self.assertFalse(Task.objects.exists())
+
+    @override_settings(TASK_QUEUE_EAGER=True)
+    def test_eager_mode_runs_inline(self):
+        self.assertIsNone(enqueue("tests.record", value=5))
+        self.assertEqual(CALLS, [5])
+        self.assertFalse(Task.objects.exists())
+
+    def test_unknown_task_is_rejected(self):
+        with self.assertRaises(KeyError):
+            enqueue("tests.missing")
+
+    def test_failures_are_retried_with_backoff_then_marked_failed(self):
+        queued = enqueue("tests.explode", max_attempts=2)
+        self.assertEqual(run_pending(), (0, 1))
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.PENDING)
+        self.assertGreater(queued.run_after, timezone.now())
+        self.assertIn("boom", queued.last_error)
+
+        self.assertEqual(run_pending(), (0, 0))
+        Task.objects.update(run_after=timezone.now())
+        run_pending()
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.FAILED)
+        self.assertEqual(queued.attempts, 2)
+
+    def test_stale_running_tasks_are_requeued(self):
+        queued = enqueue("tests.record", value=1)
+        Task.objects.update(status=Task.RUNNING, locked_at=timezone.now() - timedelta(hours=1))
+        run_pending()
+        self.assertEqual(CALLS, [1])
+        self.assertFalse(Task.objects.filter(pk=queued.pk).exists())
+
+    def test_queue_stats(self):
+        enqueue("tests.record", value=1)
+        enqueue("tests.record", value=2)
+        Task.objects.create(name="tests.explode", status=Task.FAILED, run_after=timezone.now())
+        stats = queue_stats()
+        self.assertEqual(stats["pending"], 2)
+        self.assertEqual(stats["failed"], 1)
+        self.assertEqual(stats["by_name"]["tests.record"], {"pending": 2})
+        self.assertIsNotNone(stats["oldest_pending"])
+
+    def test_comment_notification_is_deferred_to_worker(self):
+        author = User.objects.create_user(
+            username='@queueauthor',
+            email='queueauthor@example.com',
+            password='Password123',
+            first_name='Queue',
+            last_name='Author'
+        )
+        User.objects.create_user(
+            username='@queuefan',
+            email='queuefan@example.com',
+            password='Password123',
+            first_name='Queue',
+            last_name='Fan'
+        )
+        recipe = Recipe.objects.create(
+            author=author,
+            title='Queued Recipe',
+            description='Desc',
+            ingredients='Eggs',
+            instructions='Cook'
+        )
+        Task.objects.all().delete()
+        self.client.login(username='@queuefan', password='Password123')
+        self.client.post(reverse('comment_add', args=[recipe.pk]), {'body': 'Lovely'})
+
+        self.assertFalse(Notification.objects.exists())
+        self.assertTrue(Task.objects.filter(name="notifications.create").exists())
+        run_pending()
+        self.assertTrue(Notification.objects.filter(recipient=author, notification_type='comment').exists())
@@ -0,0 +1,161 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.test import TestCase, override_settings
+
+from recipes.models import Recipe, TimelineEntry, User
+from recipes.timeline import (
+    HIGH_FANOUT_CACHE_KEY,
+    following_feed,
+    high_fanout_author_ids,
+    rebuild_all_timelines,
+    rebuild_timeline,
+    refresh_follower_totals,
+)
+
+
+class TimelineTestCase(TestCase):
+    def setUp(self):
+        cache.delete(HIGH_FANOUT_CACHE_KEY)
+        self.reader = User.objects.create_user(
+            username='@reader',
+            email='reader@example.com',
+            password='Password123',
+            first_name='Rea',
+            last_name='Der',
+        )
+        self.author = User.objects.create_user(
+            username='@writer',
+            email='writer@example.com',
+            password='Password123',
+            first_name='Wri',
+            last_name='Ter',
+        )
+
+    def tearDown(self):
+        cache.delete(HIGH_FANOUT_CACHE_KEY)
+
+    def _post(self, title):
+        return Recipe.objects.create(
+            author=self.author,
+            title=title,
+            description='Desc',
+            ingredients='Eggs',
+            instructions='Cook',
+        )
+
+    def _feed(self):
+        return list(following_feed(self.reader, Recipe.objects.all()).order_by('-created_at', '-id'))
+
+    def test_new_recipe_fans_out_to_followers(self):
+        self.reader.following.add(self.author)
+        recipe = self._post('Fresh Recipe')
+        self.assertTrue(TimelineEntry.objects.filter(user=self.reader, recipe=recipe).exists())
+        self.assertEqual(self._feed(), [recipe])
+
+    def test_following_backfills_existing_recipes(self):
+        older = self._post('Older Recipe')
+        self.author.followers.add(self.reader)
+        self.assertEqual(self._feed(), [older])
+
+    def test_unfollowing_removes_author_entries(self):
+        self.reader.following.add(self.author)
+        self._post('Fresh Recipe')
+        self.reader.following.remove(self.author)
+        self.assertEqual(self._feed(), [])
+
+    def test_clearing_follows_empties_timeline(self):
+        self.reader.following.add(self.author)
+        self._post('Fresh Recipe')
+        self.reader.following.clear()
+        self.assertFalse(TimelineEntry.objects.filter(user=self.reader).exists())
+
+    @override_settings(TIMELINE_MAX_DEPTH=2)
+    def test_timeline_is_trimmed_to_depth(self):
+        self.reader.following.add(self.author)
+        recipes = [self._post(f'Recipe {i}') for i in range(4)]
+        kept = set(TimelineEntry.objects.filter(user=self.reader).values_list('recipe_id', flat=True))
+        self.assertEqual(kept, {recipes[2].pk, recipes[3].pk})
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_high_fanout_authors_are_merged_on_read(self):
+        self.reader.following.add(self.author)
+        recipe = self._post('Popular Recipe')
+        self.assertFalse(TimelineEntry.objects.filter(user=self.reader).exists())
+        self.assertEqual(self._feed(), [recipe])
+
+    def test_rebuild_timeline(self):
+        self.reader.following.add(self.author)
+        recipe = self._post('Fresh Recipe')
+        TimelineEntry.objects.all().delete()
+        rebuild_timeline(self.reader)
+        self.assertEqual(self._feed(), [recipe])
+
+    @override_settings(TIMELINE_MAX_DEPTH=2)
+    def test_rebuild_all_timelines_matches_per_user_rebuild(self):
+        self.reader.following.add(self.author)
+        self.author.following.add(self.reader)
+        for i in range(3):
+            self._post(f'Recipe {i}')
+        rebuild_timeline(self.reader)
+        rebuild_timeline(self.author)
+        expected = set(TimelineEntry.objects.values_list('user_id', 'recipe_id', 'author_id'))
+
+        self.assertEqual(rebuild_all_timelines(), len(expected))
+        self.assertEqual(set(TimelineEntry.objects.values_list('user_id', 'recipe_id', 'author_id')), expected)
+
+    def test_failed_rebuild_all_timelines_keeps_old_entries(self):
+        self.reader.following.add(self.author)
+        recipe = self._post('Kept Recipe')
+        failing = mock.MagicMock(ops=connection.ops)
+        failing.cursor.return_value.__enter__.return_value.execute.side_effect = DatabaseError
+        with mock.patch('recipes.timeline.connection', failing), self.assertRaises(DatabaseError):
+            rebuild_all_timelines()
+        self.assertEqual(self._feed(), [recipe])
+
+    def _follower_total(self, user):
+        user.refresh_from_db()
+        return user.follower_total
+
+    def test_follower_total_follows_follows(self):
+        self.reader.following.add(self.author)
+        self.author.followers.add(self.author)
+        self.assertEqual(self._follower_total(self.author), 2)
+        self.reader.following.remove(self.author)
+        self.reader.following.remove(self.author)
+        self.assertEqual(self._follower_total(self.author), 1)
+        self.author.followers.clear()
+        self.assertEqual(self._follower_total(self.author), 0)
+
+    def test_full_save_keeps_follower_total(self):
+        stale = User.objects.get(pk=self.author.pk)
+        self.reader.following.add(self.author)
+        stale.bio = 'Updated'
+        stale.save()
+        self.assertEqual(self._follower_total(self.author), 1)
+
+    def test_deleting_a_follower_recounts(self):
+        self.reader.following.add(self.author)
+        self.reader.delete()
+        self.assertEqual(self._follower_total(self.author), 0)
+
+    def test_refresh_follower_totals_repairs_drift(self):
+        self.reader.following.add(self.author)
+        User.objects.update(follower_total=40)
+        refresh_follower_totals()
+        self.assertEqual((self._follower_total(self.author), self._follower_total(self.reader)), (1, 0))
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_high_fanout_authors_come_from_the_follower_total(self):
+        self.reader.following.add(self.author)
+        cache.delete(HIGH_FANOUT_CACHE_KEY)
+        with self.assertNumQueries(1) as queries:
+            self.assertEqual(high_fanout_author_ids(), {self.author.pk})
+        self.assertNotIn('COUNT', queries.captured_queries[0]['sql'])
+
+    def test_trimming_is_queued(self):
+        self.reader.following.add(self.author)
+        with mock.patch('recipes.timeline.enqueue') as enqueue:
+            self._post('Queued Recipe')
+        enqueue.assert_called_once_with('timeline.trim', user_ids=[self.reader.pk])
@@ -0,0 +1,69 @@
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory, TestCase
+
+from recipes.models import Comment, Recipe, RecipeRating, User
+from recipes.viewer_state import ViewerState, viewer_state
+
+
+class ViewerStateTestCase(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='@viewer',
+            email='viewer@example.com',
+            password='Password123',
+            first_name='View',
+            last_name='Er'
+        )
+        self.author = User.objects.create_user(
+            username='@author',
+            email='author@example.com',
+            password='Password123',
+            first_name='Au',
+            last_name='Thor'
+        )
+        self.recipes = [
+            Recipe.objects.create(
+                author=self.author,
+                title=f'Recipe {i}',
+                description='Desc',
+                ingredients='Eggs',
+                instructions='Cook'
+            )
+            for i in range(3)
+        ]
+        self.comment = Comment.objects.create(recipe=self.recipes[0], author=self.author, body='Hi')
+
+    def test_batch_lookups(self):
+        first, second, third = self.recipes
+        self.user.favourites.add(first)
+        second.likes.add(self.user)
+        RecipeRating.objects.create(recipe=third, user=self.user, rating=5)
+        self.comment.likes.add(self.user)
+        self.user.following.add(self.author)
+
+        state = ViewerState(self.user)
+        self.assertEqual(state.favourited(self.recipes), {first.pk})
+        self.assertEqual(state.liked(self.recipes), {second.pk})
+        self.assertEqual(state.ratings(self.recipes), {third.pk: 5})
+        self.assertTrue(state.has_liked_comment(self.comment))
+        self.assertTrue(state.is_following(self.author))
+
+    def test_lookups_are_memoised(self):
+        state = ViewerState(self.user)
+        with self.assertNumQueries(1):
+            state.favourited(self.recipes)
+            state.favourited(self.recipes[:2])
+            self.assertFalse(state.has_favourited(self.recipes[0]))
+
+    def test_anonymous_viewer_never_queries(self):
+        state = ViewerState(AnonymousUser())
+        with self.assertNumQueries(0):
+            self.assertEqual(state.favourited(self.recipes), set())
+            self.assertEqual(state.ratings(self.recipes), {})
+            self.assertFalse(state.is_following(self.author))
+
+    def test_viewer_state_is_shared_within_a_request(self):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        self.assertIs(viewer_state(request), viewer_state(request))
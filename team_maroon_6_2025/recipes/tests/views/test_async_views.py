@@ -0,0 +1,100 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from recipes.models import Category, Comment, Notification, Recipe, RecipeRating, ShoppingListItem, User
+from recipes.tests.helpers import QueryBudgetTesterMixin
+from recipes.views import async_views
+
+
+@override_settings(ROOT_URLCONF='recipify.async_urls')
+class AsyncViewsTestCase(QueryBudgetTesterMixin, TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='@owner',
+            email='owner@example.com',
+            password='Password123',
+            first_name='Owner',
+            last_name='User',
+        )
+        self.viewer = User.objects.create_user(
+            username='@viewer',
+            email='viewer@example.com',
+            password='Password123',
+            first_name='Viewer',
+            last_name='User',
+        )
+        self.category = Category.objects.get(key='breakfast')
+        self.recipe = Recipe.objects.create(
+            author=self.user,
+            title='Pancakes',
+            description='Desc',
+            ingredients='Flour',
+            instructions='Cook',
+        )
+        self.recipe.categories.add(self.category)
+        Comment.objects.create(recipe=self.recipe, author=self.viewer, body='Lovely')
+
+    def test_async_urls_route_read_heavy_pages_to_async_views(self):
+        self.assertIs(self.client.get(reverse('recipe_list')).resolver_match.func, async_views.recipe_list)
+
+    def test_recipe_list(self):
+        self.client.login(username='@viewer', password='Password123')
+        response = self.client.get(reverse('recipe_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([card.pk for card in response.context['feed_recipes']], [self.recipe.pk])
+        self.assertIn(self.category, response.context['categories'])
+        self.assert_within_query_budget(response)
+
+    def test_recipe_detail_shows_comments_and_rating(self):
+        RecipeRating.objects.create(recipe=self.recipe, user=self.viewer, rating=4)
+        self.client.login(username='@viewer', password='Password123')
+        response = self.client.get(reverse('recipe_detail', args=[self.recipe.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['comments']), 1)
+        self.assertEqual(response.context['user_rating'].rating, 4)
+        self.assert_within_query_budget(response)
+
+    def test_recipe_detail_missing_recipe_is_404(self):
+        response = self.client.get(reverse('recipe_detail', args=[self.recipe.pk + 100]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_profile_page_shows_stats(self):
+        self.viewer.following.add(self.user)
+        self.client.login(username='@viewer', password='Password123')
+        response = self.client.get(reverse('profile_page', args=['@owner']))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['profile_stats'], {'recipes': 1, 'followers': 1, 'following': 0})
+        self.assertTrue(response.context['is_following'])
+        self.assert_within_query_budget(response)
+
+    def test_private_profile_requires_follow(self):
+        self.user.is_private = True
+        self.user.save()
+        response = self.client.get(reverse('profile_page', args=['@owner']))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['follow_request_required'])
+
+    def test_shopping_list_only_shown_to_owner(self):
+        ShoppingListItem.objects.create(user=self.user, name='Milk')
+        self.client.login(username='@owner', password='Password123')
+        response = self.client.get(reverse('profile_shopping_list', args=['@owner']))
+        self.assertEqual([item.name for item in response.context['shopping_list_items']], ['Milk'])
+
+    def test_inbox_requires_login(self):
+        response = self.client.get(reverse('inbox'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_inbox(self):
+        Notification.objects.create(recipient=self.user, sender=self.viewer, notification_type='follow')
+        self.client.login(username='@owner', password='Password123')
+        response = self.client.get(reverse('inbox'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['notifications']), 1)
+        self.assert_within_query_budget(response)
+
+    async def test_async_middleware_measures_queries(self):
+        await self.async_client.aforce_login(self.viewer)
+        response = await self.async_client.get(reverse('recipe_detail', args=[self.recipe.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(response.query_metrics.queries, 0)
+        self.assertIn('sql;dur=', response['Server-Timing'])
@@ -34,7 +34,8 @@ class CommentViewsTestCase(TestCase):
         response = self.client.post(url, {'body': 'Nice recipe'})
         self.assertRedirects(response, reverse('recipe_detail', args=[self.recipe.pk]))
         self.assertTrue(Comment.objects.filter(recipe=self.recipe, author=self.commenter).exists())
-        self.assertTrue(Notification.objects.filter(recipient=self.author, sender=self.commenter, notification_type='comment').exists())
+        notification = Notification.objects.get(recipient=self.author, sender=self.commenter, notification_type='comment')
+        self.assertEqual(notification.target_object, self.recipe)
 
     def test_edit_comment_updates_body(self):
         comment = Comment.objects.create(recipe=self.recipe, author=self.commenter, body='Old')
@@ -1,7 +1,11 @@
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from recipes.models import User
+from recipes.models import Recipe, User
+from recipes.views.dashboard_view import DASHBOARD_PAGE_SIZE
 
 
 class DashboardViewTestCase(TestCase):
@@ -25,3 +29,58 @@ class DashboardViewTestCase(TestCase):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'explore.html')
+
+    def test_dashboard_rails_are_bounded(self):
+        cache.clear()
+        self._create_recipes(5)
+        top = Recipe.objects.order_by('id').last()
+        top.favourited_by.add(self.user)
+        self.client.login(username='@dashuser', password='Password123')
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.context['latest_recipes']), 3)
+        self.assertEqual(response.context['featured_recipes'][0], top)
+        self.assertEqual(len(response.context['recipes']), 5)
+
+    def test_dashboard_rails_are_cached_per_ingredient_filter(self):
+        cache.clear()
+        self._create_recipes(2)
+        Recipe.objects.create(
+            author=self.user, title='Peanut Noodles', description='Desc', ingredients='Peanuts', instructions='Cook',
+        )
+        self.client.login(username='@dashuser', password='Password123')
+        response = self.client.get(self.url)
+        self.assertIn('Peanut Noodles', [recipe.title for recipe in response.context['latest_recipes']])
+        response = self.client.get(self.url, {'exclude_ingredient': 'peanut'})
+        self.assertNotIn('Peanut Noodles', [recipe.title for recipe in response.context['latest_recipes']])
+
+    def test_dashboard_main_list_is_paginated(self):
+        cache.clear()
+        self._create_recipes(DASHBOARD_PAGE_SIZE + 2)
+        self.client.login(username='@dashuser', password='Password123')
+        response = self.client.get(self.url)
+        page = response.context['recipes']
+        self.assertEqual(len(page), DASHBOARD_PAGE_SIZE)
+        response = self.client.get(self.url, {'cursor': page.next_cursor})
+        self.assertEqual(len(response.context['recipes']), 2)
+
+    def test_dashboard_query_count_independent_of_recipe_total(self):
+        self.client.login(username='@dashuser', password='Password123')
+        self._create_recipes(DASHBOARD_PAGE_SIZE + 3)
+        cache.clear()
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(self.url)
+        self._create_recipes(30)
+        cache.clear()
+        with CaptureQueriesContext(connection) as large:
+            self.client.get(self.url)
+        self.assertEqual(len(small), len(large))
+
+    def _create_recipes(self, count):
+        for i in range(count):
+            Recipe.objects.create(
+                author=self.user,
+                title=f'Dash Recipe {i}',
+                description='Desc',
+                ingredients='Eggs',
+                instructions='Cook',
+            )
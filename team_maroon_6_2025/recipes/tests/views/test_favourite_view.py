@@ -42,3 +42,12 @@ class FavouriteViewTestCase(TestCase):
         response = self.client.post(self.url, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
         self.assertEqual(response.status_code, 200)
         self.assertFalse(self.user.favourites.filter(pk=self.recipe.pk).exists())
+
+    def test_toggle_favourite_keeps_counter_in_step(self):
+        self.client.login(username='@fan', password='Password123')
+        self.client.post(self.url, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.favourites_total, 1)
+        self.client.post(self.url, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.favourites_total, 0)
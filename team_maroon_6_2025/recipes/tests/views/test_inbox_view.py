@@ -1,7 +1,9 @@
 from django.test import TestCase
 from django.urls import reverse
 
-from recipes.models import Notification, User
+from recipes.models import Comment, Notification, Recipe, User
+from recipes.tests.helpers import QueryBudgetTesterMixin
+from recipes.views.inbox_view import INBOX_PAGE_SIZE
 
 
 class InboxViewTestCase(TestCase):
@@ -37,7 +39,7 @@ class InboxViewTestCase(TestCase):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'inbox.html')
-        self.assertEqual(response.context['notifications'].count(), 1)
+        self.assertEqual(len(response.context['notifications']), 1)
 
     def test_inbox_filtering(self):
         Notification.objects.create(
@@ -52,7 +54,7 @@ class InboxViewTestCase(TestCase):
         )
         self.client.login(username='@recipient', password='Password123')
         response = self.client.get(self.url + '?filter=comment')
-        self.assertEqual(response.context['notifications'].count(), 1)
+        self.assertEqual(len(response.context['notifications']), 1)
 
     def test_delete_notification(self):
         notification = Notification.objects.create(
@@ -82,3 +84,98 @@ class InboxViewTestCase(TestCase):
         response = self.client.post(reverse('delete_notification', args=[notification.pk]))
         self.assertRedirects(response, self.url)
         self.assertTrue(Notification.objects.filter(pk=notification.pk).exists())
+
+
+class InboxBulkOperationsTestCase(TestCase, QueryBudgetTesterMixin):
+    def setUp(self):
+        self.sender = User.objects.create_user(
+            username='@sender',
+            email='sender@example.com',
+            password='Password123',
+            first_name='Send',
+            last_name='Er',
+        )
+        self.recipient = User.objects.create_user(
+            username='@recipient',
+            email='recipient@example.com',
+            password='Password123',
+            first_name='Rec',
+            last_name='Ient',
+        )
+        self.recipe = Recipe.objects.create(
+            author=self.recipient,
+            title='Inbox Recipe',
+            description='Desc',
+            ingredients='Eggs',
+            instructions='Cook',
+        )
+        self.client.login(username='@recipient', password='Password123')
+
+    def _notify(self, notification_type, count=1):
+        for _ in range(count):
+            target = None
+            if notification_type in ('favourite', 'comment'):
+                target = self.recipe
+            Notification.objects.create(
+                recipient=self.recipient,
+                sender=self.sender,
+                notification_type=notification_type,
+                target_object=target,
+            )
+
+    def test_inbox_is_paginated(self):
+        self._notify('follow', INBOX_PAGE_SIZE + 5)
+        response = self.client.get(reverse('inbox'))
+        page = response.context['notifications']
+        self.assertEqual(len(page), INBOX_PAGE_SIZE)
+        self.assertTrue(page.has_next)
+
+        response = self.client.get(reverse('inbox'), {'cursor': page.next_cursor})
+        self.assertEqual(len(response.context['notifications']), 5)
+
+    def test_inbox_stays_within_query_budget(self):
+        self._notify('favourite', 10)
+        self._notify('comment', 10)
+        response = self.client.get(reverse('inbox'))
+        self.assertContains(response, 'Inbox Recipe')
+        self.assert_within_query_budget(response)
+
+    def test_comment_notification_shows_latest_comment(self):
+        Comment.objects.create(recipe=self.recipe, author=self.sender, body='First try')
+        Comment.objects.create(recipe=self.recipe, author=self.sender, body='Made it again, even better')
+        self._notify('comment')
+        response = self.client.get(reverse('inbox'))
+        self.assertContains(response, 'Made it again, even better')
+        self.assertNotContains(response, 'First try')
+
+    def test_mark_all_read(self):
+        self._notify('follow', 3)
+        response = self.client.post(reverse('mark_notifications_read'))
+        self.assertRedirects(response, reverse('inbox'))
+        self.assertFalse(Notification.objects.filter(is_read=False).exists())
+
+    def test_mark_read_keeps_the_filter(self):
+        self._notify('follow')
+        self._notify('comment')
+        response = self.client.post(reverse('mark_notifications_read'), {'filter': 'comment'})
+        self.assertRedirects(response, reverse('inbox') + '?filter=comment')
+        self.assertEqual(Notification.objects.filter(is_read=False).get().notification_type, 'follow')
+
+    def test_delete_all_of_type(self):
+        self._notify('follow', 2)
+        self._notify('comment')
+        response = self.client.post(reverse('delete_notifications_of_type', args=['follow']))
+        self.assertRedirects(response, reverse('inbox') + '?filter=follow')
+        self.assertEqual(list(Notification.objects.values_list('notification_type', flat=True)), ['comment'])
+
+    def test_delete_all_of_unknown_type(self):
+        response = self.client.post(reverse('delete_notifications_of_type', args=['spam']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_unread_count(self):
+        self._notify('follow', 3)
+        response = self.client.get(reverse('unread_notification_count'))
+        self.assertEqual(response.json(), {'unread': 3})
+        self.client.post(reverse('mark_notifications_read'))
+        response = self.client.get(reverse('unread_notification_count'))
+        self.assertEqual(response.json(), {'unread': 0})
@@ -0,0 +1,85 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from recipes import pubsub
+from recipes.models import Notification, User
+
+
+@override_settings(NOTIFICATION_LONG_POLL_SECONDS=0.01, NOTIFICATION_STREAM_MAX_SECONDS=0, NOTIFICATION_STREAM_WSGI=True)
+class NotificationStreamViewTestCase(TestCase):
+
+    def setUp(self):
+        pubsub._load_broker.cache_clear()
+        self.addCleanup(pubsub._load_broker.cache_clear)
+        self.user = User.objects.create_user(
+            username='@streamer', email='streamer@example.com', password='Password123',
+            first_name='Stream', last_name='Er',
+        )
+        self.url = reverse('notification_stream')
+        self.client.login(username='@streamer', password='Password123')
+        self.broker = pubsub.get_broker()
+        self.channel = pubsub.user_channel(self.user.pk)
+
+    def test_requires_login(self):
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertRedirects(response, reverse('log_in') + '?next=' + self.url)
+
+    def test_long_poll_without_cursor_answers_at_once(self):
+        self.broker.publish(self.channel, {'type': 'unread', 'unread': 0})
+        Notification.objects.create(recipient=self.user, sender=self.user, notification_type='follow')
+        response = self.client.get(self.url)
+        self.assertEqual(response.json(), {'cursor': 1, 'unread': 1, 'events': []})
+
+    def test_long_poll_returns_events_after_cursor(self):
+        self.broker.publish(self.channel, {'type': 'unread', 'unread': 4})
+        self.broker.publish(self.channel, {'type': 'unread', 'unread': 5})
+        response = self.client.get(self.url, {'after': 1})
+        self.assertEqual(response.json(), {
+            'cursor': 2, 'unread': 5, 'events': [{'type': 'unread', 'unread': 5}],
+        })
+
+    def test_long_poll_times_out_with_same_cursor(self):
+        response = self.client.get(self.url, {'after': 0})
+        self.assertEqual(response.json(), {'cursor': 0, 'unread': 0, 'events': []})
+
+    def test_unknown_cursor_restarts_from_newest_event(self):
+        response = self.client.get(self.url, {'after': 99})
+        self.assertEqual(response.json()['cursor'], 0)
+
+    def test_event_stream(self):
+        self.broker.publish(self.channel, {'type': 'unread', 'unread': 2})
+        response = self.client.get(self.url, HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        body = b''.join(response.streaming_content).decode()
+        self.assertTrue(body.startswith('retry: 5000\n'))
+        self.assertIn('id: 1\nevent: unread\ndata: {"type": "unread", "unread": 0}\n\n', body)
+
+    def test_event_stream_resumes_from_last_event_id(self):
+        self.broker.publish(self.channel, {'type': 'unread', 'unread': 2})
+        self.broker.publish(self.channel, {'type': 'unread', 'unread': 3})
+        with self.settings(NOTIFICATION_STREAM_MAX_SECONDS=0.05, NOTIFICATION_STREAM_HEARTBEAT=0.01):
+            response = self.client.get(self.url, HTTP_ACCEPT='text/event-stream', HTTP_LAST_EVENT_ID='1')
+            body = b''.join(response.streaming_content).decode()
+        self.assertIn('id: 2\nevent: unread\ndata: {"type": "unread", "unread": 3}\n\n', body)
+        self.assertNotIn('"unread": 2}', body)
+        self.assertIn(': keep-alive\n\n', body)
+
+    def test_navbar_shows_unread_badge(self):
+        Notification.objects.create(recipient=self.user, sender=self.user, notification_type='follow')
+        response = self.client.get(reverse('inbox'))
+        self.assertContains(response, 'id="unread-notification-badge"')
+        self.assertContains(response, f'data-stream-url="{self.url}">1</span>')
+
+    @override_settings(NOTIFICATION_STREAM_WSGI=False, NOTIFICATION_LONG_POLL_SECONDS=5)
+    def test_wsgi_requests_do_not_hold_a_worker(self):
+        self.assertEqual(self.client.get(self.url, HTTP_ACCEPT='text/event-stream').status_code, 204)
+        response = self.client.get(self.url, {'after': 0})
+        self.assertEqual(response.json(), {'cursor': 0, 'unread': 0, 'events': []})
+
+    @override_settings(NOTIFICATION_STREAM_WSGI=False)
+    def test_navbar_polls_unread_count_under_wsgi(self):
+        response = self.client.get(reverse('inbox'))
+        self.assertContains(response, f'data-count-url="{reverse("unread_notification_count")}"')
+        self.assertNotContains(response, 'data-stream-url=')
@@ -0,0 +1,45 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from recipes.models import Recipe, User
+from recipes.tests.helpers import QueryBudgetTesterMixin
+
+
+@override_settings(PANTRY_INDEX_REFRESH_SECONDS=0, PANTRY_INDEX_BACKGROUND=False)
+class PantryViewTestCase(QueryBudgetTesterMixin, TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='@cook',
+            email='cook@example.com',
+            password='Password123',
+            first_name='Home',
+            last_name='Cook',
+        )
+        self.pancakes = Recipe.objects.create(
+            author=self.user, title='Pancakes', description='Desc',
+            ingredients='2 eggs\n200g flour\n300 ml milk\nPinch of salt', instructions='Fry',
+        )
+        self.omelette = Recipe.objects.create(
+            author=self.user, title='Omelette', description='Desc',
+            ingredients='3 eggs\n50g cheese', instructions='Fry',
+        )
+        self.url = reverse('pantry_search')
+
+    def test_empty_pantry_shows_the_form(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.context['searched'])
+
+    def test_ranks_recipes_by_coverage_with_missing_ingredients(self):
+        response = self.client.get(self.url, {'have': 'Eggs, flour, milk'})
+        results = response.context['results']
+        self.assertEqual([result['recipe'] for result in results], [self.pancakes, self.omelette])
+        self.assertEqual(results[0]['missing'], [])
+        self.assertEqual(results[1]['missing'], ['50g cheese'])
+        self.assertContains(response, '3 of 3 ingredients')
+        self.assert_within_query_budget(response)
+
+    def test_complete_only(self):
+        response = self.client.get(self.url, {'have': 'eggs', 'complete': '1'})
+        self.assertEqual(response.context['results'], [])
+        self.assertContains(response, 'No recipes use those ingredients yet.')
@@ -1,9 +1,10 @@
 from django.test import TestCase
 from django.urls import reverse
-from recipes.models import Recipe, User, Category
+from recipes.models import Recipe, RecipeImage, User, Category
+from recipes.tests.helpers import QueryCountTesterMixin
 
 
-class RecipeListViewTestCase(TestCase):
+class RecipeListViewTestCase(TestCase, QueryCountTesterMixin):
 
     def setUp(self):
         self.url = reverse('recipe_list')
@@ -34,6 +35,49 @@ class RecipeListViewTestCase(TestCase):
         response = self.client.get(self.url)
         self.assertContains(response, 'Test Recipe')
 
+    def test_recipe_list_cursor_pagination(self):
+        for i in range(12):
+            Recipe.objects.create(
+                author=self.user,
+                title=f'Paged Recipe {i:02d}',
+                description='A test recipe',
+                ingredients='Ingredients',
+                instructions='Instructions'
+            )
+        response = self.client.get(self.url, {'sort': 'title'})
+        first_page = response.context['feed_recipes']
+        self.assertEqual(len(first_page), 10)
+        self.assertTrue(first_page.has_next)
+
+        response = self.client.get(self.url, {'sort': 'title', 'cursor': first_page.next_cursor})
+        second_page = response.context['feed_recipes']
+        self.assertEqual([r.title for r in second_page], ['Paged Recipe 10', 'Paged Recipe 11'])
+        self.assertFalse(second_page.has_next)
+        self.assertTrue(second_page.has_previous)
+
+    def test_recipe_list_query_count_independent_of_page_size(self):
+        category = Category.objects.create(key='query-count', label='Query Count')
+        self.client.login(username='@testuser', password='Password123')
+
+        def add_recipes(count):
+            for i in range(count):
+                recipe = Recipe.objects.create(
+                    author=self.user,
+                    title=f'Counted Recipe {i}',
+                    description='A test recipe',
+                    ingredients='Ingredients',
+                    instructions='Instructions'
+                )
+                recipe.categories.add(category)
+                RecipeImage.objects.create(recipe=recipe, image='recipes/counted.jpg')
+                self.user.favourites.add(recipe)
+
+        add_recipes(2)
+        self.assert_constant_query_count(
+            lambda: self.client.get(self.url),
+            lambda: add_recipes(8),
+        )
+
 
 class RecipeDetailViewTestCase(TestCase):
 
@@ -245,3 +289,11 @@ class RecipeRateViewTestCase(TestCase):
         response = self.client.post(self.url, {'rating': 4})
         self.assertRedirects(response, reverse('recipe_detail', args=[self.recipe.pk]))
         self.assertEqual(self.recipe.ratings.count(), 1)
+
+    def test_rerating_updates_rating_and_counters(self):
+        self.client.login(username='@rater', password='Password123')
+        self.client.post(self.url, {'rating': 2})
+        self.client.post(self.url, {'rating': 5})
+        self.assertEqual(list(self.recipe.ratings.values_list('rating', flat=True)), [5])
+        self.recipe.refresh_from_db()
+        self.assertEqual((self.recipe.rating_total, self.recipe.rating_sum), (1, 5))
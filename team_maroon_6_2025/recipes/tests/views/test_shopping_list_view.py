@@ -1,4 +1,6 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from recipes.models import Recipe, ShoppingListItem, User
@@ -28,6 +30,38 @@ class ShoppingListViewTestCase(TestCase):
         self.assertRedirects(response, reverse('recipe_detail', args=[self.recipe.pk]))
         self.assertEqual(ShoppingListItem.objects.filter(user=self.user).count(), 2)
 
+    def test_add_recipe_uses_parsed_ingredients(self):
+        self.recipe.ingredients = '3 large eggs\n500 ml milk\nEggs'
+        self.recipe.save()
+        ShoppingListItem.objects.create(user=self.user, name='milk')
+        self.client.login(username='@shopper', password='Password123')
+        self.client.post(reverse('shopping_list_add_recipe', args=[self.recipe.pk]))
+        items = ShoppingListItem.objects.filter(user=self.user).order_by('name')
+        self.assertEqual([(item.name, item.notes) for item in items], [('egg', '3'), ('milk', '')])
+
+    def test_add_recipe_twice_keeps_one_item_per_ingredient(self):
+        self.client.login(username='@shopper', password='Password123')
+        url = reverse('shopping_list_add_recipe', args=[self.recipe.pk])
+        self.client.post(url)
+        self.client.post(url)
+        self.assertEqual(ShoppingListItem.objects.filter(user=self.user).count(), 2)
+
+    def test_add_recipe_is_one_insert(self):
+        self.client.login(username='@shopper', password='Password123')
+        url = reverse('shopping_list_add_recipe', args=[self.recipe.pk])
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(url)
+        inserts = [query for query in queries if query['sql'].startswith('INSERT') and '"recipes_shoppinglistitem"' in query['sql']]
+        self.assertEqual(len(inserts), 1)
+
+    def test_add_existing_item_updates_it(self):
+        ShoppingListItem.objects.create(user=self.user, name='Flour', is_checked=True)
+        self.client.login(username='@shopper', password='Password123')
+        next_url = reverse('profile_shopping_list', kwargs={'username': '@shopper'})
+        self.client.post(reverse('shopping_list_add_item'), {'name': 'Flour', 'notes': '500 g', 'next': next_url})
+        item = ShoppingListItem.objects.get(user=self.user, name='Flour')
+        self.assertEqual((item.notes, item.is_checked), ('500 g', False))
+
     def test_add_item_to_shopping_list(self):
         self.client.login(username='@shopper', password='Password123')
         url = reverse('shopping_list_add_item')
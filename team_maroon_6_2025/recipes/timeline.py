@@ -0,0 +1,197 @@
+"""
+Materialised following feeds (home timelines).
+
+When an author posts, the recipe is copied into a ``TimelineEntry`` for every
+follower (fan-out-on-write), and each timeline is trimmed to
+``TIMELINE_MAX_DEPTH`` entries. Authors with more than
+``TIMELINE_FANOUT_LIMIT`` followers are skipped at write time; their recipes
+are merged in when the feed is read (fan-out-on-read) instead, so one popular
+author cannot trigger millions of inserts. Follower numbers are read from the
+denormalised ``User.follower_total``, which ``recipes.signals`` keeps in step
+with follows, and trimming runs as a separate ``timeline.trim`` task.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value, Window
+from django.db.models.functions import Coalesce, RowNumber
+
+from recipes.models import Recipe, TimelineEntry, User
+from recipes.task_queue import enqueue
+
+HIGH_FANOUT_CACHE_KEY = "timeline:high_fanout_authors"
+HIGH_FANOUT_CACHE_SECONDS = 300
+
+
+def fanout_limit():
+    return getattr(settings, "TIMELINE_FANOUT_LIMIT", 1000)
+
+
+def max_depth():
+    return getattr(settings, "TIMELINE_MAX_DEPTH", 500)
+
+
+def high_fanout_author_ids():
+    """Return the ids of authors whose recipes are merged in at read time."""
+    author_ids = cache.get(HIGH_FANOUT_CACHE_KEY)
+    if author_ids is None:
+        author_ids = set(User.objects.filter(follower_total__gt=fanout_limit()).values_list("id", flat=True))
+        cache.set(HIGH_FANOUT_CACHE_KEY, author_ids, HIGH_FANOUT_CACHE_SECONDS)
+    return author_ids
+
+
+def adjust_follower_totals(user_ids, delta):
+    """Add ``delta`` to the follower counter of each user in ``user_ids``."""
+    User.objects.filter(pk__in=user_ids).update(follower_total=F("follower_total") + delta)
+
+
+def refresh_follower_totals(user_ids=None):
+    """Recompute the follower counter for ``user_ids``, or for every user when None."""
+    followers = (
+        User.following.through.objects.filter(to_user_id=OuterRef("pk"))
+        .order_by()
+        .values("to_user_id")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    users = User.objects.all() if user_ids is None else User.objects.filter(pk__in=user_ids)
+    return users.update(follower_total=Coalesce(Subquery(followers, output_field=IntegerField()), Value(0)))
+
+
+def trim_timelines(user_ids):
+    """Delete everything beyond the newest ``max_depth()`` entries of each timeline."""
+    overflow = (
+        TimelineEntry.objects.filter(user_id__in=user_ids)
+        .annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=[F("user_id")],
+                order_by=[F("created_at").desc(), F("recipe_id").desc()],
+            )
+        )
+        .filter(position__gt=max_depth())
+        .values_list("id", flat=True)
+    )
+    stale_ids = list(overflow)
+    if stale_ids:
+        TimelineEntry.objects.filter(id__in=stale_ids).delete()
+
+
+def fan_out_recipe(recipe):
+    """Push a newly created recipe into its author's followers' timelines."""
+    if recipe.author_id in high_fanout_author_ids():
+        return 0
+    follower_ids = list(
+        User.following.through.objects.filter(to_user_id=recipe.author_id)
+        .values_list("from_user_id", flat=True)[: fanout_limit() + 1]
+    )
+    if not follower_ids or len(follower_ids) > fanout_limit():
+        return 0
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(
+                user_id=follower_id,
+                recipe_id=recipe.pk,
+                author_id=recipe.author_id,
+                created_at=recipe.created_at,
+            )
+            for follower_id in follower_ids
+        ],
+        ignore_conflicts=True,
+    )
+    enqueue("timeline.trim", user_ids=follower_ids)
+    return len(follower_ids)
+
+
+def backfill_timeline(user_id, author_id):
+    """Copy an author's most recent recipes into a new follower's timeline."""
+    if author_id in high_fanout_author_ids():
+        return
+    recent = Recipe.objects.filter(author_id=author_id).order_by("-created_at", "-id")
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user_id=user_id, recipe_id=pk, author_id=author_id, created_at=created_at)
+            for pk, created_at in recent.values_list("id", "created_at")[: max_depth()]
+        ],
+        ignore_conflicts=True,
+    )
+    enqueue("timeline.trim", user_ids=[user_id])
+
+
+def remove_author(user_id, author_id):
+    """Drop an unfollowed author's recipes from a timeline."""
+    TimelineEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+
+def rebuild_timeline(user):
+    """Rebuild a user's timeline from scratch from the authors they follow."""
+    recent = (
+        Recipe.objects.filter(author__followers=user)
+        .exclude(author_id__in=high_fanout_author_ids())
+        .order_by("-created_at", "-id")
+        .values_list("id", "author_id", "created_at")[: max_depth()]
+    )
+    with transaction.atomic():
+        TimelineEntry.objects.filter(user=user).delete()
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(user=user, recipe_id=pk, author_id=author_id, created_at=created_at)
+                for pk, author_id, created_at in recent
+            ]
+        )
+
+
+def rebuild_all_timelines():
+    """
+    Rebuild every timeline from the follow graph with one INSERT ... SELECT.
+
+    Equivalent to ``rebuild_timeline`` for each user, but the entries never
+    leave the database, so bulk imports can rebuild millions of them in
+    seconds. The delete and the insert run in one transaction, so readers never
+    see the timelines empty. Returns the number of entries written.
+    """
+    newest_per_follower = (
+        User.following.through.objects.filter(to_user__recipes__isnull=False)
+        .exclude(to_user_id__in=high_fanout_author_ids())
+        .annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=[F("from_user_id")],
+                order_by=[F("to_user__recipes__created_at").desc(), F("to_user__recipes__id").desc()],
+            )
+        )
+        .filter(position__lte=max_depth())
+        .values_list("from_user_id", "to_user__recipes__id", "to_user_id", "to_user__recipes__created_at")
+    )
+    select_sql, params = newest_per_follower.query.sql_with_params()
+    quote = connection.ops.quote_name
+    columns = ", ".join(
+        quote(TimelineEntry._meta.get_field(name).column) for name in ("user", "recipe", "author", "created_at")
+    )
+    with transaction.atomic(), connection.cursor() as cursor:
+        TimelineEntry.objects.all().delete()
+        cursor.execute(
+            f"INSERT INTO {quote(TimelineEntry._meta.db_table)} ({columns}) "
+            f"SELECT * FROM ({select_sql}) AS newest",
+            params,
+        )
+        return cursor.rowcount
+
+
+def following_feed(user, queryset):
+    """
+    Restrict a recipe queryset to ``user``'s following feed.
+
+    Materialised entries cover normal authors; followed high-fanout authors
+    are merged in directly from the recipe table.
+    """
+    condition = Q(pk__in=TimelineEntry.objects.filter(user=user).values("recipe_id"))
+    high_fanout = high_fanout_author_ids()
+    if high_fanout:
+        followed_high_fanout = list(
+            user.following.filter(pk__in=high_fanout).values_list("pk", flat=True)
+        )
+        if followed_high_fanout:
+            condition |= Q(author_id__in=followed_high_fanout)
+    return queryset.filter(condition)
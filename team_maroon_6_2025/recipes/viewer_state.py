@@ -0,0 +1,100 @@
+"""
+What the current viewer has done to the objects on a page.
+
+Templates used to answer "has this user favourited / liked / rated this?"
+one object at a time, often by loading the user's whole favourites list.
+``ViewerState`` answers those questions for a batch of ids with one indexed
+query per kind of state and remembers the answers, and ``viewer_state``
+keeps one instance per request so views, card builders and templates (via
+the ``viewer`` context variable and the ``viewer_tags`` filters) share it.
+"""
+
+from recipes.models import Comment, Recipe, RecipeRating, User
+
+
+def _ids(objects):
+    return {getattr(obj, "pk", obj) for obj in objects}
+
+
+class ViewerState:
+    """
+    Bulk, memoised lookups of one user's favourites, likes, ratings and follows.
+
+    Every lookup takes objects or ids, queries only the ids it has not seen
+    yet and returns the matching subset (or ``{id: rating}`` for ratings).
+    An anonymous viewer never queries and always gets empty answers.
+
+    Attributes:
+        user (User): The viewer the state belongs to.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._known = {}
+
+    @property
+    def is_authenticated(self):
+        return self.user is not None and self.user.is_authenticated
+
+    def _lookup(self, kind, objects, load):
+        known = self._known.setdefault(kind, {})
+        wanted = _ids(objects)
+        missing = wanted - known.keys()
+        if missing and self.is_authenticated:
+            found = load(missing)
+            for pk in missing:
+                known[pk] = found.get(pk)
+        return {pk: known[pk] for pk in wanted if known.get(pk) is not None}
+
+    def favourited(self, recipes):
+        return set(self._lookup("favourited", recipes, lambda ids: dict.fromkeys(
+            User.favourites.through.objects.filter(user_id=self.user.pk, recipe_id__in=ids)
+            .values_list("recipe_id", flat=True), True
+        )))
+
+    def liked(self, recipes):
+        return set(self._lookup("liked", recipes, lambda ids: dict.fromkeys(
+            Recipe.likes.through.objects.filter(user_id=self.user.pk, recipe_id__in=ids)
+            .values_list("recipe_id", flat=True), True
+        )))
+
+    def ratings(self, recipes):
+        return self._lookup("ratings", recipes, lambda ids: dict(
+            RecipeRating.objects.filter(user_id=self.user.pk, recipe_id__in=ids)
+            .values_list("recipe_id", "rating")
+        ))
+
+    def liked_comments(self, comments):
+        return set(self._lookup("liked_comments", comments, lambda ids: dict.fromkeys(
+            Comment.likes.through.objects.filter(user_id=self.user.pk, comment_id__in=ids)
+            .values_list("comment_id", flat=True), True
+        )))
+
+    def following(self, users):
+        return set(self._lookup("following", users, lambda ids: dict.fromkeys(
+            User.following.through.objects.filter(from_user_id=self.user.pk, to_user_id__in=ids)
+            .values_list("to_user_id", flat=True), True
+        )))
+
+    def has_favourited(self, recipe):
+        return bool(self.favourited([recipe]))
+
+    def has_liked(self, recipe):
+        return bool(self.liked([recipe]))
+
+    def rating_for(self, recipe):
+        return self.ratings([recipe]).get(getattr(recipe, "pk", recipe))
+
+    def has_liked_comment(self, comment):
+        return bool(self.liked_comments([comment]))
+
+    def is_following(self, user):
+        return bool(self.following([user]))
+
+
+def viewer_state(request):
+    """Return the ``ViewerState`` for ``request.user``, creating it once per request."""
+    state = getattr(request, "_viewer_state", None)
+    if state is None or state.user is not request.user:
+        state = request._viewer_state = ViewerState(request.user)
+    return state
@@ -0,0 +1,133 @@
+"""
+Async variants of the read-heavy pages, served when running under ASGI.
+
+``recipify.async_urls`` routes ``recipe_list``, ``recipe_detail``,
+``profile_page`` and ``inbox`` here instead of to their sync views; it is
+the ``ROOT_URLCONF`` whenever ``ASYNC_VIEWS`` is on, which the ASGI entry
+point does by default. These are not async ORM views: each one calls its
+sync counterpart's helpers through ``sync_to_async`` and
+``recipes.concurrency.gather``, so both render the same pages from the same
+queries. Nothing blocks the event loop, but every hop costs a thread
+switch, and independent queries (the stats on a profile) only run at the
+same time when ``ASYNC_CONCURRENT_QUERIES`` is on. Under ASGI these views
+mostly save the event loop from waiting on sync views, not query time.
+"""
+
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import aget_object_or_404, render
+from django.urls import URLPattern
+
+from recipes.category_registry import get_registry
+from recipes.concurrency import gather, load_user
+from recipes.models import Recipe, User
+from recipes.pagination import paginate_by_cursor
+from recipes.views.inbox_view import _inbox_context
+from recipes.views.profile_page_view import (
+    _locked_profile_context,
+    _profile_context,
+    _profile_recipes,
+    _profile_relation,
+    _profile_stat_queries,
+    _shopping_list_items,
+    _visible_section,
+)
+from recipes.views.recipe_view import (
+    _following_page,
+    _recipe_detail_context,
+    _recipe_feed,
+    _recipe_list_context,
+    _user_rating,
+)
+
+
+def _render_page(request, template_name, build_context, *args):
+    return render(request, template_name, build_context(*args))
+
+
+# Context building and rendering may still query (cards, context processors),
+# so both happen off the event loop in one hop
+render_page = sync_to_async(_render_page)
+
+
+async def recipe_list(request):
+    """Async ``recipe_list``: the main feed, the following feed and the categories load together."""
+    user = await load_user(request)
+    sort, ordering, recipes_qs = await sync_to_async(_recipe_feed)(request)
+    feed_recipes, following_recipes, registry = await gather(
+        partial(paginate_by_cursor, request, recipes_qs, ordering),
+        partial(_following_page, request, user, recipes_qs, ordering),
+        get_registry,
+    )
+    return await render_page(
+        request, "recipes/recipe_list.html", _recipe_list_context,
+        request, sort, feed_recipes, following_recipes, registry.all,
+    )
+
+
+async def recipe_detail(request, pk):
+    """Async ``recipe_detail``: the comments and the viewer's rating load together."""
+    user = await load_user(request)
+    recipe = await aget_object_or_404(Recipe.objects.select_related("author"), pk=pk)
+    comments, user_rating = await gather(
+        partial(list, recipe.comments.select_related("author")),
+        partial(_user_rating, recipe, user),
+    )
+    return await render_page(
+        request, "recipes/recipe_detail.html", _recipe_detail_context, request, recipe, comments, user_rating
+    )
+
+
+async def profile_page(request, username, section="posted_recipes"):
+    """Async ``profile_page``: the viewer's relation to the profile and the header stats load together."""
+    user = await load_user(request)
+    profile_user = await aget_object_or_404(User, username=username)
+    stat_queries = _profile_stat_queries(profile_user)
+    relation, *counts = await gather(
+        partial(_profile_relation, request, user, profile_user),
+        *stat_queries.values(),
+    )
+    stats = dict(zip(stat_queries, counts))
+
+    if relation["follow_request_required"]:
+        return await render_page(
+            request, "users/profile_page.html", _locked_profile_context, profile_user, relation, stats
+        )
+
+    section = _visible_section(section, relation)
+    user_recipes, shopping_list_items = await gather(
+        partial(_profile_recipes, request, profile_user, section),
+        partial(_shopping_list_items, profile_user, section),
+    )
+    return await render_page(
+        request, "users/profile_page.html", _profile_context,
+        profile_user, relation, stats, section, user_recipes, shopping_list_items,
+    )
+
+
+@login_required
+async def inbox(request):
+    """Async ``inbox``: the page of notifications loads off the event loop."""
+    user = await load_user(request)
+    return await render_page(request, "inbox.html", _inbox_context, request, user)
+
+
+ASYNC_VIEWS = {
+    "recipe_list": recipe_list,
+    "recipe_detail": recipe_detail,
+    "profile_page": profile_page,
+    "profile_favourites": profile_page,
+    "profile_shopping_list": profile_page,
+    "inbox": inbox,
+}
+
+
+def swap_views(urlpatterns):
+    """Return ``urlpatterns`` with the routes named in ``ASYNC_VIEWS`` pointing at the async variants."""
+    return [
+        URLPattern(pattern.pattern, ASYNC_VIEWS[pattern.name], pattern.default_args, pattern.name)
+        if isinstance(pattern, URLPattern) and pattern.name in ASYNC_VIEWS else pattern
+        for pattern in urlpatterns
+    ]
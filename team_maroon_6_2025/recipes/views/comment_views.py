@@ -1,12 +1,15 @@
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
 
 from recipes.forms import CommentForm
-from recipes.models import Comment, Recipe, Notification
+from recipes.models import Comment, Recipe
+from recipes.notifications import notify
 
 @login_required
+@transaction.atomic
 def add_comment(request, pk):
     """
     Add a new comment to a recipe and create a notification for the recipe author
@@ -22,12 +25,7 @@ def add_comment(request, pk):
             comment.author = request.user
             comment.save()
             messages.success(request, "Comment posted.")
-            Notification.objects.create(
-                recipient=recipe.author,
-                sender=request.user,
-                target_object=comment,
-                notification_type='comment'
-            )
+            notify(recipe.author, request.user, 'comment', target=recipe)
 
     return redirect(request.POST.get("next") or reverse("recipe_detail", args=[pk]))
 
@@ -56,7 +54,7 @@ def toggle_comment_like(request, comment_id):
     Toggle like status on a comment
     """
     comment = get_object_or_404(Comment, pk=comment_id)
-    if comment.likes.filter(pk=request.user.pk).exists():
+    if Comment.likes.through.objects.filter(comment=comment, user=request.user).exists():
         comment.likes.remove(request.user)
         messages.info(request, "Comment unliked.")
     else:
@@ -2,11 +2,25 @@ import math
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render
 
-from recipes.helpers import RECIPE_ORDERING, base_recipe_queryset, attach_user_ratings
-from recipes.models import Category
+from recipes.cards import build_card_lists
+from recipes.helpers import (
+    RECIPE_ORDERING,
+    base_recipe_queryset,
+    filter_cache_key,
+    recipe_rails,
+)
+from recipes.category_registry import get_registry
+from recipes.pagination import paginate_by_cursor
 from recipes.search_filters import filter_recipes
+from recipes.viewer_state import viewer_state
 
+DASHBOARD_PAGE_SIZE = 12
 
+DASHBOARD_RAILS = {
+    "top_rated_recipes": RECIPE_ORDERING["rating"],
+    "latest_recipes": RECIPE_ORDERING["newest"],
+    "featured_recipes": RECIPE_ORDERING["favourites"],
+}
 
 @login_required
 def dashboard(request):
@@ -15,26 +29,27 @@ def dashboard(request):
     This view renders the dashboard page for the authenticated user.
     It ensures that only logged-in users can access the page. If a user
     is not authenticated, they are automatically redirected to the login
-    page.
+    page. The main list is one cursor page, and the three rails share a
+    cached ranking, so the page cost does not depend on the recipe count.
     """
 
     current_user = request.user
 
-    recipes_qs = filter_recipes(request, base_recipe_queryset(include_comments=True))
+    recipes_qs = filter_recipes(request, base_recipe_queryset(include_categories=False))
 
     sort = request.GET.get("sort", "newest")
     ordering = RECIPE_ORDERING.get(sort, ("-created_at",))
-    recipes = list(recipes_qs.order_by(*ordering))
+    recipes = paginate_by_cursor(request, recipes_qs, ordering, per_page=DASHBOARD_PAGE_SIZE)
 
-    attach_user_ratings(recipes, current_user)
-
-    top_rated_recipes = list(
-        recipes_qs.order_by("-rating_avg", "-rating_total", "-created_at")[:3]
+    rails = recipe_rails(
+        recipes_qs,
+        DASHBOARD_RAILS,
+        cache_key=filter_cache_key("dashboard_rails", request),
     )
-    latest_recipes = list(recipes_qs.order_by("-created_at")[:3])
-    featured_recipes = list(recipes_qs.order_by("-favourites_total", "-created_at")[:3])
+    recipes.object_list, *rail_cards = build_card_lists([recipes, *rails.values()], viewer_state(request))
+    rails = dict(zip(rails, rail_cards))
 
-    categories = list(Category.objects.order_by("label"))
+    categories = get_registry().all
     column_size = max(1, math.ceil(len(categories) / 3))
     category_columns = [
         categories[i : i + column_size] for i in range(0, len(categories), column_size)
@@ -50,9 +65,9 @@ def dashboard(request):
             "active_sort": sort,
             "categories": categories,
             "category_columns": category_columns,
-            "top_rated_recipes": top_rated_recipes,
-            "latest_recipes": latest_recipes,
-            "featured_recipes": featured_recipes,
+            "top_rated_recipes": rails["top_rated_recipes"],
+            "latest_recipes": rails["latest_recipes"],
+            "featured_recipes": rails["featured_recipes"],
             "hero_title": "Recipes",
             "hero_body": (
                 "We've organized these recipes every way we could think of so you "
@@ -1,32 +1,35 @@
+from django.db.models import Count
 from django.shortcuts import render
-from recipes.models import Category
-from recipes.helpers import base_recipe_queryset 
+from recipes.models import Recipe, RecipeRanking
+from recipes.cards import build_card_lists
+from recipes.helpers import base_recipe_queryset
+from recipes.rankings import ranked_recipes
+from recipes.viewer_state import viewer_state
 
 def explore(request):
     """
     Display the explore page with trending, new, and personalised recipes
+    Trending and "for you" rails are read from the precomputed rankings
+    written by the `compute_rankings` command
     """
-    base_qs = base_recipe_queryset(include_images=True)
-
-    trending = list(base_qs.order_by("-favourites_total", "-rating_avg", "-created_at")[:6])
-    new_recipes = list(base_qs.order_by("-created_at")[:6])
+    trending = ranked_recipes(RecipeRanking.TRENDING)
+    new_recipes = list(base_recipe_queryset(include_categories=False).order_by("-created_at")[:6])
 
     for_you = trending
     if request.user.is_authenticated:
-        # Top categories from favourites, likes, and views
+        # Top categories from the user's favourites
         top_category_ids = list(
-            Category.objects.filter(
-                recipes__in=request.user.favourites.all()
-            ).values_list("id", flat=True)
+            Recipe.categories.through.objects.filter(recipe__favourited_by=request.user)
+            .values("category_id")
+            .annotate(total=Count("id"))
+            .order_by("-total")
+            .values_list("category_id", flat=True)[:3]
         )
-        top_category_ids = list(dict.fromkeys(top_category_ids))[:3]  
 
         if top_category_ids:
-            for_you = list(
-                base_qs.filter(categories__id__in=top_category_ids)
-                .order_by("-favourites_total", "-created_at")
-                .distinct()[:6]
-            ) or trending
+            for_you = ranked_recipes(RecipeRanking.CATEGORY, category_ids=top_category_ids) or trending
+
+    trending, new_recipes, for_you = build_card_lists([trending, new_recipes, for_you], viewer_state(request))
 
     context = {
         "hero": trending[0] if trending else None,
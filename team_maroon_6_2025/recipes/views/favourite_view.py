@@ -1,45 +1,41 @@
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
 
-from recipes.models import Recipe
-from recipes.models.notification import Notification
+from recipes.counters import refresh_favourites_totals
+from recipes.models import Recipe, User
+from recipes.notifications import notify, withdraw
 
 @login_required
+@transaction.atomic
 def toggle_favourite(request, pk):
     """
     Toggle a recipe's favourite status for the authenticated user
     Adds or removes a recipe from the user's favourites colletion
+    The row is deleted if present, otherwise inserted with ON CONFLICT DO NOTHING,
+    so a double submit cannot fail or double count. Neither statement sends
+    m2m_changed, so the favourite counter is recounted here.
     """
     recipe = get_object_or_404(Recipe, pk=pk)
+    Favourite = User.favourites.through
 
-    if recipe in request.user.favourites.all():
-        request.user.favourites.remove(recipe)
+    removed, _ = Favourite.objects.filter(user=request.user, recipe=recipe).delete()
+    if removed:
         is_favourited = False
         message_text = f"Removed '{recipe.title}' from favourites."
         message_tag = "info"
-        Notification.objects.filter(
-            recipient=recipe.author,
-            sender=request.user,
-            content_type=ContentType.objects.get_for_model(Recipe),
-            object_id=recipe.pk,
-            notification_type='favourite'
-        ).delete()
+        withdraw(recipe.author, request.user, 'favourite', target=recipe)
     else:
-        request.user.favourites.add(recipe)
+        Favourite.objects.bulk_create([Favourite(user=request.user, recipe=recipe)], ignore_conflicts=True)
         is_favourited = True
         message_text = f"Added '{recipe.title}' to favourites."
         message_tag = "success"
         if recipe.author != request.user:
-            Notification.objects.create(
-                recipient=recipe.author,
-                sender=request.user,
-                target_object=recipe,
-                notification_type='favourite'
-            )
+            notify(recipe.author, request.user, 'favourite', target=recipe)
+    refresh_favourites_totals([recipe.pk])
 
     if request.headers.get('x-requested-with') == 'XMLHttpRequest' or request.content_type == 'application/json':
         return JsonResponse({'is_favourited': is_favourited,
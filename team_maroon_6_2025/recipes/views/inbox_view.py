@@ -1,35 +1,67 @@
 from django.contrib.auth.decorators import login_required
+from django.contrib.contenttypes.prefetch import GenericPrefetch
+from django.db.models import Case, OuterRef, Subquery, When
+from django.http import Http404, JsonResponse
 from django.shortcuts import render, get_object_or_404, redirect
-from django.views.decorators.http import require_POST
+from django.urls import reverse
+from django.views.decorators.http import require_GET, require_POST
+from recipes import notifications as notification_service
+from recipes.models import Comment, Recipe
 from recipes.models.notification import Notification
+from recipes.pagination import paginate_by_cursor
+
+INBOX_PAGE_SIZE = 20
+
+NOTIFICATION_TYPES = {value for value, _ in Notification.TYPES}
+
+def _inbox_url(filter_type):
+    url = reverse('inbox')
+    return f"{url}?filter={filter_type}" if filter_type in NOTIFICATION_TYPES else url
 
 @login_required
 def inbox(request):
     """
     Display the user's notification inbox with optional filtering
+
+    The inbox is keyset-paginated, newest first, and the recipes the
+    notifications of each page point at are fetched with one query rather
+    than one per notification. Coalesced notifications
+    show their other recent actors, loaded in one further query. Comment
+    notifications carry the latest sender's newest comment on the recipe,
+    read by a subquery in the page query.
     """
+    return render(request, 'inbox.html', _inbox_context(request, request.user))
+
+# Comment notifications target the recipe, so the text shown comes from the
+# sender's newest comment on it
+def _latest_comment():
+    comments = Comment.objects.filter(
+        recipe_id=OuterRef('object_id'), author_id=OuterRef('sender_id')
+    ).order_by('-created_at').values('body')[:1]
+    return Case(When(notification_type='comment', then=Subquery(comments)))
+
+def _inbox_context(request, user):
     notifications = Notification.objects.filter(
-        recipient=request.user
-    ).select_related('sender', 'content_type')
+        recipient=user
+    ).select_related('sender', 'content_type').prefetch_related(
+        GenericPrefetch('target_object', [Recipe.objects.all()])
+    ).annotate(latest_comment=_latest_comment())
 
     filter_type = request.GET.get('filter', 'all')
 
-    match filter_type:
-        case 'favourite':
-            notifications = notifications.filter(notification_type='favourite')
-        case 'comment':
-            notifications = notifications.filter(notification_type='comment')
-        case 'follow':
-            notifications = notifications.filter(notification_type='follow')
-        case 'request':
-            notifications = notifications.filter(notification_type='request')
-
-    context = {
-        'notifications': notifications,
-        'current_filter': filter_type
-    }
+    if filter_type in NOTIFICATION_TYPES:
+        notifications = notifications.filter(notification_type=filter_type)
+    else:
+        filter_type = 'all'
 
-    return render(request, 'inbox.html', context)
+    page = paginate_by_cursor(request, notifications, ('-created_at',), per_page=INBOX_PAGE_SIZE)
+    notification_service.attach_actors(page)
+
+    return {
+        'notifications': page,
+        'current_filter': filter_type,
+        'unread_total': user.unread_notification_total,
+    }
 
 @login_required
 @require_POST
@@ -41,6 +73,34 @@ def delete_notification(request, pk):
     notification = get_object_or_404(Notification, pk=pk)
 
     if notification.recipient == request.user:
-        notification.delete()
+        notification_service.delete_notification(notification)
 
     return redirect('inbox')
+
+@login_required
+@require_POST
+def mark_notifications_read(request):
+    """
+    Mark every unread notification as read, or only those of the
+    type given in the ``filter`` field
+    """
+    filter_type = request.POST.get('filter')
+    notification_service.mark_all_read(
+        request.user, filter_type if filter_type in NOTIFICATION_TYPES else None
+    )
+    return redirect(_inbox_url(filter_type))
+
+@login_required
+@require_POST
+def delete_notifications_of_type(request, notification_type):
+    """Delete every notification of one type from the user's inbox"""
+    if notification_type not in NOTIFICATION_TYPES:
+        raise Http404("Unknown notification type")
+    notification_service.delete_all_of_type(request.user, notification_type)
+    return redirect(_inbox_url(notification_type))
+
+@login_required
+@require_GET
+def unread_notification_count(request):
+    """Return the user's unread notification count as JSON, read from the stored counter"""
+    return JsonResponse({'unread': notification_service.unread_count(request.user)})
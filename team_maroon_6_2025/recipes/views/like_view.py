@@ -12,7 +12,7 @@ def toggle_like(request, pk):
     """
     recipe = get_object_or_404(Recipe, pk=pk)
 
-    if recipe.likes.filter(pk=request.user.pk).exists():
+    if Recipe.likes.through.objects.filter(recipe=recipe, user=request.user).exists():
         recipe.likes.remove(request.user)
         messages.info(request, f"You unliked '{recipe.title}'.")
     else:
@@ -0,0 +1,105 @@
+import json
+import time
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from recipes.pubsub import get_broker, stream_enabled, user_channel
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+def _sse(event_id, event):
+    return f"id: {event_id}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+def _start_after(broker, channel, value):
+    """
+    Return the event id to stream from: ``value`` when the broker still knows
+    it, else the channel's newest event (its ids restart with the process or cache)
+    """
+    last_id = broker.last_id(channel)
+    try:
+        after_id = int(value)
+    except (TypeError, ValueError):
+        return last_id
+    return after_id if 0 <= after_id <= last_id else last_id
+
+def _event_stream(broker, channel, after_id, unread):
+    """Yield Server-Sent Events until ``NOTIFICATION_STREAM_MAX_SECONDS`` have passed."""
+    yield f"retry: {_setting('NOTIFICATION_STREAM_RETRY_MS', 5000)}\n"
+    yield _sse(after_id, {"type": "unread", "unread": unread})
+    heartbeat = _setting('NOTIFICATION_STREAM_HEARTBEAT', 15)
+    deadline = time.monotonic() + _setting('NOTIFICATION_STREAM_MAX_SECONDS', 300)
+    while time.monotonic() < deadline:
+        events = broker.wait(channel, after_id, min(heartbeat, max(deadline - time.monotonic(), 0)))
+        for after_id, event in events:
+            yield _sse(after_id, event)
+        if not events:
+            yield ": keep-alive\n\n"
+
+async def _async_event_stream(broker, channel, after_id, unread):
+    """As ``_event_stream``, waiting on the event loop instead of holding a thread."""
+    yield f"retry: {_setting('NOTIFICATION_STREAM_RETRY_MS', 5000)}\n"
+    yield _sse(after_id, {"type": "unread", "unread": unread})
+    heartbeat = _setting('NOTIFICATION_STREAM_HEARTBEAT', 15)
+    deadline = time.monotonic() + _setting('NOTIFICATION_STREAM_MAX_SECONDS', 300)
+    while time.monotonic() < deadline:
+        events = await broker.wait_async(channel, after_id, min(heartbeat, max(deadline - time.monotonic(), 0)))
+        for after_id, event in events:
+            yield _sse(after_id, event)
+        if not events:
+            yield ": keep-alive\n\n"
+
+@login_required
+@require_GET
+def notification_stream(request):
+    """
+    Push the user's unread count and new notifications as they happen.
+
+    Browsers that send ``Accept: text/event-stream`` (``EventSource``) get a
+    Server-Sent Events stream, which closes after
+    ``NOTIFICATION_STREAM_MAX_SECONDS`` and is resumed by the browser from
+    ``Last-Event-ID``. Under ASGI the stream waits on the event loop.
+
+    Other clients long-poll: ``?after=<cursor>`` waits up to
+    ``NOTIFICATION_LONG_POLL_SECONDS`` for events after the cursor of the
+    previous response. Without ``after`` it answers at once with the current
+    count and a cursor to poll from.
+
+    Under WSGI both would hold a worker thread, so unless
+    ``NOTIFICATION_STREAM_WSGI`` is set the stream answers 204, which stops
+    ``EventSource`` reconnecting, and long polls answer at once.
+    """
+    broker = get_broker()
+    channel = user_channel(request.user.pk)
+    unread = request.user.unread_notification_total
+    streaming = stream_enabled(request)
+
+    if 'text/event-stream' in request.headers.get('Accept', ''):
+        if not streaming:
+            return HttpResponse(status=204)
+        after_id = _start_after(broker, channel, request.headers.get('Last-Event-ID', request.GET.get('after')))
+        stream = _async_event_stream if isinstance(request, ASGIRequest) else _event_stream
+        response = StreamingHttpResponse(
+            stream(broker, channel, after_id, unread), content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        # Stop nginx from buffering the stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    events = []
+    after_id = _start_after(broker, channel, request.GET.get('after'))
+    if 'after' in request.GET and streaming:
+        events = broker.wait(channel, after_id, _setting('NOTIFICATION_LONG_POLL_SECONDS', 25))
+    for event_id, event in events:
+        after_id = event_id
+        unread = event.get('unread', unread)
+    return JsonResponse({
+        'cursor': after_id,
+        'unread': unread,
+        'events': [event for _, event in events],
+    }, headers={'Cache-Control': 'no-cache'})
@@ -0,0 +1,47 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.shortcuts import render
+
+from recipes import pantry
+from recipes.ingredients import split_names
+from recipes.models import Recipe, RecipeIngredient
+
+def pantry_search(request):
+    """
+    Show the recipes the user can cook from the ingredients they have
+
+    The pantry is given as comma-separated ``have`` values. Recipes are ranked
+    in memory by ``recipes.pantry`` on the share of their ingredients the pantry
+    covers; the page then loads the shown recipes and the ingredients each is
+    missing in two queries. ``complete=1`` keeps only recipes with nothing missing.
+    """
+    names = split_names(request.GET.getlist("have"))
+    complete_only = request.GET.get("complete") == "1"
+    results = []
+    if names:
+        limit = getattr(settings, "PANTRY_RESULT_LIMIT", 24)
+        matches = pantry.search(names, limit=limit, complete_only=complete_only)
+        results = _pantry_results(matches, names)
+
+    return render(request, "recipes/pantry.html", {
+        "pantry": ", ".join(names),
+        "complete_only": complete_only,
+        "searched": bool(names),
+        "results": results,
+    })
+
+def _pantry_results(matches, names):
+    recipe_ids = [match.recipe_id for match in matches]
+    recipes = Recipe.objects.select_related("author").in_bulk(recipe_ids)
+    covered = set().union(*(pantry.get_index().expand(name) for name in names), pantry.staples())
+    missing = defaultdict(list)
+    rows = RecipeIngredient.objects.filter(recipe_id__in=recipe_ids).exclude(name__in=covered)
+    for recipe_id, raw in rows.values_list("recipe_id", "raw"):
+        missing[recipe_id].append(raw)
+    # Recipes deleted since the index was built are skipped
+    return [
+        {"recipe": recipes[match.recipe_id], "match": match, "missing": missing[match.recipe_id]}
+        for match in matches
+        if match.recipe_id in recipes
+    ]
@@ -1,10 +1,13 @@
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import get_object_or_404, redirect, render
 
+from recipes.cards import build_recipe_cards
 from recipes.forms import ShoppingListItemForm
 from recipes.models import FollowRequest, User
-from recipes.models.notification import Notification
+from recipes.notifications import notify, withdraw
+from recipes.pagination import paginate_by_cursor
 from recipes.search_filters import filter_recipes
+from recipes.viewer_state import viewer_state
 
 def profile_page(request, username, section="posted_recipes"):
     """
@@ -12,15 +15,30 @@ def profile_page(request, username, section="posted_recipes"):
     For private accounts, it restricts content visibility to followers and the profile owner
     """
     profile_user = get_object_or_404(User, username=username)
+    relation = _profile_relation(request, request.user, profile_user)
+    stats = {name: count() for name, count in _profile_stat_queries(profile_user).items()}
+
+    if relation["follow_request_required"]:
+        return render(request, "users/profile_page.html", _locked_profile_context(profile_user, relation, stats))
+
+    section = _visible_section(section, relation)
+    user_recipes = _profile_recipes(request, profile_user, section)
+    shopping_list_items = _shopping_list_items(profile_user, section)
+    return render(
+        request,
+        "users/profile_page.html",
+        _profile_context(profile_user, relation, stats, section, user_recipes, shopping_list_items),
+    )
 
-    current_user = request.user
+def _profile_relation(request, current_user, profile_user):
+    """How the viewer relates to the profile: following, own profile, pending requests either way"""
     is_following = False
     is_me = False
     follow_request_sent = False
     follow_request_received = False
 
     if current_user.is_authenticated:
-        is_following = current_user.following.filter(id=profile_user.id).exists()
+        is_following = viewer_state(request).is_following(profile_user)
         is_me = current_user == profile_user
 
         if profile_user.is_private and not is_following and not is_me:
@@ -35,51 +53,68 @@ def profile_page(request, username, section="posted_recipes"):
                 requested_user=current_user,
             ).exists()
 
-    if profile_user.is_private and not is_me and not is_following:
-        return render(
-            request,
-            "users/profile_page.html",
-            {
-                "profile_user": profile_user,
-                "follow_request_required": True,
-                "is_following": is_following,
-                "request_sent": follow_request_sent,
-                "request_received": follow_request_received,
-            },
-        )
-
-    base_prefetch = ["images", "likes", "comments", "comments__author", "categories"]
-    can_view_interests = is_following or is_me
+    return {
+        "is_following": is_following,
+        "is_me": is_me,
+        "request_sent": follow_request_sent,
+        "request_received": follow_request_received,
+        "follow_request_required": profile_user.is_private and not is_me and not is_following,
+    }
+
+# The counts in the profile header, as independent queries
+def _profile_stat_queries(profile_user):
+    return {
+        "recipes": profile_user.recipes.count,
+        "followers": profile_user.followers.count,
+        "following": profile_user.following.count,
+    }
+
+def _locked_profile_context(profile_user, relation, stats):
+    return {
+        "profile_user": profile_user,
+        "profile_stats": stats,
+        "follow_request_required": True,
+        "is_following": relation["is_following"],
+        "request_sent": relation["request_sent"],
+        "request_received": relation["request_received"],
+    }
+
+def _visible_section(section, relation):
+    can_view_interests = relation["is_following"] or relation["is_me"]
     if not can_view_interests:
-        section = "posted_recipes"
+        return "posted_recipes"
+    if section == "shopping_list" and not relation["is_me"]:
+        return "posted_recipes"
+    return section
 
+def _profile_recipes(request, profile_user, section):
     if section == "favourite_recipes":
-        user_recipes = profile_user.favourites.prefetch_related(*base_prefetch).order_by("-created_at")
+        user_recipes = profile_user.favourites.select_related("author")
     else:
-        user_recipes = profile_user.recipes.prefetch_related(*base_prefetch).order_by("-created_at")
+        user_recipes = profile_user.recipes.select_related("author")
 
-    user_recipes = filter_recipes(request, user_recipes)
+    user_recipes = paginate_by_cursor(request, filter_recipes(request, user_recipes), ("-created_at",))
+    user_recipes.object_list = build_recipe_cards(user_recipes, viewer_state(request))
+    return user_recipes
 
-    shopping_list_items = None
-    shopping_form = ShoppingListItemForm()
-    if section == "shopping_list":
-        if is_me:
-            shopping_list_items = profile_user.shopping_list_items.order_by("is_checked", "name")
-        else:
-            section = "posted_recipes"
+def _shopping_list_items(profile_user, section):
+    if section != "shopping_list":
+        return None
+    return list(profile_user.shopping_list_items.order_by("is_checked", "name"))
 
-    context = {
+def _profile_context(profile_user, relation, stats, section, user_recipes, shopping_list_items):
+    return {
         "profile_user": profile_user,
+        "profile_stats": stats,
         "user_recipes": user_recipes,
-        "is_following": is_following,
+        "is_following": relation["is_following"],
         "current_section": section,
         "follow_request_required": False,
-        "request_sent": follow_request_sent,
-        "request_received": follow_request_received,
+        "request_sent": relation["request_sent"],
+        "request_received": relation["request_received"],
         "shopping_list_items": shopping_list_items,
-        "shopping_form": shopping_form,
+        "shopping_form": ShoppingListItemForm(),
     }
-    return render(request, "users/profile_page.html", context)
 
 @login_required
 def follow_toggle(request, username):
@@ -92,7 +127,9 @@ def follow_toggle(request, username):
     if following_user == user_to_follow:
         return redirect("profile_page", username=username)
 
-    is_following = following_user.following.filter(id=user_to_follow.id).exists()
+    is_following = User.following.through.objects.filter(
+        from_user=following_user, to_user=user_to_follow
+    ).exists()
 
     if is_following:
         following_user.following.remove(user_to_follow)
@@ -102,28 +139,16 @@ def follow_toggle(request, username):
 
     if pending_request:
         pending_request.delete()
-        Notification.objects.filter(
-            recipient=user_to_follow,
-            sender=following_user,
-            notification_type='request'
-        ).delete()
+        withdraw(user_to_follow, following_user, 'request')
         return redirect("profile_page", username=username)
 
     if user_to_follow.is_private:
         FollowRequest.objects.create(follow_requester=following_user, requested_user=user_to_follow)
-        Notification.objects.create(
-            recipient=user_to_follow,
-            sender=following_user,
-            notification_type='request'
-        )
+        notify(user_to_follow, following_user, 'request')
         return redirect("profile_page", username=username)
 
     following_user.following.add(user_to_follow)
-    Notification.objects.create(
-        recipient=user_to_follow,
-        sender=following_user,
-        notification_type='follow'
-    )
+    notify(user_to_follow, following_user, 'follow')
 
     next_url = request.POST.get("next")
     if next_url:
@@ -171,7 +196,7 @@ def follow_list(request, username, relation):
     is_me = current_user == profile_user
     is_following = False
     if current_user.is_authenticated:
-        is_following = current_user.following.filter(id=profile_user.id).exists()
+        is_following = viewer_state(request).is_following(profile_user)
 
     if profile_user.is_private and not is_me and not is_following:
         return redirect("profile_page", username=username)
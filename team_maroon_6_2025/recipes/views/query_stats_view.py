@@ -0,0 +1,23 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.shortcuts import redirect, render
+from django.views.decorators.http import require_POST
+
+from recipes.instrumentation import query_stats, reset_stats
+
+@staff_member_required
+def query_stats_dashboard(request):
+    """
+    Display per-view query statistics to staff
+    Shows the average and worst query counts, SQL and template time, and how
+    often each view went over its query budget or repeated a query
+    """
+    return render(request, 'query_stats.html', {'rows': query_stats()})
+
+@staff_member_required
+@require_POST
+def reset_query_stats(request):
+    """
+    Clear the collected query statistics
+    """
+    reset_stats()
+    return redirect('query_stats')
@@ -1,17 +1,22 @@
-from itertools import chain 
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import redirect, render, get_object_or_404
 from django.forms import inlineformset_factory
 from django.http import HttpResponseForbidden
 from django.contrib import messages
+from django.db import transaction
 from django.views.decorators.http import require_POST
 from django.urls import reverse
-from django.core.paginator import Paginator
 
-from recipes.models import Category, Recipe, RecipeImage, RecipeRating
+from recipes.models import Recipe, RecipeImage, RecipeRating
+from recipes.cards import build_card_lists
+from recipes.category_registry import get_registry
 from recipes.forms import RecipeForm, CommentForm, RecipeImageForm, RecipeRatingForm
 from recipes.search_filters import filter_recipes 
-from recipes.helpers import RECIPE_ORDERING, base_recipe_queryset, attach_user_ratings
+from recipes.helpers import RECIPE_ORDERING, base_recipe_queryset
+from recipes.pagination import paginate_by_cursor
+from recipes.counters import refresh_rating_totals
+from recipes.timeline import following_feed
+from recipes.viewer_state import viewer_state
 
 RecipeImageFormSet = inlineformset_factory(
     Recipe,
@@ -26,65 +31,78 @@ def recipe_list(request):
     Display the recipe list with filtering, sorting, pagination, and following feed
     Serves as the main recipe browsing interface, supporting multiple features: supporting multiple features:
     filtering by categories and search terms, sorting by various criteria (newest, popular, highest rated),
-    and pagination with 10 recipes per page. For authenticated users, it
+    and cursor pagination with 10 recipes per page. For authenticated users, it
     generates an additional "following feed" containing recipes from users they follow,
     displayed separately from the main feed.
     """
-    sort = request.GET.get("sort", "newest")
-    ordering = RECIPE_ORDERING.get(sort, ("-created_at",))
-    recipes_qs = filter_recipes(request, base_recipe_queryset(include_comments=True)).distinct()
-
-    paginator = Paginator(recipes_qs.order_by(*ordering), 10)
-    page_number = request.GET.get("page") or 1
-    feed_recipes = paginator.get_page(page_number)
-    following_recipes = []
-
-    if request.user.is_authenticated:
-        following_ids = list(
-            request.user.following.values_list("id", flat=True)
-        )
-        if following_ids:
-            following_recipes = list(
-                recipes_qs.filter(author_id__in=following_ids)
-                .order_by(*ordering)
-            )
-
-    attach_user_ratings(chain(feed_recipes, following_recipes), request.user)
-    categories = Category.objects.order_by("label")
+    sort, ordering, recipes_qs = _recipe_feed(request)
+    feed_recipes = paginate_by_cursor(request, recipes_qs, ordering)
+    following_recipes = _following_page(request, request.user, recipes_qs, ordering)
+    categories = get_registry().all
 
     return render(
         request,
         "recipes/recipe_list.html",
-        {
-            "feed_recipes": feed_recipes,
-            "following_recipes": following_recipes,
-            "categories": categories,
-            "star_range": range(1, 6),
-            "active_sort": sort,
-            "query": request.GET.get("q", ""),
-        },
+        _recipe_list_context(request, sort, feed_recipes, following_recipes, categories),
+    )
+
+def _recipe_feed(request):
+    """Return the requested sort, its ordering and the filtered recipe queryset"""
+    sort = request.GET.get("sort", "newest")
+    ordering = RECIPE_ORDERING.get(sort, ("-created_at",))
+    recipes_qs = filter_recipes(request, base_recipe_queryset(include_categories=False))
+    return sort, ordering, recipes_qs
+
+def _following_page(request, user, recipes_qs, ordering):
+    if not user.is_authenticated:
+        return []
+    return paginate_by_cursor(
+        request,
+        following_feed(user, recipes_qs),
+        ordering,
+        param="following_cursor",
     )
 
+def _recipe_list_context(request, sort, feed_recipes, following_recipes, categories):
+    feed_cards, following_cards = build_card_lists([feed_recipes, following_recipes], viewer_state(request))
+    feed_recipes.object_list = feed_cards
+    if following_recipes:
+        following_recipes.object_list = following_cards
+    return {
+        "feed_recipes": feed_recipes,
+        "following_recipes": following_recipes,
+        "categories": categories,
+        "star_range": range(1, 6),
+        "active_sort": sort,
+        "query": request.GET.get("q", ""),
+    }
+
 def recipe_detail(request, pk):
     """
     Display a single recipe with comments, rating information, and user information
     """
-    recipe = get_object_or_404(Recipe, pk=pk)
+    recipe = get_object_or_404(Recipe.objects.select_related("author"), pk=pk)
     comments = recipe.comments.select_related("author")
+    user_rating = _user_rating(recipe, request.user)
+
+    return render(request, "recipes/recipe_detail.html", _recipe_detail_context(request, recipe, comments, user_rating))
+
+def _user_rating(recipe, user):
+    if not user.is_authenticated:
+        return None
+    return RecipeRating.objects.filter(
+        recipe=recipe,
+        user=user
+    ).first()
 
-    user_rating = None
+def _recipe_detail_context(request, recipe, comments, user_rating):
     rating_form = None
     if request.user.is_authenticated:
-        user_rating = RecipeRating.objects.filter(
-            recipe=recipe,
-            user=request.user
-        ).first()
-
         rating_form = RecipeRatingForm(
             initial={"rating": user_rating.rating if user_rating else None}
         )
 
-    context = {
+    return {
         "recipe": recipe,
         "comments": comments,
         "comment_form": CommentForm(),
@@ -95,8 +113,6 @@ def recipe_detail(request, pk):
         "star_range": range(1, 6)
     }
 
-    return render(request, "recipes/recipe_detail.html", context)
-
 def recipe_create(request):
     """
     Create a new recipe with optional images
@@ -177,20 +193,26 @@ def recipe_delete(request, pk):
 
 @login_required
 @require_POST
+@transaction.atomic
 def rate_recipe(request, pk):
     """
     Save or update a user's rating for a recipe
+    The rating is written with one INSERT ... ON CONFLICT DO UPDATE, so two
+    submissions at once cannot race. bulk_create sends no signals, so the
+    rating counters are refreshed here rather than by count_ratings.
     """
     recipe = get_object_or_404(Recipe, pk=pk)
     form = RecipeRatingForm(request.POST)
 
     if form.is_valid():
         rating_value = form.cleaned_data["rating"]
-        RecipeRating.objects.update_or_create(
-            recipe=recipe,
-            user=request.user,
-            defaults={"rating": rating_value}
+        RecipeRating.objects.bulk_create(
+            [RecipeRating(recipe=recipe, user=request.user, rating=rating_value)],
+            update_conflicts=True,
+            unique_fields=["recipe", "user"],
+            update_fields=["rating", "updated_at"],
         )
+        refresh_rating_totals([recipe.pk])
         messages.success(request, "Rating saved.")
     else:
         messages.error(request, "Invalid rating.")
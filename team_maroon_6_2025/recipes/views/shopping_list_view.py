@@ -6,37 +6,39 @@ from django.views.decorators.http import require_POST
 from recipes.forms import ShoppingListItemForm
 from recipes.models import Recipe, ShoppingListItem
 
-def _ingredient_lines(recipe):
+def _amount(ingredient):
     """
-    Get cleaned ingredient lines from a recipe
-    Helps parse the recipe's ingredients field, and yields each ingredient as a cleaned string
+    Describe a parsed ingredient's quantity and unit for an item's notes, e.g. "1.5 cup"
     """
-    for line in recipe.ingredients.splitlines():
-        cleaned = line.strip().lstrip("-•").strip()
-        if cleaned:
-            yield cleaned
+    if ingredient.quantity is None:
+        return ""
+    quantity = f"{ingredient.quantity.normalize():f}"
+    return f"{quantity} {ingredient.unit}".strip()
 
 @login_required
 @require_POST
 def shopping_list_add_recipe(request, pk):
     """
     Add all ingredients from a recipe to the user's shopping list
-    Extracts all ingedients from a specified recipe and adds them to the user's shopping list
+    Uses the recipe's parsed ingredients, so each item is the normalised ingredient name
+    with its amount as the notes. One query reads the ingredients and one
+    INSERT ... ON CONFLICT DO NOTHING adds them, leaving items already on the list as they are.
     """
     recipe = get_object_or_404(Recipe, pk=pk)
-    added = 0
-    for line in _ingredient_lines(recipe):
-        _, created = ShoppingListItem.objects.get_or_create(
-            user=request.user,
-            name=line,
-            defaults={"source_recipe": recipe},
-        )
-        if created:
-            added += 1
-    if added:
-        messages.success(request, f"Added {added} ingredients to your shopping list.")
+    ingredients = {}
+    for ingredient in recipe.parsed_ingredients.all():
+        ingredients.setdefault(ingredient.name, ingredient)
+    ShoppingListItem.objects.bulk_create(
+        [
+            ShoppingListItem(user=request.user, source_recipe=recipe, name=name, notes=_amount(ingredient))
+            for name, ingredient in ingredients.items()
+        ],
+        ignore_conflicts=True,
+    )
+    if ingredients:
+        messages.success(request, f"Added the ingredients of '{recipe.title}' to your shopping list.")
     else:
-        messages.info(request, "Those ingredients were already on your shopping list.")
+        messages.info(request, "That recipe has no ingredients to add.")
     next_url = request.POST.get("next")
     return redirect(next_url or "recipe_detail", pk=recipe.pk)
 
@@ -46,12 +48,18 @@ def shopping_list_add_recipe(request, pk):
 def shopping_list_add_item(request):
     """
     Add a single item to the user's shopping list
+    Adding an item that is already listed updates its notes and unticks it.
     """
     form = ShoppingListItemForm(request.POST)
     if form.is_valid():
         item = form.save(commit=False)
         item.user = request.user
-        item.save()
+        ShoppingListItem.objects.bulk_create(
+            [item],
+            update_conflicts=True,
+            unique_fields=["user", "name"],
+            update_fields=["notes", "is_checked"],
+        )
         messages.success(request, "Ingredient added to your shopping list.")
     else:
         messages.error(request, "Please fix the errors below.")
@@ -2,6 +2,8 @@
 ASGI config for recipify project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Unless ``ASYNC_VIEWS`` is set otherwise, the read-heavy pages are served by
+their async views (see ``recipify.async_urls``).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -12,5 +14,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'recipify.settings')
+os.environ.setdefault('ASYNC_VIEWS', 'true')
 
 application = get_asgi_application()
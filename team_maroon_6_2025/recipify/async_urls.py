@@ -0,0 +1,11 @@
+"""
+URL configuration used when ``ASYNC_VIEWS`` is on.
+
+The same routes as ``recipify.urls``, with the read-heavy pages served by
+the async views in ``recipes.views.async_views``.
+"""
+
+from recipes.views.async_views import swap_views
+from recipify.urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = swap_views(sync_urlpatterns)
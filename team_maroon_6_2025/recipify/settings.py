@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from django.contrib.messages import constants as messages
 
@@ -44,6 +45,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'recipes.middleware.QueryInstrumentationMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -65,6 +67,8 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'recipes.context_processors.navbar_search',
+                'recipes.context_processors.viewer_state',
+                'recipes.context_processors.live_notifications',
             ],
         },
 
@@ -145,4 +149,140 @@ MESSAGE_TAGS = {
 }
 
 MEDIA_URL = '/media/'
-MEDIA_ROOT = BASE_DIR / 'media'
\ No newline at end of file
+MEDIA_ROOT = BASE_DIR / 'media'
+# Following-feed timelines (see recipes.timeline). Authors with more followers
+# than the fan-out limit are merged in at read time instead of on write.
+TIMELINE_FANOUT_LIMIT = 1000
+TIMELINE_MAX_DEPTH = 500
+
+# Precomputed explore rankings (see recipes.rankings). Refresh them from cron
+# with `manage.py compute_rankings`; once they are stale a page queues a
+# rankings.compute task and keeps serving the stored lists meanwhile.
+RANKING_SIZE = 24
+RANKING_STALE_AFTER = 900
+TRENDING_WINDOW_DAYS = 30
+
+# Cache backend. Point CACHE_URL at redis://host:port/db to share the cache
+# between workers, or at file:///some/dir for a file-based cache; without it
+# each process keeps its own local-memory cache.
+CACHE_URL = os.environ.get('CACHE_URL', '')
+if CACHE_URL.startswith(('redis://', 'rediss://', 'unix://')):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        },
+    }
+elif CACHE_URL.startswith('file://'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_URL[len('file://'):],
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'recipify',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        },
+    }
+
+# Lifetime of cached recipe card and detail fragments (see recipes.caching).
+# Writes invalidate fragments through version keys, so this only bounds memory.
+RECIPE_FRAGMENT_CACHE_SECONDS = 3600
+
+# Derived recipe images (see recipes.images): the thumbnail bounding box and
+# the widths of the JPEG/WebP/AVIF copies offered to browsers through srcset.
+RECIPE_THUMBNAIL_SIZE = (400, 400)
+RECIPE_IMAGE_WIDTHS = (320, 640, 960)
+
+# Background task queue (see recipes.task_queue). Eager mode runs tasks inline,
+# which needs no worker; set TASK_QUEUE_EAGER=false in production and run
+# `manage.py run_tasks` alongside the web processes.
+TASK_QUEUE_EAGER = os.environ.get('TASK_QUEUE_EAGER', 'true').lower() in ('1', 'true', 'yes')
+TASK_RETRY_BASE_SECONDS = 2
+TASK_VISIBILITY_TIMEOUT = 300
+
+# Per-request query instrumentation (see recipes.instrumentation). Every
+# response gets a Server-Timing header; requests over their URL name's query
+# budget, or repeating one statement QUERY_DUPLICATE_THRESHOLD times, are
+# logged on `recipes.queries`. Strict mode raises instead, which fails tests.
+QUERY_INSTRUMENTATION = True
+QUERY_STATS_ENABLED = True
+QUERY_DUPLICATE_THRESHOLD = 3
+QUERY_BUDGETS = {
+    'home': 10,
+    'recipe_list': 15,
+    'dashboard': 20,
+    'recipe_detail': 15,
+    'profile_page': 20,
+    'profile_favourites': 20,
+    'inbox': 20,
+    'pantry_search': 10,
+}
+QUERY_BUDGETS_STRICT = False
+
+# Slow-query log (see recipes.slow_queries). When on, statements slower than
+# the threshold are stored with their EXPLAIN plan, view and filter
+# parameters, aggregated by fingerprint; `manage.py slow_queries` lists them.
+SLOW_QUERY_LOG = os.environ.get('SLOW_QUERY_LOG', 'false').lower() in ('1', 'true', 'yes')
+SLOW_QUERY_THRESHOLD_MS = 100
+
+# Notification coalescing and retention (see recipes.notifications). While
+# coalescing is on, a notification of the same type about the same target
+# arriving within the window is folded into the recipient's unread row,
+# which keeps an actor count and the latest actors; follow requests are never
+# folded. `manage.py prune_notifications` deletes rows older than the retention periods.
+NOTIFICATION_COALESCING = os.environ.get('NOTIFICATION_COALESCING', 'true').lower() in ('1', 'true', 'yes')
+NOTIFICATION_COALESCE_WINDOW_HOURS = 24
+NOTIFICATION_RECENT_ACTORS = 3
+NOTIFICATION_RETENTION_DAYS = 90
+NOTIFICATION_READ_RETENTION_DAYS = 30
+
+# Live notification stream (see recipes.pubsub and the notification_stream
+# view). The in-memory broker only reaches clients of the same process, so it
+# is for development; use recipes.pubsub.CacheBroker with a Redis CACHE_URL
+# when running several. Streams are only opened for ASGI requests: under WSGI
+# each one would hold a worker thread, so browsers poll the unread count every
+# NOTIFICATION_POLL_SECONDS instead unless NOTIFICATION_STREAM_WSGI is set.
+NOTIFICATION_BROKER = os.environ.get('NOTIFICATION_BROKER', 'recipes.pubsub.InMemoryBroker')
+NOTIFICATION_STREAM_WSGI = os.environ.get('NOTIFICATION_STREAM_WSGI', 'false').lower() in ('1', 'true', 'yes')
+NOTIFICATION_POLL_SECONDS = 30
+NOTIFICATION_STREAM_MAX_SECONDS = 300
+NOTIFICATION_STREAM_HEARTBEAT = 15
+NOTIFICATION_STREAM_RETRY_MS = 5000
+NOTIFICATION_LONG_POLL_SECONDS = 25
+
+# ASGI mode (see recipify.asgi and recipes.views.async_views). With
+# ASYNC_VIEWS on, which the ASGI entry point sets by default, the read-heavy
+# pages are served by async views. ASYNC_CONCURRENT_QUERIES runs their
+# independent queries concurrently on ASYNC_QUERY_WORKERS worker threads with
+# their own connections (see recipes.concurrency). On SQLite that measured no
+# faster than running them in turn (`manage.py benchmark --throughput`), so it
+# is off by default; turn it on with a server database and CONN_MAX_AGE > 0.
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', 'false').lower() in ('1', 'true', 'yes')
+ASYNC_CONCURRENT_QUERIES = os.environ.get('ASYNC_CONCURRENT_QUERIES', 'false').lower() in ('1', 'true', 'yes')
+ASYNC_QUERY_WORKERS = 4
+ASGI_APPLICATION = 'recipify.asgi.application'
+if ASYNC_VIEWS:
+    ROOT_URLCONF = 'recipify.async_urls'
+
+# "What can I cook?" pantry search (see recipes.pantry). Each process keeps an
+# inverted ingredient index in memory and rebuilds it at most this often
+# after recipes change, and at least every PANTRY_INDEX_MAX_AGE_SECONDS since
+# the local-memory cache cannot tell other processes about changes. Rebuilds
+# run on a background thread. Staples count as always in the pantry.
+PANTRY_INDEX_REFRESH_SECONDS = 60
+PANTRY_INDEX_MAX_AGE_SECONDS = 600
+PANTRY_INDEX_BACKGROUND = True
+PANTRY_STAPLES = ('salt', 'pepper', 'water')
+PANTRY_RESULT_LIMIT = 24
+
+# Category registry (see recipes.category_registry). Each process keeps the
+# categories in memory and reloads them when a Category changes, which only
+# reaches other processes through a shared cache; without one (the default
+# local-memory cache) every process also reloads them at least this often.
+CATEGORY_REGISTRY_MAX_AGE_SECONDS = 300
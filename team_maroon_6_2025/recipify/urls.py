@@ -23,15 +23,24 @@ from recipes.views import favourite_view
 from recipes.views import like_view
 from recipes.views import comment_views
 from recipes.views import inbox_view
+from recipes.views import notification_stream_view
+from recipes.views import pantry_view
 from recipes.views import shopping_list_view
 from recipes.views import profile_page_view
+from recipes.views import query_stats_view
 
 urlpatterns = [
+    path('admin/query-stats/', query_stats_view.query_stats_dashboard, name='query_stats'),
+    path('admin/query-stats/reset/', query_stats_view.reset_query_stats, name='reset_query_stats'),
     path('admin/', admin.site.urls),
     path('', views.home, name='home'),
     path('dashboard/', views.dashboard, name='dashboard'),
     path('inbox/', inbox_view.inbox, name='inbox'),
     path('inbox/delete/<int:pk>/', views.delete_notification, name='delete_notification'),
+    path('inbox/mark-read/', inbox_view.mark_notifications_read, name='mark_notifications_read'),
+    path('inbox/delete-type/<str:notification_type>/', inbox_view.delete_notifications_of_type, name='delete_notifications_of_type'),
+    path('inbox/unread-count/', inbox_view.unread_notification_count, name='unread_notification_count'),
+    path('inbox/stream/', notification_stream_view.notification_stream, name='notification_stream'),
     path('log_in/', views.LogInView.as_view(), name='log_in'),
     path('log_out/', views.log_out, name='log_out'),
     path('password/', views.PasswordView.as_view(), name='password'),
@@ -46,6 +55,7 @@ urlpatterns = [
     path('sign_up/', views.SignUpView.as_view(), name='sign_up'),
     path('recipes/', views.recipe_list, name='recipe_list'),
     path('recipes/create/', views.recipe_create, name='recipe_create'),
+    path('recipes/pantry/', pantry_view.pantry_search, name='pantry_search'),
     path('recipes/<int:pk>', views.recipe_detail, name='recipe_detail'),
     path('recipes/<int:pk>/favourite/', favourite_view.toggle_favourite, name='recipe_favourite_toggle'),
     path("recipes/<int:pk>/like/", like_view.toggle_like, name="recipe_like_toggle"),
@@ -0,0 +1,76 @@
+/*
+ * Keeps the navbar unread badge live.
+ * When the page offers a notification stream (ASGI deployments) it uses
+ * Server-Sent Events, or long-polls the same URL for JSON in browsers
+ * without them. Otherwise it polls the unread count on a timer, so no
+ * request is held open on a WSGI worker.
+ */
+(function () {
+  var badge = document.getElementById('unread-notification-badge');
+  if (!badge) {
+    return;
+  }
+  var streamUrl = badge.dataset.streamUrl;
+  var countUrl = badge.dataset.countUrl;
+  var pollMs = (parseInt(badge.dataset.pollSeconds, 10) || 30) * 1000;
+
+  function showUnread(count) {
+    badge.textContent = count;
+    badge.classList.toggle('d-none', !count);
+  }
+
+  function onEvent(message) {
+    var event = JSON.parse(message.data);
+    showUnread(event.unread);
+    document.dispatchEvent(new CustomEvent('recipify:notification', { detail: event }));
+  }
+
+  function getJson(url) {
+    return fetch(url, { headers: { Accept: 'application/json' }, credentials: 'same-origin' })
+      .then(function (response) {
+        if (!response.ok) {
+          throw new Error(response.statusText);
+        }
+        return response.json();
+      });
+  }
+
+  if (!streamUrl) {
+    var pollCount = function () {
+      if (document.hidden) {
+        setTimeout(pollCount, pollMs);
+        return;
+      }
+      getJson(countUrl)
+        .then(function (body) { showUnread(body.unread); })
+        .catch(function () {})
+        .then(function () { setTimeout(pollCount, pollMs); });
+    };
+    setTimeout(pollCount, pollMs);
+    return;
+  }
+
+  if (window.EventSource) {
+    var source = new EventSource(streamUrl);
+    source.addEventListener('unread', onEvent);
+    source.addEventListener('notification', onEvent);
+    return;
+  }
+
+  function poll(cursor) {
+    var url = cursor === null ? streamUrl : streamUrl + '?after=' + cursor;
+    getJson(url)
+      .then(function (body) {
+        showUnread(body.unread);
+        body.events.forEach(function (event) {
+          document.dispatchEvent(new CustomEvent('recipify:notification', { detail: event }));
+        });
+        poll(body.cursor);
+      })
+      .catch(function () {
+        setTimeout(function () { poll(cursor); }, 5000);
+      });
+  }
+
+  poll(null);
+})();